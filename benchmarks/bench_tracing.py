@@ -0,0 +1,94 @@
+"""
+Measure the cost of tracing hooks on Enigma.encode_letter.
+
+Without tracer, no trace event is built: encode_letter only adds letter
+validation and a `tracer is not None` check to the bare compiled engine.
+Event classes are first patched to count their construction, the run fails
+when letters encoded without tracer built any.
+
+Run with `python -m benchmarks.bench_tracing`.
+"""
+from collections.abc import Callable
+from contextlib import ExitStack
+from timeit import repeat
+from typing import Any
+from unittest.mock import patch
+
+from enigma import Enigma, EnigmaConfig, tracing
+from enigma.compiled import CompiledEnigma
+from enigma.tracing import TraceEvent
+
+NUMBER = 100_000
+EVENTS = ("LetterIn", "LetterOut", "Stage", "Step", "Turnover")
+
+
+class NullTracer:
+    def trace(self, event: TraceEvent) -> None:
+        pass
+
+
+def best_of(statement: str, namespace: dict[str, object]) -> float:
+    return min(repeat(statement, globals=namespace, number=NUMBER, repeat=5))
+
+
+def count_events(enigma: Enigma, letters: str) -> int:
+    """Count trace events built while enigma encodes letters."""
+    built = 0
+
+    def count(event: Callable[..., TraceEvent]) -> Callable[..., TraceEvent]:
+        def build(*args: Any) -> TraceEvent:
+            nonlocal built
+            built += 1
+            return event(*args)
+
+        return build
+
+    with ExitStack() as stack:
+        for name in EVENTS:
+            stack.enter_context(
+                patch(f"enigma.enigma.{name}", count(getattr(tracing, name))),
+            )
+        for letter in letters:
+            enigma.encode_letter(letter)
+
+    return built
+
+
+def main() -> None:
+    config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AB CD")
+    engine = CompiledEnigma(config)
+
+    letters = "HELLOWORLD" * 1000
+    if built := count_events(Enigma(config), letters):
+        msg = f"{built} trace events built without tracer"
+        raise AssertionError(msg)
+    if not count_events(Enigma(config, NullTracer()), "H"):
+        msg = "event counting missed events of a tracer"
+        raise AssertionError(msg)
+    print(f"trace events without tracer: 0 in {len(letters)} letters")
+
+    results = {
+        "engine": best_of(
+            "make_step(); encode(7)",
+            {"make_step": engine.make_step, "encode": engine.encode},
+        ),
+        "no tracer": best_of(
+            "encode_letter('H')",
+            {"encode_letter": Enigma(config).encode_letter},
+        ),
+        "null tracer": best_of(
+            "encode_letter('H')",
+            {"encode_letter": Enigma(config, NullTracer()).encode_letter},
+        ),
+    }
+
+    for name, duration in results.items():
+        ratio = duration / results["engine"]
+        print(
+            f"{name:>12}: {duration / NUMBER * 1e9:8.1f} ns/letter"
+            f" ({ratio:.2f}x engine)",
+        )
+
+
+if __name__ == "__main__":
+    main()
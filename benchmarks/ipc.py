@@ -0,0 +1,141 @@
+"""
+Compare the IPC cost of pickled configs and of shared memory blocks.
+
+Run with `python -m benchmarks.ipc`. The same jobs are encoded by
+ProcessPoolExecutor.map over encode_at, pickling a config and text per
+task, and by SharedEncoder, which ships a block name and a piece range per
+task. Times and pickled task sizes are written as JSON.
+"""
+
+import json
+import pickle
+import sys
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from string import ascii_uppercase
+from time import perf_counter
+from typing import Any
+
+from enigma import EnigmaConfig, encode_at
+from enigma.plug_board import PlugBoard
+from enigma.shared import DEFAULT_TASK_LETTERS, SharedEncoder
+
+Job = tuple[EnigmaConfig, int, str]
+
+
+def get_jobs(
+    count: int,
+    message_size: int,
+    config_count: int,
+    rng: Random,
+) -> list[Job]:
+    configs = EnigmaConfig.generate_random_batch(
+        config_count,
+        PlugBoard.MAX_PLUG_COUNT,
+        rng=rng,
+    )
+
+    return [
+        (
+            configs[i % config_count],
+            rng.randrange(1 << 32),
+            "".join(rng.choices(ascii_uppercase, k=message_size)),
+        )
+        for i in range(count)
+    ]
+
+
+def run_pickled(jobs: Sequence[Job], workers: int | None) -> list[str]:
+    configs, starts, texts = zip(*jobs, strict=True)
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(encode_at, configs, starts, texts))
+
+
+def run_shared(jobs: Sequence[Job], workers: int | None) -> list[str]:
+    with SharedEncoder(workers) as encoder:
+        return encoder.encode(jobs)
+
+
+def measure(
+    run: Callable[[Sequence[Job], int | None], list[str]],
+    jobs: Sequence[Job],
+    workers: int | None,
+    repeat: int,
+) -> float:
+    """Best time of repeat runs, pool start included."""
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        run(jobs, workers)
+        times.append(perf_counter() - started)
+
+    return min(times)
+
+
+def get_task_sizes(jobs: Sequence[Job]) -> dict[str, float]:
+    """Mean pickled bytes sent per job, arguments and result."""
+    pickled = sum(
+        len(pickle.dumps((encode_at, job))) + len(pickle.dumps(job[2]))
+        for job in jobs
+    )
+
+    letters = sum(len(text) for _, _, text in jobs)
+    tasks = max(1, letters // DEFAULT_TASK_LETTERS)
+    # Block name and piece range, the result is None.
+    shared = tasks * (
+        len(pickle.dumps(("x" * 24, 0, len(jobs)))) + len(pickle.dumps(None))
+    )
+
+    return {
+        "pickled": pickled / len(jobs),
+        "shared": shared / len(jobs),
+    }
+
+
+def parse_args(argv: Sequence[str]) -> Namespace:
+    parser = ArgumentParser("Benchmark IPC of process pool encodings")
+    parser.add_argument("--workers", "-w", type=int)
+    parser.add_argument("--repeat", "-r", type=int, default=3)
+    parser.add_argument(
+        "--configs",
+        type=int,
+        default=16,
+        help="Distinct configs used by jobs",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    rng = Random(args.seed)  # noqa: S311 (reproducible jobs, not keys)
+
+    scenarios = {
+        "small_messages": get_jobs(20_000, 100, args.configs, rng),
+        "large_messages": get_jobs(8, 1_000_000, args.configs, rng),
+    }
+
+    report: dict[str, Any] = {}
+    for name, jobs in scenarios.items():
+        if run_pickled(jobs[:10], 1) != run_shared(jobs[:10], 1):
+            msg = f"{name}: shared and pickled encodings differ"
+            raise AssertionError(msg)
+
+        pickled = measure(run_pickled, jobs, args.workers, args.repeat)
+        shared = measure(run_shared, jobs, args.workers, args.repeat)
+        report[name] = {
+            "jobs": len(jobs),
+            "pickled_seconds": pickled,
+            "shared_seconds": shared,
+            "speedup": pickled / shared,
+            "bytes_per_job": get_task_sizes(jobs),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
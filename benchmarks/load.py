@@ -0,0 +1,161 @@
+"""
+Load generator for the encryption service.
+
+Start a server with `python main.py serve`, then run
+`python -m benchmarks.load --requests 100000 --concurrency 256`. Client side
+latencies and server statistics are written as JSON.
+"""
+
+import asyncio
+import json
+import sys
+from argparse import ArgumentParser, Namespace
+from collections.abc import Sequence
+from pathlib import Path
+from random import Random
+from string import ascii_uppercase
+from time import perf_counter
+from typing import Any
+
+from enigma import EnigmaConfig
+from enigma.plug_board import PlugBoard
+from enigma.server import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    EnigmaClient,
+    LatencyHistogram,
+)
+
+
+async def run_load(  # noqa: PLR0913 (Too many arguments)
+    clients: Sequence[EnigmaClient],
+    *,
+    requests: int,
+    concurrency: int,
+    message_size: int,
+    config_count: int,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Send requests with at most concurrency in flight, over every client.
+
+    Configs and messages are drawn from seed, so runs can be compared.
+    """
+    rng = Random(seed)  # noqa: S311 (reproducible load, not keys)
+    configs = EnigmaConfig.generate_random_batch(
+        config_count,
+        PlugBoard.MAX_PLUG_COUNT,
+        rng=rng,
+    )
+    messages = [
+        "".join(rng.choices(ascii_uppercase, k=message_size))
+        for _ in range(config_count)
+    ]
+
+    histogram = LatencyHistogram()
+    jobs = iter(range(requests))
+    errors = 0
+
+    async def send(client: EnigmaClient) -> None:
+        nonlocal errors
+        for job in jobs:
+            started = perf_counter()
+            try:
+                await client.encode(
+                    configs[job % config_count],
+                    messages[job % config_count],
+                    start=job,
+                )
+            except ValueError:
+                errors += 1
+            histogram.record(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(
+        *(send(clients[i % len(clients)]) for i in range(concurrency)),
+    )
+    elapsed = perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0.0,
+        "latency": histogram.as_dict(),
+        "server": await clients[0].get_stats(),
+    }
+
+
+def parse_args(argv: Sequence[str]) -> Namespace:
+    parser = ArgumentParser("Benchmark the encryption service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--unix",
+        type=Path,
+        help="Connect to this Unix socket path instead of TCP",
+    )
+    parser.add_argument(
+        "--connections",
+        "-n",
+        type=int,
+        default=4,
+        help="Connections opened to the server",
+    )
+    parser.add_argument(
+        "--requests",
+        "-r",
+        type=int,
+        default=10_000,
+        help="Total requests sent",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=64,
+        help="Requests in flight at once, over all connections",
+    )
+    parser.add_argument(
+        "--message-size",
+        "-s",
+        type=int,
+        default=100,
+        help="Letters per message",
+    )
+    parser.add_argument(
+        "--configs",
+        type=int,
+        default=16,
+        help="Distinct configs used by requests",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args(argv)
+
+
+async def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    clients = [
+        await EnigmaClient.connect(args.host, args.port, path=args.unix)
+        for _ in range(args.connections)
+    ]
+    try:
+        report = await run_load(
+            clients,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            message_size=args.message_size,
+            config_count=args.configs,
+            seed=args.seed,
+        )
+    finally:
+        for client in clients:
+            await client.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+Benchmarks of Enigma hot paths, with regression tracking.
+
+Run with `python -m benchmarks`, results are written as JSON so runs can be
+compared: `python -m benchmarks --output new.json --compare old.json` exit
+with status 1 when a benchmark is slower than the old run by more than the
+threshold.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from string import ascii_uppercase
+from timeit import Timer
+from typing import Any, Final
+
+from enigma import Enigma, EnigmaConfig
+
+ROOT: Final = Path(__file__).parent.parent
+
+KB: Final = 1_000
+MB: Final = 1_000_000
+MESSAGE_SIZES: Final = (KB, 100 * KB, MB, 10 * MB, 100 * MB)
+
+# A call longer than this is not repeated.
+LONG_CALL: Final = 1.0
+
+CONFIG_ARGS: Final = ("II:Q I:C III:X", "REFB:A", "AB CD EF")
+CONFIG: Final = EnigmaConfig.parse(*CONFIG_ARGS)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    # Build the function to time, setup is not timed.
+    setup: Callable[[], Callable[[], object]]
+
+
+def get_benchmarks(max_size: int) -> list[Benchmark]:
+    benchmarks = [
+        Benchmark(
+            "encode_letter",
+            lambda: partial(Enigma(CONFIG).encode_letter, "H"),
+        ),
+        Benchmark("enigma_init", lambda: lambda: Enigma(CONFIG)),
+        Benchmark(
+            "config_parse",
+            lambda: lambda: EnigmaConfig.parse(*CONFIG_ARGS),
+        ),
+        Benchmark("config_as_dict", lambda: CONFIG.as_dict),
+        Benchmark(
+            "generate_random_config",
+            lambda: lambda: EnigmaConfig.generate_random_config(10),
+        ),
+        Benchmark("cli_cold_start", lambda: _run_cli),
+    ]
+    benchmarks.extend(
+        Benchmark(f"encode_message[{_format_size(size)}]", _message_setup(size))
+        for size in MESSAGE_SIZES
+        if size <= max_size
+    )
+
+    return benchmarks
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    """Get the best duration of one func call, in seconds."""
+    timer = Timer(func)
+    number, duration = timer.autorange()
+    if duration / number > LONG_CALL:
+        return duration / number
+
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(benchmarks: Iterable[Benchmark]) -> dict[str, float]:
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = measure(benchmark.setup())
+        print(
+            f"{benchmark.name:>32}: {results[benchmark.name]:.3e} s",
+            file=sys.stderr,
+        )
+
+    return results
+
+
+def compare(
+    results: dict[str, float],
+    baseline: dict[str, float],
+    threshold: float,
+) -> list[str]:
+    """
+    Get names of benchmarks slower than baseline by more than threshold.
+
+    >>> compare({"a": 1.3, "b": 1.0, "c": 1.0}, {"a": 1.0, "b": 1.0}, 0.2)
+    ['a']
+    """
+    return [
+        name
+        for name, duration in results.items()
+        if name in baseline and duration > baseline[name] * (1 + threshold)
+    ]
+
+
+def parse_args(argv: Sequence[str]) -> Namespace:
+    parser = ArgumentParser("Run Enigma benchmarks")
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        help="Write JSON results in this file instead of stdout",
+    )
+    parser.add_argument(
+        "--compare",
+        "-c",
+        type=Path,
+        help="JSON results of a previous run to compare with",
+    )
+    parser.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown ratio before failing, 0.2 for 20%%",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=max(MESSAGE_SIZES),
+        help="Largest encode_message size in bytes",
+    )
+    parser.add_argument(
+        "--filter",
+        "-k",
+        default="",
+        help="Only run benchmarks whose name contain this string",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    benchmarks = [
+        b for b in get_benchmarks(args.max_size) if args.filter in b.name
+    ]
+    report: dict[str, Any] = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": run(benchmarks),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+    if args.compare is None:
+        return 0
+
+    baseline = json.loads(args.compare.read_text())["results"]
+    regressions = compare(report["results"], baseline, args.threshold)
+    for name in regressions:
+        print(
+            f"Regression: {name} {report['results'][name]:.3e} s"
+            f" against {baseline[name]:.3e} s",
+            file=sys.stderr,
+        )
+
+    return 1 if regressions else 0
+
+
+def _message_setup(size: int) -> Callable[[], Callable[[], object]]:
+    def setup() -> Callable[[], object]:
+        message = ascii_uppercase * (size // len(ascii_uppercase) + 1)
+        message = message[:size]
+
+        return lambda: Enigma(CONFIG).encode_message(message)
+
+    return setup
+
+
+def _run_cli() -> None:
+    subprocess.run(  # noqa: S603 (trusted input)
+        [sys.executable, str(ROOT / "main.py"), "list"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _format_size(size: int) -> str:
+    """
+    Format a message size in KB or MB.
+
+    >>> _format_size(100_000_000)
+    '100MB'
+    """
+    if size >= MB:
+        return f"{size // MB}MB"
+
+    return f"{size // KB}KB"
@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING
+
 from .available import (
     AvailableRotor as AvailableRotor,
     AvailableReflector as AvailableReflector,
@@ -5,3 +7,23 @@ from .available import (
 from .config import EnigmaConfig as EnigmaConfig
 from .enigma import Enigma as Enigma
 from .plug_board import Plug as Plug
+
+if TYPE_CHECKING:
+    from .parallel import encode_parallel as encode_parallel
+    from .parallel import encode_at as encode_at
+    from .parallel import encode_at_threaded as encode_at_threaded
+
+# Process pools take tens of milliseconds to import, loaded on first use.
+_PARALLEL_NAMES = frozenset(
+    {"encode_parallel", "encode_at", "encode_at_threaded"},
+)
+
+
+def __getattr__(name: str) -> object:
+    if name in _PARALLEL_NAMES:
+        from . import parallel  # noqa: PLC0415 (slow import)
+
+        return getattr(parallel, name)
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,15 @@
+from .plug_board import (
+    get_scramblers as get_scramblers,
+    solve_plug_board as solve_plug_board,
+)
+from .scoring import (
+    Candidate as Candidate,
+    index_of_coincidence as index_of_coincidence,
+)
+from .search import (
+    SearchResult as SearchResult,
+    WorkUnit as WorkUnit,
+    get_work_units as get_work_units,
+    search_rotors as search_rotors,
+    search_work_units as search_work_units,
+)
@@ -0,0 +1,171 @@
+"""
+Save progress of long searches, to resume them after a crash.
+
+A search job is split in numbered tasks, work units or restarts. The
+checkpoint file records which tasks are done and the best candidates found,
+so a resumed job only runs remaining tasks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+from functools import partial
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Final
+
+from enigma.config import EnigmaConfig
+from enigma.helper import get_ranges
+
+from .scoring import Candidate
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .scoring import Scorer
+
+CHECKPOINT_VERSION: Final = 2
+DEFAULT_INTERVAL: Final = 60.0
+
+
+def get_job_key(**parameters: object) -> str:
+    """Hash job parameters, a checkpoint is only resumed by the same job."""
+    key = json.dumps(parameters, sort_keys=True, default=str)
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_scorer_name(scorer: Scorer) -> str:
+    """
+    Name scorer for job keys, it must not change between runs.
+
+    Partials are named by their function and arguments, callable instances
+    by their type.
+
+    >>> get_scorer_name(partial(round, ndigits=2))
+    'builtins.round(ndigits=2)'
+    """
+    if isinstance(scorer, partial):
+        arguments = [
+            *map(repr, scorer.args),
+            *(f"{name}={value!r}" for name, value in scorer.keywords.items()),
+        ]
+        return f"{get_scorer_name(scorer.func)}({', '.join(arguments)})"
+
+    qualname = getattr(scorer, "__qualname__", None)
+    if qualname is None:
+        return f"{type(scorer).__module__}.{type(scorer).__qualname__}"
+
+    return f"{scorer.__module__}.{qualname}"
+
+
+class Checkpoint:
+    """
+    Done tasks and top best candidates of a search job.
+
+    add saves the checkpoint when interval seconds passed since the last
+    save, so the overhead is bounded: writes and write_seconds measure it.
+    State holds job data to restore on resume, as drawn random seeds.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        key: str,
+        *,
+        top: int,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.key = key
+        self.top = top
+        self.interval = interval
+
+        self.done: set[int] = set()
+        self.candidates: list[Candidate] = []
+        self.state: dict[str, Any] = {}
+
+        self.writes = 0
+        self.write_seconds = 0.0
+        self._saved_at = perf_counter()
+
+    @classmethod
+    def open(
+        cls,
+        path: Path,
+        key: str,
+        *,
+        top: int,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> Checkpoint:
+        """Load checkpoint of path, or start a new one when missing."""
+        checkpoint = cls(path, key, top=top, interval=interval)
+        if not path.exists():
+            return checkpoint
+
+        data = json.loads(path.read_text())
+        if data["version"] != CHECKPOINT_VERSION:
+            msg = (
+                f"{path} checkpoint version is {data['version']},"
+                f" expected {CHECKPOINT_VERSION}"
+            )
+            raise ValueError(msg)
+        if data["key"] != key:
+            msg = f"{path} is the checkpoint of another search job"
+            raise ValueError(msg)
+
+        checkpoint.done = {
+            task for start, stop in data["done"] for task in range(start, stop)
+        }
+        checkpoint.candidates = [
+            Candidate(score, EnigmaConfig.from_bytes(bytes.fromhex(config)))
+            for score, config in data["candidates"]
+        ]
+        checkpoint.state = data["state"]
+
+        return checkpoint
+
+    def is_done(self, task: int) -> bool:
+        return task in self.done
+
+    def add(self, task: int, candidates: Iterable[Candidate]) -> None:
+        """Mark task done with its candidates, save when interval passed."""
+        self.done.add(task)
+        self.candidates = heapq.nlargest(
+            self.top,
+            [*self.candidates, *candidates],
+        )
+
+        if perf_counter() - self._saved_at >= self.interval:
+            self.save()
+
+    def save(self) -> None:
+        """Write checkpoint aside then rename it, never leaving a partial one."""
+        started = perf_counter()
+
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "key": self.key,
+            "done": get_ranges(self.done),
+            "candidates": [
+                [candidate.score, candidate.config.to_bytes().hex()]
+                for candidate in self.candidates
+            ],
+            "state": self.state,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            "w",
+            dir=self.path.parent,
+            delete=False,
+        ) as file:
+            json.dump(data, file, separators=(",", ":"))
+        Path(file.name).replace(self.path)
+
+        self._saved_at = perf_counter()
+        self.writes += 1
+        self.write_seconds += self._saved_at - started
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from functools import partial
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+from enigma.compiled import LETTER_COUNT, CompiledEnigma
+from enigma.helper import get_letter_from_index, parse_letters
+from enigma.plug_board import Plug, PlugBoard
+
+from .checkpoint import (
+    DEFAULT_INTERVAL,
+    Checkpoint,
+    get_job_key,
+    get_scorer_name,
+)
+from .scoring import Candidate, index_of_coincidence
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from enigma.config import EnigmaConfig
+
+    from .scoring import Scorer
+
+_padding = bytes(range(LETTER_COUNT, 256))
+
+
+def get_scramblers(config: EnigmaConfig, length: int) -> list[bytes]:
+    """
+    Get the permutation of rotors and reflector for the first length letters.
+
+    Plug board is left out: encoding letter k under plug board P is
+    P[scramblers[k][P[letter]]].
+    """
+    return CompiledEnigma(replace(config, plugs=())).get_permutations(length)
+
+
+def solve_plug_board(  # noqa: PLR0913 (Too many arguments)
+    ciphertext: str,
+    config: EnigmaConfig,
+    *,
+    plug_count: int = PlugBoard.MAX_PLUG_COUNT,
+    restarts: int = 8,
+    workers: int | None = None,
+    fitness: Scorer = index_of_coincidence,
+    seed: int | None = None,
+    checkpoint: Path | None = None,
+    checkpoint_interval: float = DEFAULT_INTERVAL,
+) -> list[Candidate]:
+    """
+    Recover plugs of config by hill climbing, rotors and reflector are fixed.
+
+    Scrambler permutations are computed once, then each candidate plug board
+    costs two translate calls and one table lookup per letter. Restarts run
+    over a process pool, or in this process when workers is 1, and their
+    results are returned best first.
+
+    When checkpoint is given, restart seeds and results are saved in this
+    file at most every checkpoint_interval seconds, and the same search
+    started again only runs remaining restarts.
+    """
+    indexes = parse_letters(ciphertext.replace(" ", "").replace("\n", ""))
+    scramblers = get_scramblers(config, len(indexes))
+
+    progress: Checkpoint | None = None
+    if checkpoint is not None:
+        progress = Checkpoint.open(
+            checkpoint,
+            get_job_key(
+                search="plug_board",
+                ciphertext=indexes.hex(),
+                config=config.as_dict(),
+                plug_count=plug_count,
+                restarts=restarts,
+                fitness=get_scorer_name(fitness),
+                seed=seed,
+            ),
+            top=restarts,
+            interval=checkpoint_interval,
+        )
+
+    if progress is not None and "seeds" in progress.state:
+        seeds = progress.state["seeds"]
+    else:
+        # Restarts only need reproducible randomness, not secret one.
+        seeds = random.Random(seed).sample(  # noqa: S311
+            range(1 << 32),
+            restarts,
+        )
+        if progress is not None:
+            progress.state["seeds"] = seeds
+    climb = partial(
+        climb_plug_board,
+        indexes,
+        scramblers,
+        plug_count=plug_count,
+        fitness=fitness,
+    )
+
+    remaining = [
+        (task, restart_seed)
+        for task, restart_seed in enumerate(seeds)
+        if progress is None or not progress.is_done(task)
+    ]
+    candidates: list[Candidate] = []
+
+    def add(task: int, result: tuple[float, bytes]) -> None:
+        score, table = result
+        candidate = Candidate(score, replace(config, plugs=_get_plugs(table)))
+        if progress is None:
+            candidates.append(candidate)
+        else:
+            progress.add(task, [candidate])
+
+    if workers == 1:
+        for task, restart_seed in remaining:
+            add(task, climb(restart_seed))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = {
+                executor.submit(climb, restart_seed): task
+                for task, restart_seed in remaining
+            }
+            for future in as_completed(futures):
+                add(futures[future], future.result())
+
+    if progress is not None:
+        progress.save()
+        candidates = progress.candidates
+
+    return sorted(candidates, reverse=True)
+
+
+def climb_plug_board(
+    indexes: bytes,
+    scramblers: Sequence[bytes],
+    seed: int,
+    *,
+    plug_count: int,
+    fitness: Scorer,
+) -> tuple[float, bytes]:
+    """
+    Hill climb from a random plug board until no plug swap improve fitness.
+
+    Return the best score and its plug board table.
+    """
+    rng = random.Random(seed)  # noqa: S311 (not used for keys)
+    table = bytearray(range(LETTER_COUNT))
+    letters = rng.sample(range(LETTER_COUNT), rng.randint(0, plug_count) * 2)
+    for left, right in zip(letters[::2], letters[1::2], strict=True):
+        table[left], table[right] = right, left
+
+    best = fitness(_decrypt(indexes, scramblers, table))
+    improved = True
+    while improved:
+        improved = False
+        for left, right in combinations(range(LETTER_COUNT), 2):
+            candidate = _swap(table, left, right)
+            if _count_plugs(candidate) > plug_count:
+                continue
+
+            score = fitness(_decrypt(indexes, scramblers, candidate))
+            if score > best:
+                table, best, improved = candidate, score, True
+
+    return best, bytes(table)
+
+
+def _decrypt(
+    indexes: bytes,
+    scramblers: Sequence[bytes],
+    table: bytearray,
+) -> bytes:
+    plugs = bytes(table) + _padding
+    plugged = indexes.translate(plugs)
+
+    return bytes(
+        [s[x] for s, x in zip(scramblers, plugged, strict=True)],
+    ).translate(plugs)
+
+
+def _swap(table: bytearray, left: int, right: int) -> bytearray:
+    """Unplug left and right when plugged together, else plug them."""
+    candidate = bytearray(table)
+    plugged = candidate[left] == right
+
+    for letter in (left, right):
+        partner = candidate[letter]
+        candidate[partner] = partner
+        candidate[letter] = letter
+
+    if not plugged:
+        candidate[left] = right
+        candidate[right] = left
+
+    return candidate
+
+
+def _count_plugs(table: bytearray) -> int:
+    return sum(partner > letter for letter, partner in enumerate(table))
+
+
+def _get_plugs(table: bytes) -> tuple[Plug, ...]:
+    return tuple(
+        Plug(get_letter_from_index(letter), get_letter_from_index(partner))
+        for letter, partner in enumerate(table)
+        if partner > letter
+    )
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from itertools import permutations
+from time import perf_counter
+from typing import TYPE_CHECKING, Final
+
+from enigma.available import AvailableRotor
+from enigma.compiled import LETTER_COUNT, CompiledEnigma, get_positions
+from enigma.config import EnigmaConfig, RotorConfig
+from enigma.helper import get_letter_from_index, parse_letters
+
+from .checkpoint import (
+    DEFAULT_INTERVAL,
+    Checkpoint,
+    get_job_key,
+    get_scorer_name,
+)
+from .scoring import Candidate, index_of_coincidence
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
+    from enigma.config import ReflectorConfig
+
+    from .scoring import Scorer
+
+ROTOR_COUNT: Final = 3
+POSITION_COUNT: Final = LETTER_COUNT**ROTOR_COUNT
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """Rotor order and the range of start states to try."""
+
+    rotors: tuple[AvailableRotor, ...]
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    candidates: list[Candidate]
+    decrypts: int
+    elapsed: float
+    # Time spent writing checkpoints, included in elapsed.
+    checkpoint_seconds: float = 0.0
+
+    @property
+    def decrypts_per_second(self) -> float:
+        return self.decrypts / self.elapsed if self.elapsed else 0.0
+
+
+def get_work_units(
+    rotors: Iterable[AvailableRotor] | None = None,
+    unit_size: int = POSITION_COUNT,
+) -> list[WorkUnit]:
+    """
+    Partition every ordered choice of three rotors and start positions.
+
+    Rotors are taken in AvailableRotor order so work units are the same from
+    one process to another.
+    """
+    if unit_size < 1:
+        msg = f"unit_size must be at least one, {unit_size} given"
+        raise ValueError(msg)
+
+    available = set(
+        AvailableRotor.get_normal_rotors() if rotors is None else rotors,
+    )
+    ordered = [rotor for rotor in AvailableRotor if rotor in available]
+
+    return [
+        WorkUnit(order, start, min(start + unit_size, POSITION_COUNT))
+        for order in permutations(ordered, ROTOR_COUNT)
+        for start in range(0, POSITION_COUNT, unit_size)
+    ]
+
+
+def search_rotors(  # noqa: PLR0913 (Too many arguments)
+    ciphertext: str,
+    reflector: ReflectorConfig,
+    *,
+    top: int = 10,
+    rotors: Iterable[AvailableRotor] | None = None,
+    workers: int | None = None,
+    scorer: Scorer = index_of_coincidence,
+    checkpoint: Path | None = None,
+    checkpoint_interval: float = DEFAULT_INTERVAL,
+) -> SearchResult:
+    """
+    Search rotor order and start positions of a ciphertext without plugs.
+
+    Every ordered choice of three rotors and every start position is tried,
+    decryptions are scored by scorer and the top best candidates are
+    returned. Work units are spread over a process pool, or run in this
+    process when workers is 1.
+
+    When checkpoint is given, progress is saved in this file at most every
+    checkpoint_interval seconds, and the same search started again resumes
+    from it.
+    """
+    indexes = parse_letters(ciphertext.replace(" ", "").replace("\n", ""))
+    units = get_work_units(rotors)
+
+    return search_work_units(
+        indexes,
+        reflector,
+        units,
+        top=top,
+        workers=workers,
+        scorer=scorer,
+        checkpoint=checkpoint,
+        checkpoint_interval=checkpoint_interval,
+    )
+
+
+def search_work_units(  # noqa: PLR0913 (Too many arguments)
+    indexes: bytes,
+    reflector: ReflectorConfig,
+    units: Sequence[WorkUnit],
+    *,
+    top: int = 10,
+    workers: int | None = None,
+    scorer: Scorer = index_of_coincidence,
+    checkpoint: Path | None = None,
+    checkpoint_interval: float = DEFAULT_INTERVAL,
+) -> SearchResult:
+    """
+    Search work units, see search_rotors.
+
+    With a checkpoint, units done by a previous run are skipped and
+    decrypts only counts units searched by this call.
+    """
+    _check_top(top)
+    search = partial(
+        search_work_unit,
+        indexes,
+        reflector,
+        top=top,
+        scorer=scorer,
+    )
+    progress: Checkpoint | None = None
+    if checkpoint is not None:
+        progress = Checkpoint.open(
+            checkpoint,
+            get_job_key(
+                search="rotors",
+                ciphertext=indexes.hex(),
+                reflector=str(reflector),
+                units=[
+                    ([r.name for r in u.rotors], u.start, u.stop) for u in units
+                ],
+                top=top,
+                scorer=get_scorer_name(scorer),
+            ),
+            top=top,
+            interval=checkpoint_interval,
+        )
+
+    remaining = [
+        (task, unit)
+        for task, unit in enumerate(units)
+        if progress is None or not progress.is_done(task)
+    ]
+    candidates: list[Candidate] = []
+
+    def add(task: int, result: list[Candidate]) -> None:
+        if progress is None:
+            candidates.extend(result)
+        else:
+            progress.add(task, result)
+
+    started = perf_counter()
+    if workers == 1:
+        for task, unit in remaining:
+            add(task, search(unit))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = {
+                executor.submit(search, unit): task for task, unit in remaining
+            }
+            for future in as_completed(futures):
+                add(futures[future], future.result())
+
+    if progress is not None:
+        progress.save()
+        candidates = progress.candidates
+    elapsed = perf_counter() - started
+
+    return SearchResult(
+        heapq.nlargest(top, candidates),
+        sum(len(unit) for _, unit in remaining),
+        elapsed,
+        progress.write_seconds if progress is not None else 0.0,
+    )
+
+
+def search_work_unit(
+    indexes: bytes,
+    reflector: ReflectorConfig,
+    unit: WorkUnit,
+    *,
+    top: int,
+    scorer: Scorer,
+) -> list[Candidate]:
+    """Try every start state of the work unit, return the top best ones."""
+    _check_top(top)
+    rotors = unit.rotors
+    engine = CompiledEnigma(_get_config(rotors, reflector, 0))
+
+    # Machine starting at state s decrypts like the one starting at AAA
+    # after s steps.
+    best: list[tuple[float, int]] = []
+    for state in range(unit.start, unit.stop):
+        engine.seek(state)
+        item = (scorer(engine.encode_indexes(indexes)), state)
+        if len(best) < top:
+            heapq.heappush(best, item)
+        elif item > best[0]:
+            heapq.heapreplace(best, item)
+
+    return [
+        Candidate(score, _get_config(rotors, reflector, state))
+        for score, state in sorted(best, reverse=True)
+    ]
+
+
+def _check_top(top: int) -> None:
+    if top < 1:
+        msg = f"top must be at least one, {top} given"
+        raise ValueError(msg)
+
+
+def _get_config(
+    rotors: Sequence[AvailableRotor],
+    reflector: ReflectorConfig,
+    state: int,
+) -> EnigmaConfig:
+    positions = get_positions(state, len(rotors))
+
+    return EnigmaConfig(
+        tuple(
+            RotorConfig(rotor, get_letter_from_index(position))
+            for rotor, position in zip(rotors, positions, strict=True)
+        ),
+        reflector,
+        (),
+    )
@@ -0,0 +1,176 @@
+"""
+Encode one message under many configurations at once, with NumPy.
+
+This module needs the optional numpy dependency.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Final
+
+import numpy as np
+
+from .compiled import (
+    LETTER_COUNT,
+    get_plug_board_table,
+    get_reflector_table,
+    get_state,
+)
+from .config import (
+    RANDOM_REFLECTORS,
+    RANDOM_ROTORS,
+    EnigmaConfig,
+    RandomConfigs,
+)
+from .encoder import get_encoder_tables
+from .helper import get_letter_index, parse_letters
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy.typing as npt
+
+# Maximum count of (config, letter) cells computed at once, bound memory used
+# by intermediate arrays.
+MAX_CELLS: Final = 1 << 22
+
+
+def encode_batch(
+    configs: Sequence[EnigmaConfig],
+    message: str,
+    *,
+    start: int = 0,
+) -> npt.NDArray[np.uint8]:
+    """
+    Encode message under each config.
+
+    Return an array of encoded letter indexes, one row per config. Rotor
+    positions and permutation lookups are computed over the whole
+    (config, letter) grid.
+    """
+    message = message.replace(" ", "").replace("\n", "")
+    letters = np.frombuffer(parse_letters(message), dtype=np.uint8)
+    encoded = np.empty((len(configs), len(letters)), dtype=np.uint8)
+
+    by_rotor_count: dict[int, list[int]] = {}
+    for index, config in enumerate(configs):
+        rotor_count = len(config.rotors_config)
+        by_rotor_count.setdefault(rotor_count, []).append(index)
+
+    batch_size = max(1, MAX_CELLS // max(1, len(letters)))
+    for indexes in by_rotor_count.values():
+        for batch_start in range(0, len(indexes), batch_size):
+            batch = indexes[batch_start : batch_start + batch_size]
+            encoded[batch] = _encode_grid(
+                [configs[i] for i in batch],
+                letters,
+                start,
+            )
+
+    return encoded
+
+
+def _encode_grid(
+    configs: Sequence[EnigmaConfig],
+    letters: npt.NDArray[np.uint8],
+    start: int,
+) -> npt.NDArray[np.uint8]:
+    """Encode letters under configs sharing the same rotor count."""
+    rotor_count = len(configs[0].rotors_config)
+
+    plugs = _as_array([get_plug_board_table(c.plugs) for c in configs])
+    reflectors = _as_array(
+        [
+            get_reflector_table(
+                c.reflector_config.encoder,
+                c.reflector_config.position,
+            )[:LETTER_COUNT]
+            for c in configs
+        ],
+    )
+    tables = [
+        [get_encoder_tables(r.encoder) for r in c.rotors_config]
+        for c in configs
+    ]
+    forward = [
+        _as_array([t[rotor][0] for t in tables]) for rotor in range(rotor_count)
+    ]
+    reverse = [
+        _as_array([t[rotor][1] for t in tables]) for rotor in range(rotor_count)
+    ]
+
+    origins = np.array(
+        [
+            get_state(get_letter_index(r.position) for r in c.rotors_config)
+            for c in configs
+        ],
+        dtype=np.int64,
+    )
+    steps = np.arange(start + 1, start + 1 + len(letters), dtype=np.int64)
+    states = (origins[:, np.newaxis] + steps) % LETTER_COUNT**rotor_count
+
+    positions = []
+    for _ in range(rotor_count):
+        states, position = np.divmod(states, LETTER_COUNT)
+        positions.append(position.astype(np.uint8))
+    # positions were computed from the fastest rotor, the last one.
+    positions.reverse()
+
+    grid = np.broadcast_to(letters, (len(configs), len(letters)))
+    grid = _lookup(plugs, grid)
+    for rotor in reversed(range(rotor_count)):
+        grid = _lookup(forward[rotor], (grid + positions[rotor]) % LETTER_COUNT)
+    grid = _lookup(reflectors, grid)
+    for rotor in range(rotor_count):
+        grid = (
+            _lookup(reverse[rotor], grid) + LETTER_COUNT - positions[rotor]
+        ) % LETTER_COUNT
+
+    return _lookup(plugs, grid)
+
+
+def _as_array(tables: Sequence[bytes]) -> npt.NDArray[np.uint8]:
+    return np.frombuffer(b"".join(tables), dtype=np.uint8).reshape(
+        len(tables),
+        LETTER_COUNT,
+    )
+
+
+def _lookup(
+    tables: npt.NDArray[np.uint8],
+    grid: npt.NDArray[np.uint8],
+) -> npt.NDArray[np.uint8]:
+    """Permute each grid row with the table of the same row."""
+    return np.take_along_axis(tables, grid, axis=1)
+
+
+def generate_random_batch(
+    count: int,
+    plug_count: int,
+    rng: np.random.Generator,
+) -> RandomConfigs:
+    """
+    Draw count random configs at once, see EnigmaConfig.generate_random_batch.
+
+    Rotors and plug letters are the first columns of one random permutation
+    per config, given by sorting uniform keys.
+
+    >>> batch = generate_random_batch(2, 10, np.random.default_rng(0))
+    >>> len(set(batch[0].as_dict()["plugin_board"].replace(" ", "")))
+    20
+    """
+    rotor_count = EnigmaConfig.MIN_ROTOR_COUNT
+    rotors = rng.random((count, len(RANDOM_ROTORS))).argsort(axis=1)
+    positions = rng.integers(LETTER_COUNT, size=(count, rotor_count))
+    reflectors = rng.integers(len(RANDOM_REFLECTORS), size=count)
+    reflector_positions = rng.integers(LETTER_COUNT, size=count)
+    plugs = rng.random((count, LETTER_COUNT)).argsort(axis=1)
+
+    return RandomConfigs(
+        rotors[:, :rotor_count].astype(np.uint8).tobytes(),
+        positions.astype(np.uint8).tobytes(),
+        reflectors.astype(np.uint8).tobytes(),
+        reflector_positions.astype(np.uint8).tobytes(),
+        plugs[:, : 2 * plug_count].astype(np.uint8).tobytes(),
+        plug_count,
+    )
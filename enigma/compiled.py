@@ -0,0 +1,627 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from string import ascii_uppercase
+from threading import Lock
+from typing import TYPE_CHECKING, Final, Protocol
+
+from .helper import get_letter_from_index, get_letter_index
+from .plug_board import PlugBoard
+from .rotor import Reflector, Rotor
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+
+    from .available import AvailableReflector, AvailableRotor
+    from .config import EnigmaConfig
+    from .plug_board import Plug
+
+LETTER_COUNT: Final = len(ascii_uppercase)
+
+_identity: Final = bytes(range(LETTER_COUNT))
+
+# bytes.translate need a 256 bytes table, bytes after the alphabet are left
+# untouched.
+_padding: Final = bytes(range(LETTER_COUNT, 256))
+
+ScramblerKey = tuple[
+    tuple["AvailableRotor", ...],
+    "AvailableReflector",
+    str,
+]
+
+RotorTables = tuple["Sequence[bytes]", "Sequence[bytes]"]
+
+# Tables built so far, or set by a process which built them.
+_rotor_tables: Final[dict[AvailableRotor, RotorTables]] = {}
+_reflector_tables: Final[dict[tuple[AvailableReflector, str], bytes]] = {}
+
+
+def get_rotor_tables(rotor: AvailableRotor) -> RotorTables:
+    """
+    Get forward and reverse translate tables of rotor, one per position.
+
+    Tables are built from Rotor itself, so the compiled engine can't diverge
+    from the object chain.
+    """
+    if (tables := _rotor_tables.get(rotor)) is not None:
+        return tables
+
+    forward = []
+    reverse = []
+    for position in ascii_uppercase:
+        encoder = Rotor(rotor, position, _no_turnover)
+        forward.append(bytes(encoder.encode(x) for x in _identity) + _padding)
+        reverse.append(
+            bytes(encoder.encode_reverse(x) for x in _identity) + _padding,
+        )
+
+    tables = _rotor_tables[rotor] = (tuple(forward), tuple(reverse))
+
+    return tables
+
+
+def set_rotor_tables(rotor: AvailableRotor, tables: RotorTables) -> None:
+    """Use tables get_rotor_tables returned in another process."""
+    _rotor_tables[rotor] = tables
+
+
+def get_reflector_table(reflector: AvailableReflector, position: str) -> bytes:
+    if (table := _reflector_tables.get((reflector, position))) is not None:
+        return table
+
+    encoder = Reflector(reflector, position)
+    table = bytes(encoder.encode(x) for x in _identity) + _padding
+    _reflector_tables[reflector, position] = table
+
+    return table
+
+
+def set_reflector_table(
+    reflector: AvailableReflector,
+    position: str,
+    table: bytes,
+) -> None:
+    """Use a table get_reflector_table returned in another process."""
+    _reflector_tables[reflector, position] = table
+
+
+def get_scrambler_key(config: EnigmaConfig) -> ScramblerKey:
+    """Get slow rotors and reflector, machines sharing them share tables."""
+    reflector_config = config.reflector_config
+
+    return (
+        tuple(c.encoder for c in config.rotors_config[:-1]),
+        reflector_config.encoder,
+        reflector_config.position,
+    )
+
+
+def get_plug_board_table(plugs: Sequence[Plug]) -> bytes:
+    plug_board = PlugBoard(*plugs, turnover=_no_turnover)
+
+    return bytes(plug_board.encode(x) for x in _identity)
+
+
+@lru_cache(maxsize=1024)
+def get_fast_rotor_tables(
+    plugs: bytes,
+    rotor: AvailableRotor,
+) -> tuple[tuple[bytes, ...], tuple[bytes, ...]]:
+    """
+    Get entry and exit tables of plug board and fast rotor, per position.
+
+    Machines sharing plug board and fast rotor share these tables.
+    """
+    forward_tables, reverse_tables = get_rotor_tables(rotor)
+    entries = tuple(
+        plugs.translate(forward) + _padding for forward in forward_tables
+    )
+    exits = tuple(
+        reverse[:LETTER_COUNT].translate(plugs + _padding) + _padding
+        for reverse in reverse_tables
+    )
+
+    return entries, exits
+
+
+def _no_turnover() -> None:
+    pass
+
+
+def get_state(positions: Iterable[int]) -> int:
+    """
+    Get the odometer state of rotors positions, last rotor is the fastest.
+
+    >>> get_state([0, 1, 2])
+    28
+    """
+    state = 0
+    for position in positions:
+        state = state * LETTER_COUNT + position
+
+    return state
+
+
+def get_positions(state: int, rotor_count: int) -> tuple[int, ...]:
+    """
+    Get rotors positions of an odometer state.
+
+    >>> get_positions(28, 3)
+    (0, 1, 2)
+    """
+    positions = []
+    for _ in range(rotor_count):
+        state, position = divmod(state, LETTER_COUNT)
+        positions.append(position)
+
+    return tuple(reversed(positions))
+
+
+def check_step(step: int) -> None:
+    if step < 0:
+        msg = f"step must be positive, {step} given"
+        raise ValueError(msg)
+
+
+class ScramblerSource(Protocol):
+    def get(
+        self,
+        key: ScramblerKey,
+        state: int,
+        build: Callable[[], bytes],
+    ) -> bytes:
+        """Get the table of key at state, calling build when unknown."""
+        ...
+
+
+class ScramblerCache:
+    """
+    LRU cache of permutations of slow rotors and reflector, within max_bytes.
+
+    These permutations don't depend on plug board nor on fast rotor, machines
+    only differing by their plugs share them. Tables are keyed by slow rotors
+    order, reflector and slow rotors state.
+    """
+
+    TABLE_SIZE: Final = 256
+    DEFAULT_MAX_BYTES: Final = 16 << 20
+
+    __slots__ = ("_lock", "_max_bytes", "_tables", "hits", "misses")
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._tables: OrderedDict[tuple[ScramblerKey, int], bytes] = (
+            OrderedDict()
+        )
+        # Threads can share the cache, insertions and evictions are locked.
+        self._lock = Lock()
+        self._max_bytes = 0
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __reduce__(self) -> str | tuple[type[ScramblerCache], tuple[int]]:
+        # Locks don't pickle and tables are only a cache: copies start empty,
+        # and the shared cache unpickles as the shared cache of the process.
+        if self is scrambler_cache:
+            return "scrambler_cache"
+
+        return type(self), (self._max_bytes,)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of cached tables."""
+        return len(self._tables) * self.TABLE_SIZE
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int) -> None:
+        if max_bytes < 0:
+            msg = f"max_bytes must be positive, {max_bytes} given"
+            raise ValueError(msg)
+
+        with self._lock:
+            self._max_bytes = max_bytes
+            while self.nbytes > max_bytes:
+                self._tables.popitem(last=False)
+
+    def get(
+        self,
+        key: ScramblerKey,
+        state: int,
+        build: Callable[[], bytes],
+    ) -> bytes:
+        """Get the table of key at state, build and store it when missing."""
+        # Hits take no lock: a table evicted by another thread in between
+        # raises KeyError, and is rebuilt like a miss.
+        try:
+            table = self._tables[key, state]
+            self._tables.move_to_end((key, state))
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return table
+
+        table = build()
+        with self._lock:
+            if self._max_bytes >= self.TABLE_SIZE:
+                while self.nbytes + self.TABLE_SIZE > self._max_bytes:
+                    self._tables.popitem(last=False)
+                self._tables[key, state] = table
+
+        return table
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self.hits = self.misses = 0
+
+
+scrambler_cache: Final = ScramblerCache()
+
+
+class _ScramblerTables:
+    """Tables of every slow state of one machine, built once, only read."""
+
+    __slots__ = ("_tables",)
+
+    def __init__(self, tables: tuple[bytes, ...]) -> None:
+        self._tables = tables
+
+    def get(
+        self,
+        key: ScramblerKey,  # noqa: ARG002 (tables of a single machine)
+        state: int,
+        build: Callable[[], bytes],  # noqa: ARG002 (nothing is missing)
+    ) -> bytes:
+        return self._tables[state]
+
+
+class CompiledEnigma:
+    """
+    Enigma folding plug board, rotors and reflector in one permutation.
+
+    There is one permutation per machine state. Rotors step like an odometer
+    whose last rotor is the fastest wheel, so the machine state is a single
+    integer. The fast rotor and the plug board only depend on the last digit
+    of the state and the slow rotors on the other ones, so a message can be
+    encoded with a few bytes.translate calls per 26 letters.
+
+    Tables of slow rotors and reflector are taken from scramblers, the shared
+    scrambler_cache by default.
+    """
+
+    __slots__ = (
+        "_core",
+        "_core_rotors",
+        "_core_state",
+        "_entries",
+        "_exits",
+        "_fast_rotor",
+        "_inner",
+        "_inner_state",
+        "_middle_rotor",
+        "_origin",
+        "_period",
+        "_plugs",
+        "_reflector",
+        "_rotor_count",
+        "_scrambler_key",
+        "_scramblers",
+        "_state",
+    )
+
+    def __init__(
+        self,
+        config: EnigmaConfig,
+        scramblers: ScramblerSource | None = None,
+    ) -> None:
+        rotors_config = config.rotors_config
+        reflector_config = config.reflector_config
+
+        self._plugs = get_plug_board_table(config.plugs)
+
+        *slow_rotors, self._fast_rotor = (c.encoder for c in rotors_config)
+        # Loaded on first encoding, idle machines stay small.
+        self._entries: tuple[bytes, ...] = ()
+        self._exits: tuple[bytes, ...] = ()
+
+        *self._core_rotors, self._middle_rotor = (
+            get_rotor_tables(rotor) for rotor in slow_rotors
+        )
+        self._reflector = get_reflector_table(
+            reflector_config.encoder,
+            reflector_config.position,
+        )
+        self._scramblers: ScramblerSource = (
+            scrambler_cache if scramblers is None else scramblers
+        )
+        self._scrambler_key = get_scrambler_key(config)
+
+        self._rotor_count = len(rotors_config)
+        self._origin = get_state(
+            get_letter_index(c.position) for c in rotors_config
+        )
+        self._period = LETTER_COUNT ** len(rotors_config)
+        self._state = self._origin
+
+        self._inner_state = self._core_state = -1
+        self._inner = self._core = b""
+
+    @property
+    def state(self) -> int:
+        """Rotor positions, as the digits of a base 26 integer."""
+        return self._state
+
+    @state.setter
+    def state(self, state: int) -> None:
+        if not 0 <= state < self._period:
+            msg = f"state must be in range({self._period}), {state} given"
+            raise ValueError(msg)
+
+        self._state = state
+
+    def copy(
+        self,
+        scramblers: ScramblerSource | None = None,
+    ) -> CompiledEnigma:
+        """
+        Get an engine in the same state, sharing every table.
+
+        Slow rotors tables of the copy are taken from scramblers when given.
+        """
+        engine = CompiledEnigma.__new__(CompiledEnigma)
+        state = {name: getattr(self, name) for name in self.__slots__}
+        if scramblers is not None:
+            state.update(_scramblers=scramblers, _inner_state=-1)
+        for name, value in state.items():
+            setattr(engine, name, value)
+
+        return engine
+
+    def frozen(self) -> CompiledEnigma:
+        """
+        Get a copy whose slow rotors tables are all built up front.
+
+        The copy never goes through scramblers again: encode_at only reads
+        immutable tables, so threads can share it without locks.
+        """
+        if isinstance(self._scramblers, _ScramblerTables):
+            return self
+
+        slow_period = self._period // LETTER_COUNT
+        cores = [
+            self._build_core(core_state)
+            for core_state in range(slow_period // LETTER_COUNT)
+        ]
+        tables = tuple(
+            self._build_inner(slow_state, cores.__getitem__)
+            for slow_state in range(slow_period)
+        )
+
+        return self.copy(_ScramblerTables(tables))
+
+    def get_inner_tables(
+        self,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> bytes:
+        """
+        Get slow rotors and reflector tables of slow states start to stop.
+
+        Tables are joined, the one of slow state s starts at
+        (s - start) * ScramblerCache.TABLE_SIZE.
+        """
+        if stop is None:
+            stop = self._period // LETTER_COUNT
+
+        return b"".join(map(self._lookup_inner, range(start, stop)))
+
+    def make_step(self) -> None:
+        self._state = (self._state + 1) % self._period
+
+    def seek(self, step: int) -> None:
+        """Set rotors as if step letters were encoded from the initial ones."""
+        check_step(step)
+        self._state = (self._origin + step) % self._period
+
+    def position_at(self, step: int) -> tuple[str, ...]:
+        """Get rotors positions after step letters were encoded."""
+        check_step(step)
+        state = (self._origin + step) % self._period
+
+        return tuple(
+            get_letter_from_index(position)
+            for position in get_positions(state, self._rotor_count)
+        )
+
+    def encode(self, letter: int) -> int:
+        if not self._entries:
+            self._load_fast_rotor_tables()
+
+        slow_state, fast_position = divmod(self._state, LETTER_COUNT)
+        inner = self._get_inner(slow_state)
+
+        return self._exits[fast_position][
+            inner[self._entries[fast_position][letter]]
+        ]
+
+    def get_permutations(self, count: int) -> list[bytes]:
+        """Step count times, get the permutation of each machine state."""
+        if not self._entries:
+            self._load_fast_rotor_tables()
+
+        permutations = []
+        for _ in range(count):
+            self.make_step()
+            slow_state, fast_position = divmod(self._state, LETTER_COUNT)
+            permutations.append(
+                self._entries[fast_position][:LETTER_COUNT]
+                .translate(self._get_inner(slow_state))
+                .translate(self._exits[fast_position]),
+            )
+
+        return permutations
+
+    def encode_indexes(self, indexes: bytes) -> bytes:
+        """
+        Step and encode each letter index, as encode_letter would do.
+
+        Letters are laid out in rows of 26 letters sharing the same slow
+        rotors, the columns sharing the same fast rotor position.
+        """
+        if len(indexes) < LETTER_COUNT:
+            # Column passes cost more than they save on a few letters.
+            encoded = bytearray()
+            for index in indexes:
+                self.make_step()
+                encoded.append(self.encode(index))
+
+            return bytes(encoded)
+
+        if not self._entries:
+            self._load_fast_rotor_tables()
+
+        first_state = (self._state + 1) % self._period
+        self._state = (self._state + len(indexes)) % self._period
+
+        return self._encode_rows(
+            first_state,
+            indexes,
+            self._entries,
+            self._exits,
+            self._get_inner,
+        )
+
+    def encode_at(self, step: int, indexes: bytes) -> bytes:
+        """
+        Encode letter indexes as the step-th and following letters.
+
+        Unlike encode_indexes, the engine is left untouched: tables are only
+        read, so threads can share one engine.
+        """
+        check_step(step)
+        entries, exits = get_fast_rotor_tables(self._plugs, self._fast_rotor)
+        state = (self._origin + step) % self._period
+
+        if len(indexes) >= LETTER_COUNT:
+            return self._encode_rows(
+                (state + 1) % self._period,
+                indexes,
+                entries,
+                exits,
+                self._lookup_inner,
+            )
+
+        encoded = bytearray()
+        for index in indexes:
+            state = (state + 1) % self._period
+            slow_state, position = divmod(state, LETTER_COUNT)
+            inner = self._lookup_inner(slow_state)
+            encoded.append(exits[position][inner[entries[position][index]]])
+
+        return bytes(encoded)
+
+    def _encode_rows(
+        self,
+        first_state: int,
+        indexes: bytes,
+        entries: Sequence[bytes],
+        exits: Sequence[bytes],
+        get_inner: Callable[[int], bytes],
+    ) -> bytes:
+        slow_state, offset = divmod(first_state, LETTER_COUNT)
+        slow_period = self._period // LETTER_COUNT
+
+        buffer = bytearray(offset) + indexes
+
+        for position, entry in enumerate(entries):
+            buffer[position::LETTER_COUNT] = buffer[
+                position::LETTER_COUNT
+            ].translate(entry)
+
+        for start in range(0, len(buffer), LETTER_COUNT):
+            stop = start + LETTER_COUNT
+            inner = get_inner(slow_state)
+            buffer[start:stop] = buffer[start:stop].translate(inner)
+            slow_state = (slow_state + 1) % slow_period
+
+        for position, exit_ in enumerate(exits):
+            buffer[position::LETTER_COUNT] = buffer[
+                position::LETTER_COUNT
+            ].translate(exit_)
+
+        return bytes(buffer[offset:])
+
+    def _load_fast_rotor_tables(self) -> None:
+        self._entries, self._exits = get_fast_rotor_tables(
+            self._plugs,
+            self._fast_rotor,
+        )
+
+    def _get_inner(self, slow_state: int) -> bytes:
+        """Get the table of slow rotors and reflector, between fast rotor."""
+        if slow_state != self._inner_state:
+            self._inner = self._scramblers.get(
+                self._scrambler_key,
+                slow_state,
+                lambda: self._build_inner(slow_state, self._get_core),
+            )
+            self._inner_state = slow_state
+
+        return self._inner
+
+    def _lookup_inner(self, slow_state: int) -> bytes:
+        """Get the table of slow_state like _get_inner, keeping no state."""
+        return self._scramblers.get(
+            self._scrambler_key,
+            slow_state,
+            lambda: self._build_inner(slow_state, self._build_core),
+        )
+
+    def _build_inner(
+        self,
+        slow_state: int,
+        get_core: Callable[[int], bytes],
+    ) -> bytes:
+        core_state, position = divmod(slow_state, LETTER_COUNT)
+        forward, reverse = self._middle_rotor
+
+        return (
+            forward[position][:LETTER_COUNT]
+            .translate(get_core(core_state))
+            .translate(reverse[position])
+        ) + _padding
+
+    def _get_core(self, core_state: int) -> bytes:
+        """Get the table of the slowest rotors and reflector."""
+        if core_state != self._core_state:
+            self._core = self._build_core(core_state)
+            self._core_state = core_state
+
+        return self._core
+
+    def _build_core(self, core_state: int) -> bytes:
+        forward_tables = []
+        reverse_tables = []
+        digits = core_state
+        for forward, reverse in self._core_rotors[::-1]:
+            digits, position = divmod(digits, LETTER_COUNT)
+            forward_tables.append(forward[position])
+            reverse_tables.append(reverse[position])
+
+        core = _identity
+        for table in forward_tables:
+            core = core.translate(table)
+        core = core.translate(self._reflector)
+        for table in reversed(reverse_tables):
+            core = core.translate(table)
+
+        return core + _padding
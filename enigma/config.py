@@ -1,10 +1,12 @@
 from abc import ABC
 from collections.abc import Sequence
 from dataclasses import dataclass
+from math import perm
+from random import Random, SystemRandom
 from secrets import choice
 from string import ascii_uppercase
-from typing import Any, Final, Self, TypedDict
-from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Final, Self, TypedDict, overload
+from collections.abc import Iterable, Iterator
 from collections.abc import Container
 
 from .available import AvailableReflector, AvailableRotor
@@ -12,12 +14,31 @@ from .helper import (
     batched,
     choices,
     choices_unique,
+    get_letter_index,
     is_single_ascii_uppercase_letter,
+    pick_unique,
 )
-from .plug_board import Plug, PlugBoard
+from .plug_board import (
+    Plug,
+    PlugBoard,
+    count_plug_choices,
+    rank_plugs,
+    unrank_plugs,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 name_position_separator: Final = ":"
 
+_rotors: Final = tuple(AvailableRotor)
+_reflectors: Final = tuple(AvailableReflector)
+_rotor_indexes: Final = {rotor: i for i, rotor in enumerate(_rotors)}
+_reflector_indexes: Final = {r: i for i, r in enumerate(_reflectors)}
+
+_LETTER_COUNT: Final = len(ascii_uppercase)
+_ROTOR_COUNTS: Final = 2
+
 
 class AbstractRotorConfig(ABC):
     encoder: AvailableRotor | AvailableReflector
@@ -65,6 +86,7 @@ class EnigmaConfig:
 
     MIN_ROTOR_COUNT: Final = 3
     MAX_ROTOR_COUNT: Final = 4
+    PACKED_SIZE: Final = 16
 
     def __post_init__(self) -> None:
         rotors = self.rotors_config
@@ -115,6 +137,83 @@ class EnigmaConfig:
             "plugin_board": " ".join(f"{p.left}{p.right}" for p in self.plugs),
         }
 
+    def to_bytes(self) -> bytes:
+        """
+        Pack config in PACKED_SIZE bytes, the debug flag is not kept.
+
+        Fields are the digits of one mixed radix integer, in 95 bits: rotor
+        and position of each slot, reflector and its position, plugs rank,
+        plug count and rotor count. Rotors and reflector are their index in
+        AvailableRotor and AvailableReflector definition order. Plugs are
+        ranked as a set, configs only differing by plugs order pack the
+        same.
+        """
+        rotors = self.rotors_config
+        if len(self.plugs) > PlugBoard.MAX_PLUG_COUNT:
+            msg = f"config has {len(self.plugs)} plugs, can't be packed"
+            raise ValueError(msg)
+
+        rank = 0
+        for slot in range(self.MAX_ROTOR_COUNT):
+            rotor = position = 0
+            if slot < len(rotors):
+                rotor = _rotor_indexes[rotors[slot].encoder]
+                position = get_letter_index(rotors[slot].position)
+            rank = (rank * len(_rotors) + rotor) * _LETTER_COUNT + position
+
+        reflector = self.reflector_config
+        digits = (
+            (_reflector_indexes[reflector.encoder], len(_reflectors)),
+            (get_letter_index(reflector.position), _LETTER_COUNT),
+            (rank_plugs(self.plugs), count_plug_choices(len(self.plugs))),
+            (len(self.plugs), PlugBoard.MAX_PLUG_COUNT + 1),
+            (len(rotors) - self.MIN_ROTOR_COUNT, _ROTOR_COUNTS),
+        )
+        for digit, base in digits:
+            rank = rank * base + digit
+
+        return rank.to_bytes(self.PACKED_SIZE, "little")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """Unpack a config packed by to_bytes."""
+        if len(data) != cls.PACKED_SIZE:
+            msg = f"packed config must be {cls.PACKED_SIZE} bytes, {len(data)} given"
+            raise ValueError(msg)
+
+        packed = int.from_bytes(data, "little")
+        rank, rotor_count = divmod(packed, _ROTOR_COUNTS)
+        rotor_count += cls.MIN_ROTOR_COUNT
+        rank, plug_count = divmod(rank, PlugBoard.MAX_PLUG_COUNT + 1)
+        rank, plugs_rank = divmod(rank, count_plug_choices(plug_count))
+        rank, reflector_position = divmod(rank, _LETTER_COUNT)
+        rank, reflector = divmod(rank, len(_reflectors))
+
+        slots = []
+        for _ in range(cls.MAX_ROTOR_COUNT):
+            rank, position = divmod(rank, _LETTER_COUNT)
+            rank, rotor = divmod(rank, len(_rotors))
+            slots.append((rotor, position))
+        slots.reverse()
+
+        # Unused digits are zero, so each config has a single packing.
+        unused = [digit for slot in slots[rotor_count:] for digit in slot]
+        if rank or any(unused):
+            msg = "packed config is out of range"
+            raise ValueError(msg)
+
+        return cls(
+            tuple(
+                RotorConfig(_rotors[rotor], ascii_uppercase[position])
+                for rotor, position in slots[:rotor_count]
+            ),
+            ReflectorConfig(
+                _reflectors[reflector],
+                ascii_uppercase[reflector_position],
+            ),
+            unrank_plugs(plugs_rank, plug_count),
+        )
+
     @classmethod
     def parse(
         cls,
@@ -152,6 +251,107 @@ class EnigmaConfig:
             plugs=tuple(cls._generate_random_plugs(plug_count)),
         )
 
+    @classmethod
+    def generate_random_configs(
+        cls,
+        count: int,
+        plug_count: int = 0,
+        *,
+        rng: "Random | np.random.Generator | None" = None,
+    ) -> Iterator["EnigmaConfig"]:
+        """Lazily generate count random configs, by batches."""
+        for start in range(0, count, RANDOM_BATCH_SIZE):
+            yield from cls.generate_random_batch(
+                min(RANDOM_BATCH_SIZE, count - start),
+                plug_count,
+                rng=rng,
+            )
+
+    @classmethod
+    def generate_random_batch(
+        cls,
+        count: int,
+        plug_count: int = 0,
+        *,
+        rng: "Random | np.random.Generator | None" = None,
+    ) -> "RandomConfigs":
+        """
+        Generate count random configs with three rotors, in compact form.
+
+        Random numbers are drawn from rng, secrets.SystemRandom by default: a
+        seeded random.Random gives reproducible configs for tests and
+        simulations, never use it for real keys. Each config is decoded from
+        a single draw over every choice of rotors, positions, reflector and
+        its position and plugs, so rotors and plug letters are never
+        repeated.
+
+        A numpy.random.Generator draws the whole batch in a few array
+        operations, it needs the optional numpy dependency.
+        """
+        if plug_count > PlugBoard.MAX_PLUG_COUNT:
+            msg = (
+                f"plug_count must be at most {PlugBoard.MAX_PLUG_COUNT},"
+                f" {plug_count} given"
+            )
+            raise ValueError(msg)
+
+        if rng is not None and not isinstance(rng, Random):
+            from .batch import (  # noqa: PLC0415 (optional numpy)
+                generate_random_batch,
+            )
+
+            return generate_random_batch(count, plug_count, rng)
+
+        randrange = (SystemRandom() if rng is None else rng).randrange
+        rotor_count = cls.MIN_ROTOR_COUNT
+        letter_count = len(ascii_uppercase)
+        rotor_indexes = range(len(RANDOM_ROTORS))
+        letter_indexes = range(letter_count)
+
+        rotors_choices = perm(len(RANDOM_ROTORS), rotor_count)
+        positions_choices = letter_count**rotor_count
+        plugs_choices = perm(letter_count, plug_count * 2)
+        choices_count = (
+            rotors_choices
+            * positions_choices
+            * len(RANDOM_REFLECTORS)
+            * letter_count
+            * plugs_choices
+        )
+
+        rotors = bytearray()
+        positions = bytearray()
+        reflectors = bytearray()
+        reflector_positions = bytearray()
+        plugs = bytearray()
+        for _ in range(count):
+            draw = randrange(choices_count)
+            draw, rotors_draw = divmod(draw, rotors_choices)
+            draw, positions_draw = divmod(draw, positions_choices)
+            draw, reflector_draw = divmod(draw, len(RANDOM_REFLECTORS))
+            plugs_draw, reflector_position = divmod(draw, letter_count)
+
+            rotors += bytes(
+                pick_unique(rotor_indexes, rotor_count, rotors_draw),
+            )
+            for _ in range(rotor_count):
+                positions_draw, position = divmod(positions_draw, letter_count)
+                positions.append(position)
+            reflectors.append(reflector_draw)
+            reflector_positions.append(reflector_position)
+            plugs += bytes(
+                pick_unique(letter_indexes, plug_count * 2, plugs_draw),
+            )
+
+        return RandomConfigs(
+            bytes(rotors),
+            bytes(positions),
+            bytes(reflectors),
+            bytes(reflector_positions),
+            bytes(plugs),
+            plug_count,
+        )
+
     @classmethod
     def _generate_random_rotors_config(cls) -> Iterable[RotorConfig]:
         rotors = iter(
@@ -182,6 +382,156 @@ class EnigmaConfig:
             yield Plug(*plug)
 
 
+RANDOM_ROTORS: Final = tuple(
+    r for r in AvailableRotor if r in AvailableRotor.get_normal_rotors()
+)
+RANDOM_REFLECTORS: Final = tuple(
+    r
+    for r in AvailableReflector
+    if r in AvailableReflector.get_normal_reflectors()
+)
+RANDOM_BATCH_SIZE: Final = 1024
+
+
+@dataclass(frozen=True)
+class RandomConfigs(Sequence[EnigmaConfig]):
+    """
+    Configs with three rotors and plug_count plugs, one byte per item.
+
+    Rotors and reflectors are indexes in RANDOM_ROTORS and RANDOM_REFLECTORS,
+    positions, reflector positions and plugs are letter indexes.
+    """
+
+    rotors: bytes
+    positions: bytes
+    reflectors: bytes
+    reflector_positions: bytes
+    plugs: bytes
+    plug_count: int
+
+    def __len__(self) -> int:
+        return len(self.reflectors)
+
+    @overload
+    def __getitem__(self, index: int) -> EnigmaConfig:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[EnigmaConfig]:
+        ...
+
+    def __getitem__(
+        self,
+        index: int | slice,
+    ) -> EnigmaConfig | Sequence[EnigmaConfig]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+
+        index = range(len(self))[index]
+        rotors = slice(index * 3, index * 3 + 3)
+        plug_length = self.plug_count * 2
+        letters = self.plugs[index * plug_length : (index + 1) * plug_length]
+
+        return EnigmaConfig(
+            rotors_config=tuple(
+                RotorConfig(RANDOM_ROTORS[rotor], ascii_uppercase[position])
+                for rotor, position in zip(
+                    self.rotors[rotors],
+                    self.positions[rotors],
+                    strict=True,
+                )
+            ),
+            reflector_config=ReflectorConfig(
+                RANDOM_REFLECTORS[self.reflectors[index]],
+                ascii_uppercase[self.reflector_positions[index]],
+            ),
+            plugs=tuple(
+                Plug(ascii_uppercase[left], ascii_uppercase[right])
+                for left, right in zip(
+                    letters[::2],
+                    letters[1::2],
+                    strict=True,
+                )
+            ),
+        )
+
+
+class ConfigArray(Sequence[EnigmaConfig]):
+    """
+    Configs packed by EnigmaConfig.to_bytes in one contiguous buffer.
+
+    Each config takes EnigmaConfig.PACKED_SIZE bytes, configs are unpacked on
+    access.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, configs: Iterable[EnigmaConfig] = ()) -> None:
+        self._data = bytearray()
+        self.extend(configs)
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> Self:
+        """Get the array of configs packed in data, as tobytes returns."""
+        if len(data) % EnigmaConfig.PACKED_SIZE:
+            msg = (
+                f"data size must be a multiple of {EnigmaConfig.PACKED_SIZE},"
+                f" {len(data)} given"
+            )
+            raise ValueError(msg)
+
+        array = cls()
+        array._data[:] = data
+
+        return array
+
+    def tobytes(self) -> bytes:
+        return bytes(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data)
+
+    def append(self, config: EnigmaConfig) -> None:
+        self._data += config.to_bytes()
+
+    def extend(self, configs: Iterable[EnigmaConfig]) -> None:
+        self._data += b"".join(config.to_bytes() for config in configs)
+
+    def __len__(self) -> int:
+        return len(self._data) // EnigmaConfig.PACKED_SIZE
+
+    @overload
+    def __getitem__(self, index: int) -> EnigmaConfig:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Self:
+        ...
+
+    def __getitem__(self, index: int | slice) -> EnigmaConfig | Self:
+        size = EnigmaConfig.PACKED_SIZE
+        if isinstance(index, slice):
+            return self.frombytes(
+                b"".join(
+                    self._data[i * size : (i + 1) * size]
+                    for i in range(len(self))[index]
+                ),
+            )
+
+        index = range(len(self))[index]
+
+        return EnigmaConfig.from_bytes(
+            bytes(self._data[index * size : (index + 1) * size]),
+        )
+
+    def __setitem__(self, index: int, config: EnigmaConfig) -> None:
+        size = EnigmaConfig.PACKED_SIZE
+        index = range(len(self))[index]
+
+        self._data[index * size : (index + 1) * size] = config.to_bytes()
+
+
 class ConfigurationError(Exception):
     pass
 
@@ -1,4 +1,5 @@
 from collections.abc import Iterator
+from functools import cache
 from typing import Protocol
 
 from .available import AvailableRotor, AvailableReflector
@@ -17,16 +18,13 @@ class EncoderInterface(Protocol):
 
 
 class Encoder:
-    def __init__(self, config: AvailableRotor | AvailableReflector) -> None:
-        self._config = [
-            (idx, get_letter_index(letter)) for idx, letter in enumerate(config)
-        ]
+    __slots__ = ("_normal", "_reverse")
 
-        self._normal = dict(self._config)
-        self._reverse = {encoded: raw for raw, encoded in self._config}
+    def __init__(self, config: AvailableRotor | AvailableReflector) -> None:
+        self._normal, self._reverse = get_encoder_tables(config)
 
     def __iter__(self) -> Iterator[tuple[int, int]]:
-        yield from self._config
+        yield from enumerate(self._normal)
 
     def encode(self, letter: int) -> int:
         return self._encode(self._normal, letter)
@@ -34,5 +32,23 @@ class Encoder:
     def encode_reverse(self, letter: int) -> int:
         return self._encode(self._reverse, letter)
 
-    def _encode(self, direction: dict[int, int], letter: int) -> int:
+    def _encode(self, direction: bytes, letter: int) -> int:
         return direction[letter]
+
+
+@cache
+def get_encoder_tables(
+    config: AvailableRotor | AvailableReflector,
+) -> tuple[bytes, bytes]:
+    """
+    Get normal and reverse wiring tables of config.
+
+    Tables are computed once per config and shared by every encoder.
+    """
+    normal = bytes(get_letter_index(letter) for letter in config)
+
+    reverse = bytearray(len(normal))
+    for raw, encoded in enumerate(normal):
+        reverse[encoded] = raw
+
+    return normal, bytes(reverse)
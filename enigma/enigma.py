@@ -1,90 +1,433 @@
 from __future__ import annotations
 
+import warnings
+from dataclasses import dataclass
+from functools import partial
 from string import ascii_uppercase
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Final
 
+from .compiled import CompiledEnigma, check_step, get_positions, get_state
 from .exception import NotASCIILetterError
-from .helper import batched, get_letter_from_index, get_letter_index
+from .helper import (
+    format_groups,
+    get_letter_from_index,
+    get_letter_index,
+    get_letters_from_indexes,
+    parse_ascii_letters,
+    parse_letters,
+)
+from .normalize import normalize as normalize_text
+from .normalize import normalize_chunks
 from .plug_board import PlugBoard
 from .rotor import Reflector, Rotor
+from .tracing import LetterIn, LetterOut, PrintTracer, Stage, Step, Turnover
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
+
+    from _typeshed import (
+        ReadableBuffer,
+        SupportsRead,
+        SupportsWrite,
+        WriteableBuffer,
+    )
 
     from .config import EnigmaConfig
     from .encoder import EncoderInterface
+    from .tracing import TracerInterface
+
+
+@dataclass(frozen=True)
+class EnigmaState:
+    """Rotor positions of an Enigma, as the digits of a base 26 integer."""
+
+    rotor_count: int
+    state: int
+
+    @property
+    def positions(self) -> tuple[str, ...]:
+        """
+        Get rotor positions, as letters.
+
+        >>> EnigmaState(3, 27).positions
+        ('A', 'B', 'B')
+        """
+        return tuple(
+            get_letter_from_index(position)
+            for position in get_positions(self.state, self.rotor_count)
+        )
 
 
 class Enigma:
-    def __init__(self, config: EnigmaConfig) -> None:
+    __slots__ = (
+        "_config",
+        "_encode",
+        "_engine",
+        "_make_step",
+        "_origin",
+        "_period",
+        "_rotor_count",
+        "_rotors",
+        "_tracer",
+    )
+
+    GROUP_LENGTH: Final = 4
+    LINE_LENGTH: Final = 4
+    DEFAULT_CHUNK_SIZE: Final = 1 << 16
+
+    def __init__(
+        self,
+        config: EnigmaConfig,
+        tracer: TracerInterface | None = None,
+    ) -> None:
+        """
+        Build Enigma from config.
+
+        Without tracer, letters are encoded by CompiledEnigma and no trace
+        event is ever built. With a tracer, or when config.debug is set, the
+        rotors object chain is used so every stage can be traced.
+        """
+        if tracer is None and config.debug:
+            tracer = PrintTracer()
+
+        self._config = config
+        self._tracer = tracer
+        self._engine: CompiledEnigma | None = None
+        self._rotors: list[Rotor] = []
+
+        self._rotor_count = len(config.rotors_config)
+        self._origin = get_state(
+            get_letter_index(c.position) for c in config.rotors_config
+        )
+        self._period = len(ascii_uppercase) ** self._rotor_count
+
+        if tracer is not None:
+            self._make_step, self._encode = self._build_chain(config, tracer)
+        else:
+            self._engine = CompiledEnigma(config)
+            self._make_step = self._engine.make_step
+            self._encode = self._engine.encode
+
+    def _build_chain(
+        self,
+        config: EnigmaConfig,
+        tracer: TracerInterface,
+    ) -> tuple[Callable[[], None], Callable[[int], int]]:
         rotors_config = config.rotors_config
         reflector_config = config.reflector_config
         plugs = config.plugs
-        debug = config.debug
 
         encoders: list[EncoderInterface] = [
             Reflector(reflector_config.encoder, reflector_config.position),
         ]
+        names = [f"Reflector {reflector_config.encoder.name}"]
 
         for encoder_config in rotors_config:
-            encoders.append(
-                Rotor(
-                    encoder_config.encoder,
-                    encoder_config.position,
-                    encoders[-1].make_step,
-                ),
+            name = f"Rotor {encoder_config.encoder.name}"
+            rotor = Rotor(
+                encoder_config.encoder,
+                encoder_config.position,
+                _trace_turnover(tracer, name, encoders[-1].make_step),
             )
+            encoders.append(rotor)
+            names.append(name)
+            self._rotors.append(rotor)
         encoders.append(PlugBoard(*plugs, turnover=encoders[-1].make_step))
+        names.append("PlugBoard")
 
-        self._encode = self._chain(
-            *(r.encode for r in encoders[::-1]),
-            *(r.encode_reverse for r in encoders),
+        encode = self._chain(
+            tracer,
+            *zip(names[::-1], (r.encode for r in encoders[::-1]), strict=True),
+            *(
+                (f"{name} reverse", r.encode_reverse)
+                for name, r in zip(names, encoders, strict=True)
+            ),
         )
-        self._make_step = encoders[-1].make_step
-        self._debug = debug
 
-    def encode_message(self, message: str) -> str:
-        message = message.replace(" ", "").replace("\n", "")
-        encoded = (self.encode_letter(letter) for letter in message)
+        return encoders[-1].make_step, encode
+
+    def debug(self, message: str | None = None) -> None:
+        """
+        Print message and trace following letters, deprecated.
 
-        return "\n".join(
-            " ".join(words)
-            for words in batched(
-                ("".join(letters) for letters in batched(encoded, 4)),
-                4,
+        A PrintTracer is attached from the current rotor positions, give
+        Enigma a tracer instead.
+        """
+        warnings.warn(
+            "Enigma.debug is deprecated, give Enigma a PrintTracer instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if message is not None:
+            print(message)
+        if self._tracer is not None:
+            return
+
+        state = self.snapshot()
+        self._tracer = PrintTracer()
+        self._engine = None
+        self._make_step, self._encode = self._build_chain(
+            self._config,
+            self._tracer,
+        )
+        self.restore(state)
+
+    def seek(self, step: int) -> None:
+        """Set rotors as if step letters were encoded from the initial ones."""
+        if self._engine is not None:
+            self._engine.seek(step)
+            return
+
+        check_step(step)
+        state = (self._origin + step) % self._period
+        positions = get_positions(state, self._rotor_count)
+        for rotor, position in zip(self._rotors, positions, strict=True):
+            rotor.position = position
+
+    def snapshot(self) -> EnigmaState:
+        """Get current rotor positions, to restore them later."""
+        if self._engine is not None:
+            return EnigmaState(self._rotor_count, self._engine.state)
+
+        return EnigmaState(
+            self._rotor_count,
+            get_state(rotor.position for rotor in self._rotors),
+        )
+
+    def restore(self, state: EnigmaState) -> None:
+        """Set rotor positions as they were when state was taken."""
+        if state.rotor_count != self._rotor_count:
+            msg = (
+                f"state of a {state.rotor_count} rotors machine can't be"
+                f" restored on a {self._rotor_count} rotors one"
             )
+            raise ValueError(msg)
+
+        if self._engine is not None:
+            self._engine.state = state.state
+            return
+
+        positions = get_positions(state.state, self._rotor_count)
+        for rotor, position in zip(self._rotors, positions, strict=True):
+            rotor.position = position
+
+    def reset(self) -> None:
+        """Set rotors back to their initial positions."""
+        self.seek(0)
+
+    def clone(self) -> Enigma:
+        """
+        Get an Enigma in the same state, encoding independently.
+
+        Without tracer, the clone shares every table and costs a few
+        attributes copy. With a tracer, rotors objects are rebuilt.
+        """
+        if self._engine is None:
+            enigma = Enigma(self._config, self._tracer)
+            enigma.restore(self.snapshot())
+
+            return enigma
+
+        engine = self._engine.copy()
+        attributes = {name: getattr(self, name) for name in self.__slots__}
+        attributes.update(
+            _engine=engine,
+            _make_step=engine.make_step,
+            _encode=engine.encode,
         )
 
+        enigma = Enigma.__new__(Enigma)
+        for name, value in attributes.items():
+            setattr(enigma, name, value)
+
+        return enigma
+
+    def position_at(self, step: int) -> tuple[str, ...]:
+        """Get rotors positions after step letters were encoded."""
+        check_step(step)
+        state = (self._origin + step) % self._period
+
+        return tuple(
+            get_letter_from_index(position)
+            for position in get_positions(state, self._rotor_count)
+        )
+
+    def encode_message(
+        self,
+        message: str,
+        *,
+        start: int | None = None,
+        normalize: bool = False,
+    ) -> str:
+        """
+        Encode message, grouped by four letters and four groups per line.
+
+        When start is given, rotors are first set as if start letters were
+        encoded, so a message slice can be encoded without the letters
+        preceding it.
+
+        When normalize, message goes through enigma.normalize.normalize and
+        characters it rejects are left out, call it first to get their
+        offsets.
+        """
+        if start is not None:
+            self.seek(start)
+        if normalize:
+            message = normalize_text(message).letters
+
+        encoded = self._encode_letters(message)
+
+        return format_groups(encoded, self.GROUP_LENGTH, self.LINE_LENGTH)
+
+    def encode_chunks(
+        self,
+        chunks: Iterable[str],
+        *,
+        normalize: bool = False,
+    ) -> Iterator[str]:
+        """
+        Lazily encode a message given in chunks.
+
+        Joined output is the same as encode_message one, groups and lines
+        are carried over chunk boundaries.
+        """
+        if normalize:
+            chunks = (text.letters for text in normalize_chunks(chunks))
+
+        written = 0
+        for chunk in chunks:
+            if encoded := self._encode_letters(chunk):
+                yield format_groups(
+                    encoded,
+                    self.GROUP_LENGTH,
+                    self.LINE_LENGTH,
+                    start=written,
+                )
+                written += len(encoded)
+
+    def encode_stream(
+        self,
+        reader: SupportsRead[str],
+        writer: SupportsWrite[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        normalize: bool = False,
+    ) -> None:
+        """Encode reader content into writer, chunk_size characters at once."""
+        chunks = iter(partial(reader.read, chunk_size), "")
+
+        for encoded in self.encode_chunks(chunks, normalize=normalize):
+            writer.write(encoded)
+
+    def encode_bytes(
+        self,
+        buffer: ReadableBuffer,
+        out: WriteableBuffer | None = None,
+    ) -> None:
+        """
+        Encode ASCII letters of buffer into out, or into buffer when omitted.
+
+        Any buffer protocol object is accepted, a writable mmap can be
+        encoded in place. Letters are processed DEFAULT_CHUNK_SIZE at once,
+        so memory use does not grow with buffer size. Every byte must be an
+        ASCII letter, on error chunks before the invalid one are already
+        written.
+        """
+        with (
+            memoryview(buffer).cast("B") as letters,
+            memoryview(buffer if out is None else out).cast("B") as encoded,
+        ):
+            if encoded.readonly:
+                msg = "output buffer is read only"
+                raise TypeError(msg)
+            if len(encoded) != len(letters):
+                msg = (
+                    f"output buffer size must be {len(letters)},"
+                    f" {len(encoded)} given"
+                )
+                raise ValueError(msg)
+
+            for start in range(0, len(letters), self.DEFAULT_CHUNK_SIZE):
+                stop = start + self.DEFAULT_CHUNK_SIZE
+                indexes = parse_ascii_letters(letters[start:stop].tobytes())
+
+                if self._engine is None:
+                    indexes = bytes(self._encode_index(i) for i in indexes)
+                else:
+                    indexes = self._engine.encode_indexes(indexes)
+
+                encoded[start:stop] = get_letters_from_indexes(indexes)
+
+    def _encode_index(self, index: int) -> int:
+        return get_letter_index(
+            self.encode_letter(get_letter_from_index(index)),
+        )
+
+    def _encode_letters(self, message: str) -> str:
+        message = message.replace(" ", "").replace("\n", "")
+
+        if self._engine is None:
+            return "".join(self.encode_letter(letter) for letter in message)
+
+        indexes = self._engine.encode_indexes(parse_letters(message))
+
+        return get_letters_from_indexes(indexes).decode()
+
     def encode_letter(self, letter: str) -> str:
         self._make_step()
 
         letter = letter.upper()
-        self.debug(f"Encode {letter}:")
+        tracer = self._tracer
+        if tracer is not None:
+            tracer.trace(
+                Step(
+                    tuple(
+                        get_letter_from_index(rotor.position)
+                        for rotor in self._rotors
+                    ),
+                ),
+            )
+            tracer.trace(LetterIn(letter))
 
         if len(letter) != 1 or letter not in ascii_uppercase:
             raise NotASCIILetterError(letter)
 
         encoded = ascii_uppercase[self._encode(get_letter_index(letter))]
 
-        self.debug(f"Encoded: {letter} -> {encoded}")
+        if tracer is not None:
+            tracer.trace(LetterOut(letter, encoded))
 
         return encoded
 
-    def _chain(self, *encoders: Callable[[int], int]) -> Callable[[int], int]:
+    def _chain(
+        self,
+        tracer: TracerInterface,
+        *encoders: tuple[str, Callable[[int], int]],
+    ) -> Callable[[int], int]:
         def ret(letter: int) -> int:
-            previous_letter = get_letter_from_index(letter)
-            for encoder in encoders:
-                letter = encoder(letter)
-                self.debug(
-                    f"Converted fred"
-                    f" {previous_letter} -> {get_letter_from_index(letter)}",
+            for name, encoder in encoders:
+                encoded = encoder(letter)
+                tracer.trace(
+                    Stage(
+                        name,
+                        get_letter_from_index(letter),
+                        get_letter_from_index(encoded),
+                    ),
                 )
-                previous_letter = get_letter_from_index(letter)
+                letter = encoded
 
             return letter
 
         return ret
 
-    def debug(self, message: str) -> None:
-        if self._debug:
-            print(message)
+
+def _trace_turnover(
+    tracer: TracerInterface,
+    rotor: str,
+    turnover: Callable[[], None],
+) -> Callable[[], None]:
+    def ret() -> None:
+        tracer.trace(Turnover(rotor))
+        turnover()
+
+    return ret
@@ -9,3 +9,13 @@ class NotASCIILetterError(ValueError):
 class NotASCIIUppercaseLetterError(ValueError):
     def __init__(self, value: Any) -> None:
         super().__init__(f'"{value}" is not an ASCII uppercase letter.')
+
+
+class KeystreamFormatError(ValueError):
+    def __init__(self, path: Any, reason: str) -> None:
+        super().__init__(f'"{path}" is not a usable keystream table: {reason}.')
+
+
+class SessionNotFoundError(KeyError):
+    def __init__(self, session_id: Any) -> None:
+        super().__init__(f'"{session_id}" is not an open session.')
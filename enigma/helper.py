@@ -1,13 +1,30 @@
 from itertools import islice
 from secrets import choice, randbelow
 from string import ascii_uppercase
-from typing import TypeVar
+from typing import Final, TypeVar
 from collections.abc import Iterable, Sequence
 
-from enigma.exception import NotASCIIUppercaseLetterError
+from enigma.exception import NotASCIILetterError, NotASCIIUppercaseLetterError
 
 _ascii_uppercase = set(ascii_uppercase)
 
+INVALID_INDEX: Final = 0xFF
+
+
+def _build_letter_to_index_table() -> bytes:
+    table = bytearray([INVALID_INDEX]) * 256
+    for index, letter in enumerate(ascii_uppercase):
+        table[ord(letter)] = table[ord(letter.lower())] = index
+
+    return bytes(table)
+
+
+_letter_to_index_table = _build_letter_to_index_table()
+_index_to_letter_table = bytes.maketrans(
+    bytes(range(len(ascii_uppercase))),
+    ascii_uppercase.encode(),
+)
+
 T = TypeVar("T")
 
 
@@ -26,6 +43,93 @@ def get_letter_from_index(index: int) -> str:
     return ascii_uppercase[index]
 
 
+def get_letters_indexes(letters: bytes) -> bytes:
+    """
+    Convert ASCII letters to their indexes, in one pass.
+
+    Lowercase letters are accepted, any other byte is mapped to INVALID_INDEX.
+
+    >>> list(get_letters_indexes(b"AbZ!"))
+    [0, 1, 25, 255]
+    """
+    return letters.translate(_letter_to_index_table)
+
+
+def get_letters_from_indexes(indexes: bytes) -> bytes:
+    """
+    Convert letter indexes back to ASCII uppercase letters, in one pass.
+
+    >>> get_letters_from_indexes(bytes([0, 1, 25]))
+    b'ABZ'
+    """
+    return indexes.translate(_index_to_letter_table)
+
+
+def parse_letters(letters: str) -> bytes:
+    """
+    Get indexes of letters, raise on the first non ASCII letter.
+
+    >>> list(parse_letters("aBz"))
+    [0, 1, 25]
+    """
+    # Non ASCII characters are replaced one for one, so invalid index
+    # position is the position of the invalid letter.
+    indexes = get_letters_indexes(letters.encode("ascii", "replace"))
+
+    if (position := indexes.find(INVALID_INDEX)) >= 0:
+        raise NotASCIILetterError(letters[position].upper())
+
+    return indexes
+
+
+def parse_ascii_letters(letters: bytes) -> bytes:
+    """
+    Get indexes of ASCII letters bytes, raise on the first non letter byte.
+
+    >>> list(parse_ascii_letters(b"aBz"))
+    [0, 1, 25]
+    """
+    indexes = get_letters_indexes(letters)
+
+    if (position := indexes.find(INVALID_INDEX)) >= 0:
+        raise NotASCIILetterError(chr(letters[position]).upper())
+
+    return indexes
+
+
+def format_groups(
+    letters: str,
+    group_length: int,
+    line_length: int,
+    *,
+    start: int = 0,
+) -> str:
+    """
+    Group letters by group_length, with line_length groups per line.
+
+    When start is given, letters are formatted as if start letters were
+    already written, so a message can be formatted piece by piece.
+
+    >>> print(format_groups("ABCDEFGHIJ", 2, 3))
+    AB CD EF
+    GH IJ
+
+    >>> print(format_groups("ABC", 2, 3) + format_groups("DEFGHIJ", 2, 3, start=3))
+    AB CD EF
+    GH IJ
+    """
+    line_size = group_length * line_length
+    head = -start % group_length
+
+    pieces = [letters[:head]]
+    for offset in range(head, len(letters), group_length):
+        if position := start + offset:
+            pieces.append(" " if position % line_size else "\n")
+        pieces.append(letters[offset : offset + group_length])
+
+    return "".join(pieces)
+
+
 def batched(iterable: Iterable[T], n: int) -> Iterable[tuple[T, ...]]:
     """
     Polyfill of python3.12 itertools.batched.
@@ -57,6 +161,23 @@ def batched(iterable: Iterable[T], n: int) -> Iterable[tuple[T, ...]]:
         yield batch
 
 
+def get_ranges(values: Iterable[int]) -> list[tuple[int, int]]:
+    """
+    Compact values in sorted half open ranges.
+
+    >>> get_ranges({5, 0, 1, 2, 7, 6})
+    [(0, 3), (5, 8)]
+    """
+    ranges: list[tuple[int, int]] = []
+    for value in sorted(values):
+        if ranges and ranges[-1][1] == value:
+            ranges[-1] = (ranges[-1][0], value + 1)
+        else:
+            ranges.append((value, value + 1))
+
+    return ranges
+
+
 def choices_unique(seq: Sequence[T], k: int = 1) -> list[T]:
     """Get random k unique items from iterable."""
     if len(seq) < 1:
@@ -78,5 +199,44 @@ def choices_unique(seq: Sequence[T], k: int = 1) -> list[T]:
     return ret
 
 
+def pick_unique(seq: Sequence[T], k: int, draw: int) -> list[T]:
+    """
+    Get k unique items from seq, chosen by draw.
+
+    Every draw in range(math.perm(len(seq), k)) gives a different pick, so a
+    single uniform draw gives a uniform pick.
+
+    >>> pick_unique("ABC", 2, 0), pick_unique("ABC", 2, 5)
+    (['A', 'B'], ['C', 'B'])
+    """
+    lst = list(seq)
+    ret: list[T] = []
+    for _ in range(k):
+        draw, index = divmod(draw, len(lst))
+        ret.append(lst.pop(index))
+
+    return ret
+
+
+def rank_unique(seq: Sequence[T], picked: Iterable[T]) -> int:
+    """
+    Get the draw giving picked with pick_unique, picked must be unique.
+
+    >>> rank_unique("ABC", ["C", "B"])
+    5
+    """
+    lst = list(seq)
+    indexes: list[tuple[int, int]] = []
+    for item in picked:
+        indexes.append((lst.index(item), len(lst)))
+        lst.remove(item)
+
+    draw = 0
+    for index, size in reversed(indexes):
+        draw = draw * size + index
+
+    return draw
+
+
 def choices(seq: Sequence[T], k: int = 1) -> list[T]:
     return [choice(seq) for _ in range(k)]
@@ -0,0 +1,237 @@
+"""
+Plug board free permutations of every machine state, stored in files.
+
+A table holds the permutation of rotors and reflector for each of the 26**n
+states of a rotor order and reflector, so it is shared by every start
+position and plug board. Files are memory mapped: processes opening the same
+table share its pages and don't build any encoder.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from dataclasses import replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING, Final, Self
+
+from .compiled import (
+    LETTER_COUNT,
+    CompiledEnigma,
+    ScramblerCache,
+    get_plug_board_table,
+    get_state,
+)
+from .config import EnigmaConfig, RotorConfig
+from .exception import KeystreamFormatError
+from .helper import get_letter_index
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+MAGIC: Final = b"ENIGKS"
+FORMAT_VERSION: Final = 2
+
+# Magic, format version and rotor count, padded to 16 bytes, then the
+# table key digest.
+_header: Final = struct.Struct("<6sHB7x32s")
+
+CACHE_DIR_VARIABLE: Final = "ENIGMA_CACHE_DIR"
+
+
+def get_cache_dir() -> Path:
+    """Get $ENIGMA_CACHE_DIR, else the enigma directory of the user cache."""
+    if directory := os.environ.get(CACHE_DIR_VARIABLE):
+        return Path(directory)
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(cache_home) / "enigma"
+
+
+def get_table_key(config: EnigmaConfig) -> str:
+    """
+    Get the hash of config as_dict, without plugs nor rotors positions.
+
+    Neither change the permutation of a machine state.
+    """
+    normalized = _normalize(config).as_dict()
+    key = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "rotors": normalized["rotors"],
+            "reflector": normalized["reflector"],
+        },
+        sort_keys=True,
+    )
+
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_table_path(config: EnigmaConfig, cache_dir: Path | None = None) -> Path:
+    directory = get_cache_dir() if cache_dir is None else cache_dir
+
+    return directory / f"{get_table_key(config)}.v{FORMAT_VERSION}.keystream"
+
+
+def build_table(config: EnigmaConfig, path: Path) -> None:
+    """
+    Write the table of config in path.
+
+    The file is written aside then renamed, a concurrent reader never sees a
+    partial table.
+    """
+    config = _normalize(config)
+    rotor_count = len(config.rotors_config)
+    period = LETTER_COUNT**rotor_count
+
+    # The engine steps before encoding, start one step before state 0.
+    engine = CompiledEnigma(config, ScramblerCache(0))
+    engine.seek(period - 1)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        try:
+            file.write(
+                _header.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    rotor_count,
+                    bytes.fromhex(get_table_key(config)),
+                ),
+            )
+            for _ in range(0, period, LETTER_COUNT):
+                file.write(b"".join(engine.get_permutations(LETTER_COUNT)))
+        except BaseException:
+            Path(file.name).unlink()
+            raise
+
+    Path(file.name).replace(path)
+
+
+def open_table(
+    config: EnigmaConfig,
+    cache_dir: Path | None = None,
+) -> KeystreamTable:
+    """Open the table of config from cache_dir, build it when missing."""
+    path = get_table_path(config, cache_dir)
+    if not path.exists():
+        build_table(config, path)
+
+    table = KeystreamTable(path)
+    if table.key != get_table_key(config):
+        table.close()
+        raise KeystreamFormatError(path, "built for other rotors or reflector")
+
+    return table
+
+
+class KeystreamTable:
+    """
+    Read only view of a keystream table file.
+
+    Machine at state s encodes letter x, plug board aside, to
+    table[s][x]. Bytes are read from the mapped file, never copied as a
+    whole.
+    """
+
+    __slots__ = ("_map", "key", "period", "rotor_count")
+
+    key: str
+    period: int
+    rotor_count: int
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as file:
+            header = file.read(_header.size)
+            if len(header) < _header.size:
+                raise KeystreamFormatError(path, "truncated header")
+
+            magic, version, self.rotor_count, key = _header.unpack(header)
+            if magic != MAGIC:
+                raise KeystreamFormatError(path, "bad magic")
+            if version != FORMAT_VERSION:
+                raise KeystreamFormatError(
+                    path,
+                    f"format version {version}, expected {FORMAT_VERSION}",
+                )
+
+            self.key = key.hex()
+            self.period = LETTER_COUNT**self.rotor_count
+            size = _header.size + self.period * LETTER_COUNT
+            if os.fstat(file.fileno()).st_size != size:
+                raise KeystreamFormatError(path, "size mismatch")
+
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self.period
+
+    def __getitem__(self, state: int) -> bytes:
+        start = _header.size + state % self.period * LETTER_COUNT
+
+        return self._map[start : start + LETTER_COUNT]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def encode_indexes(
+        self,
+        config: EnigmaConfig,
+        indexes: bytes,
+        *,
+        start: int = 0,
+    ) -> bytes:
+        """
+        Encode indexes as a machine of config would after start letters.
+
+        Config must share rotor order and reflector with the table.
+        """
+        if get_table_key(config) != self.key:
+            msg = "config rotors or reflector differ from the table ones"
+            raise ValueError(msg)
+
+        plugs = get_plug_board_table(config.plugs)
+        table = self._map
+        origin = get_state(
+            get_letter_index(c.position) for c in config.rotors_config
+        )
+        period = self.period
+        first = origin + start + 1
+
+        return bytes(
+            plugs[
+                table[
+                    _header.size
+                    + (first + offset) % period * LETTER_COUNT
+                    + plugs[letter]
+                ]
+            ]
+            for offset, letter in enumerate(indexes)
+        )
+
+
+def _normalize(config: EnigmaConfig) -> EnigmaConfig:
+    """Get config without plugs, rotors at A."""
+    return replace(
+        config,
+        rotors_config=tuple(
+            RotorConfig(c.encoder, "A") for c in config.rotors_config
+        ),
+        plugs=(),
+    )
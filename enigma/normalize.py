@@ -0,0 +1,135 @@
+"""
+Turn free text into letters an Enigma can encode, in a few passes.
+
+Letters are uppercased, whitespace and punctuation dropped and, on demand,
+digits spelled and umlauts expanded as operators did. Any other character is
+rejected: its offset is reported and it is left out of the letters.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from string import ascii_lowercase, ascii_uppercase, punctuation, whitespace
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+DIGITS: Final = {
+    "0": "NULL",
+    "1": "EINS",
+    "2": "ZWO",
+    "3": "DREI",
+    "4": "VIER",
+    "5": "FUNF",
+    "6": "SECHS",
+    "7": "SIEBEN",
+    "8": "ACHT",
+    "9": "NEUN",
+}
+UMLAUTS: Final = {
+    "Ä": "AE",
+    "Ö": "OE",
+    "Ü": "UE",
+    "ä": "AE",
+    "ö": "OE",
+    "ü": "UE",
+    "ß": "SS",
+}
+
+_dropped: Final = whitespace + punctuation
+_ascii_table: Final = bytes.maketrans(
+    ascii_lowercase.encode(),
+    ascii_uppercase.encode(),
+)
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    letters: str
+    # Offsets of rejected characters in the original text.
+    rejected: tuple[int, ...]
+
+
+def normalize(
+    text: str,
+    *,
+    digits: bool = False,
+    umlauts: bool = False,
+) -> NormalizedText:
+    """
+    Get uppercase letters of text, and offsets of characters left out.
+
+    >>> normalize("Grüße, 2 mal!", digits=True, umlauts=True)
+    NormalizedText(letters='GRUESSEZWOMAL', rejected=())
+
+    >>> normalize("Café 1")
+    NormalizedText(letters='CAF', rejected=(3, 5))
+    """
+    if text.isascii() and not digits:
+        # bytes.translate is the fastest pass, but can't expand characters.
+        letters = (
+            text.encode().translate(_ascii_table, _dropped.encode()).decode()
+        )
+    else:
+        letters = text.translate(_get_table(digits=digits, umlauts=umlauts))
+
+    if letters.isascii() and letters.isalpha():
+        return NormalizedText(letters, ())
+
+    accepted = _get_accepted(digits=digits, umlauts=umlauts)
+    rejected = tuple(
+        offset for offset, char in enumerate(text) if char not in accepted
+    )
+    removal = dict.fromkeys(map(ord, {text[offset] for offset in rejected}))
+
+    return NormalizedText(letters.translate(removal), rejected)
+
+
+def normalize_chunks(
+    chunks: Iterable[str],
+    *,
+    digits: bool = False,
+    umlauts: bool = False,
+) -> Iterator[NormalizedText]:
+    """
+    Lazily normalize a text given in chunks.
+
+    Rejected offsets are counted from the start of the first chunk.
+
+    >>> [n.rejected for n in normalize_chunks(["é a", "bé"])]
+    [(0,), (4,)]
+    """
+    offset = 0
+    for chunk in chunks:
+        normalized = normalize(chunk, digits=digits, umlauts=umlauts)
+        if offset and normalized.rejected:
+            normalized = NormalizedText(
+                normalized.letters,
+                tuple(offset + rejected for rejected in normalized.rejected),
+            )
+        yield normalized
+        offset += len(chunk)
+
+
+@cache
+def _get_table(*, digits: bool, umlauts: bool) -> dict[int, str | None]:
+    table: dict[int, str | None] = {
+        ord(lower): upper
+        for lower, upper in zip(ascii_lowercase, ascii_uppercase, strict=True)
+    }
+    table.update(dict.fromkeys(map(ord, _dropped)))
+    if digits:
+        table.update({ord(digit): word for digit, word in DIGITS.items()})
+    if umlauts:
+        table.update({ord(umlaut): word for umlaut, word in UMLAUTS.items()})
+
+    return table
+
+
+@cache
+def _get_accepted(*, digits: bool, umlauts: bool) -> frozenset[str]:
+    table = _get_table(digits=digits, umlauts=umlauts)
+
+    return frozenset(map(chr, table)) | frozenset(ascii_uppercase)
@@ -1,12 +1,16 @@
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
+from math import comb, prod
+from string import ascii_uppercase
 from typing import Final
 
 from enigma.exception import NotASCIIUppercaseLetterError
 from enigma.helper import get_letter_index, is_single_ascii_uppercase_letter
 
+_LETTER_COUNT: Final = len(ascii_uppercase)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Plug:
     left: str
     right: str
@@ -20,6 +24,8 @@ class Plug:
 
 
 class PlugBoard:
+    __slots__ = ("_plugs", "_turnover")
+
     MAX_PLUG_COUNT: Final = 10
 
     def __init__(self, *plugs: Plug, turnover: Callable[[], None]) -> None:
@@ -29,28 +35,129 @@ class PlugBoard:
             )
             raise ValueError(msg)
 
-        self._plugs: dict[int, int] = {}
+        table = bytearray(range(len(ascii_uppercase)))
+        plugged: set[int] = set()
         for plug in plugs:
             left = get_letter_index(plug.left)
             right = get_letter_index(plug.right)
 
-            if left in self._plugs or right in self._plugs:
+            if left in plugged or right in plugged:
                 msg = f'"{plug}" is duplicated'
                 raise ValueError(msg)
 
-            self._plugs[left] = right
-            self._plugs[right] = left
+            plugged.update((left, right))
+            table[left] = right
+            table[right] = left
 
+        self._plugs = bytes(table)
         self._turnover = turnover
 
     def encode(self, letter: int) -> int:
-        if not self._plugs:
-            return letter
-
-        return self._plugs.get(letter, letter)
+        return self._plugs[letter]
 
     def encode_reverse(self, letter: int) -> int:
         return self.encode(letter)
 
     def make_step(self) -> None:
         self._turnover()
+
+
+def _matchings(plug_count: int) -> int:
+    """
+    Count ways of pairing 2 * plug_count letters.
+
+    >>> _matchings(0), _matchings(1), _matchings(3)
+    (1, 1, 15)
+    """
+    return prod(range(1, 2 * plug_count, 2))
+
+
+def count_plug_choices(plug_count: int) -> int:
+    """
+    Count plug boards of plug_count plugs.
+
+    >>> count_plug_choices(10)
+    150738274937250
+    """
+    return comb(_LETTER_COUNT, 2 * plug_count) * _matchings(plug_count)
+
+
+def unrank_plugs(rank: int, plug_count: int) -> tuple[Plug, ...]:
+    """
+    Get plugs of rank: plugged letters, then how they are paired.
+
+    >>> unrank_plugs(0, 2)
+    (Plug(left='A', right='B'), Plug(left='C', right='D'))
+    """
+    matching, letters_rank = divmod(
+        rank,
+        comb(_LETTER_COUNT, 2 * plug_count),
+    )
+    letters = _unrank_combination(letters_rank, 2 * plug_count)
+
+    plugs = []
+    while letters:
+        left = letters.pop(0)
+        matching, partner = divmod(matching, len(letters))
+        right = letters.pop(partner)
+        plugs.append(Plug(ascii_uppercase[left], ascii_uppercase[right]))
+
+    return tuple(plugs)
+
+
+def rank_plugs(plugs: Sequence[Plug]) -> int:
+    """Get the rank of plugs, unrank_plugs inverse."""
+    partners: dict[int, int] = {}
+    for plug in plugs:
+        left = get_letter_index(plug.left)
+        right = get_letter_index(plug.right)
+        partners[left], partners[right] = right, left
+
+    if len(partners) != 2 * len(plugs):
+        msg = f"plugs must pair distinct letters, {plugs} given"
+        raise ValueError(msg)
+
+    letters = sorted(partners)
+    letters_rank = _rank_combination(letters)
+
+    digits = []
+    while letters:
+        left = letters.pop(0)
+        partner = letters.index(partners[left])
+        digits.append((partner, len(letters)))
+        letters.pop(partner)
+
+    matching = 0
+    for partner, size in reversed(digits):
+        matching = matching * size + partner
+
+    return matching * comb(_LETTER_COUNT, 2 * len(plugs)) + letters_rank
+
+
+def _rank_combination(letters: Sequence[int]) -> int:
+    """
+    Get the colexicographic rank of sorted letters.
+
+    >>> _rank_combination([0, 1]), _rank_combination([0, 2])
+    (0, 1)
+    """
+    return sum(comb(letter, i + 1) for i, letter in enumerate(letters))
+
+
+def _unrank_combination(rank: int, count: int) -> list[int]:
+    """
+    Get the sorted letters of colexicographic rank.
+
+    >>> _unrank_combination(1, 2)
+    [0, 2]
+    """
+    letters = []
+    letter = _LETTER_COUNT
+    for k in range(count, 0, -1):
+        letter -= 1
+        while comb(letter, k) > rank:
+            letter -= 1
+        letters.append(letter)
+        rank -= comb(letter, k)
+
+    return letters[::-1]
@@ -7,6 +7,8 @@ from .helper import get_letter_index
 
 
 class AbstractRotor(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def position(self) -> int:
@@ -29,6 +31,8 @@ class AbstractRotor(ABC):
 
 
 class FrozenRotor(AbstractRotor):
+    __slots__ = ("_encoder", "_position", "config")
+
     def __init__(
         self,
         config: AvailableReflector,
@@ -52,6 +56,8 @@ class FrozenRotor(AbstractRotor):
 
 
 class Reflector(FrozenRotor):
+    __slots__ = ()
+
     def encode_reverse(self, letter: int) -> int:
         return letter
 
@@ -60,10 +66,18 @@ class Reflector(FrozenRotor):
 
 
 class ThinRotor(FrozenRotor):
-    pass
+    __slots__ = ()
 
 
 class Rotor(AbstractRotor):
+    __slots__ = (
+        "_encoder",
+        "_initial_position",
+        "_position",
+        "_turnover",
+        "config",
+    )
+
     def __init__(
         self,
         config: AvailableRotor,
@@ -87,6 +101,10 @@ class Rotor(AbstractRotor):
     def position(self) -> int:
         return self._position
 
+    @position.setter
+    def position(self, position: int) -> None:
+        self._position = position % 26
+
     @property
     def encoder(self) -> Encoder:
         return self._encoder
@@ -0,0 +1,244 @@
+"""
+Keep many encryption sessions whose rotors advance across messages.
+
+A session is stored as a config id and a step counter, a few bytes instead
+of a whole machine. Engines are rebuilt on demand from the config and
+seeked to the session step.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from itertools import count
+from time import monotonic
+from typing import TYPE_CHECKING, Final
+
+from .compiled import CompiledEnigma, check_step
+from .config import ConfigArray, EnigmaConfig
+from .enigma import Enigma
+from .exception import SessionNotFoundError
+from .helper import format_groups, get_letters_from_indexes, parse_letters
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+DEFAULT_MAX_SESSIONS: Final = 1 << 21
+DEFAULT_MAX_ENGINES: Final = 1024
+# Steps are stored in an unsigned 64 bits array.
+MAX_STEP: Final = (1 << 64) - 1
+
+
+class SessionStore:
+    """
+    Sessions by id, in memory bounded by max_sessions.
+
+    Each session holds a slot in flat arrays: config id, step and last use
+    time. Configs are packed once in a ConfigArray and shared by sessions
+    using them. Encoding rebuilds the session engine, the max_engines most
+    recently used engines are kept, as rebuilding still costs tens of
+    microseconds.
+
+    When max_sessions is reached, the least recently used session is
+    evicted. With a ttl, sessions idle for ttl seconds are evicted too.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl: float | None = None,
+        max_engines: int = DEFAULT_MAX_ENGINES,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if max_sessions < 1:
+            msg = f"max_sessions must be at least one, {max_sessions} given"
+            raise ValueError(msg)
+
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_engines = max_engines
+        self._clock = clock
+
+        # Session id to slot, least recently used first.
+        self._slots: OrderedDict[Hashable, int] = OrderedDict()
+        self._free_slots: list[int] = []
+        self._session_configs = array("I")
+        self._steps = array("Q")
+        self._used = array("d")
+
+        # Configs packed once, with the count of sessions using them.
+        self._configs = ConfigArray()
+        self._config_ids: dict[bytes, int] = {}
+        self._config_refs = array("I")
+        self._free_configs: list[int] = []
+
+        self._engines: OrderedDict[int, CompiledEnigma] = OrderedDict()
+        self._ids = count()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        return session_id in self._slots and not self._is_expired(
+            self._slots[session_id],
+            self._clock(),
+        )
+
+    @property
+    def config_count(self) -> int:
+        """Count distinct configs of open sessions."""
+        return len(self._config_ids)
+
+    def open(
+        self,
+        config: EnigmaConfig,
+        session_id: Hashable | None = None,
+        *,
+        step: int = 0,
+    ) -> Hashable:
+        """
+        Open a session on config, its first letter is encoded at step.
+
+        session_id defaults to a new integer not used by an open session, an
+        open session with the same id is replaced. Return the session id.
+        """
+        # Checked first, the store is left untouched on failure.
+        check_step(step)
+        if step > MAX_STEP:
+            msg = f"step must be at most {MAX_STEP}, {step} given"
+            raise ValueError(msg)
+
+        if session_id is None:
+            session_id = next(self._ids)
+            while session_id in self._slots:
+                session_id = next(self._ids)
+        elif session_id in self._slots:
+            self.close(session_id)
+
+        now = self._clock()
+        self.evict_expired(now)
+        while len(self._slots) >= self.max_sessions:
+            self._evict(next(iter(self._slots)))
+
+        config_id = self._acquire_config(config)
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._session_configs[slot] = config_id
+            self._steps[slot] = step
+            self._used[slot] = now
+        else:
+            slot = len(self._steps)
+            self._session_configs.append(config_id)
+            self._steps.append(step)
+            self._used.append(now)
+        self._slots[session_id] = slot
+
+        return session_id
+
+    def close(self, session_id: Hashable) -> None:
+        slot = self._slots.pop(session_id, None)
+        if slot is None:
+            raise SessionNotFoundError(session_id)
+
+        self._release(slot)
+
+    def get_config(self, session_id: Hashable) -> EnigmaConfig:
+        return self._configs[self._session_configs[self._get_slot(session_id)]]
+
+    def get_step(self, session_id: Hashable) -> int:
+        """Get the count of letters encoded by session, from its start."""
+        return self._steps[self._get_slot(session_id)]
+
+    def encode(self, session_id: Hashable, message: str) -> str:
+        """Encode message like Enigma.encode_message, advancing the session."""
+        slot = self._get_slot(session_id)
+        indexes = parse_letters(message.replace(" ", "").replace("\n", ""))
+
+        engine = self._get_engine(self._session_configs[slot])
+        engine.seek(self._steps[slot])
+        encoded = get_letters_from_indexes(engine.encode_indexes(indexes))
+        self._steps[slot] += len(indexes)
+        self._used[slot] = self._clock()
+        self._slots.move_to_end(session_id)
+
+        return format_groups(
+            encoded.decode(),
+            Enigma.GROUP_LENGTH,
+            Enigma.LINE_LENGTH,
+        )
+
+    def evict_expired(self, now: float | None = None) -> int:
+        """Evict sessions idle for ttl seconds, return their count."""
+        if self.ttl is None:
+            return 0
+
+        now = self._clock() if now is None else now
+        evicted = 0
+        # Sessions are ordered by last use, expired ones come first.
+        while self._slots:
+            session_id, slot = next(iter(self._slots.items()))
+            if not self._is_expired(slot, now):
+                break
+            self._evict(session_id)
+            evicted += 1
+
+        return evicted
+
+    def _get_slot(self, session_id: Hashable) -> int:
+        slot = self._slots.get(session_id)
+        if slot is None:
+            raise SessionNotFoundError(session_id)
+
+        if self._is_expired(slot, self._clock()):
+            self._evict(session_id)
+            raise SessionNotFoundError(session_id)
+
+        return slot
+
+    def _is_expired(self, slot: int, now: float) -> bool:
+        return self.ttl is not None and now - self._used[slot] >= self.ttl
+
+    def _evict(self, session_id: Hashable) -> None:
+        self._release(self._slots.pop(session_id))
+        self.evictions += 1
+
+    def _release(self, slot: int) -> None:
+        config_id = self._session_configs[slot]
+        self._free_slots.append(slot)
+
+        self._config_refs[config_id] -= 1
+        if not self._config_refs[config_id]:
+            del self._config_ids[self._configs[config_id].to_bytes()]
+            self._engines.pop(config_id, None)
+            self._free_configs.append(config_id)
+
+    def _acquire_config(self, config: EnigmaConfig) -> int:
+        packed = config.to_bytes()
+        config_id = self._config_ids.get(packed)
+        if config_id is None:
+            if self._free_configs:
+                config_id = self._free_configs.pop()
+                self._configs[config_id] = config
+            else:
+                config_id = len(self._configs)
+                self._configs.append(config)
+                self._config_refs.append(0)
+            self._config_ids[packed] = config_id
+
+        self._config_refs[config_id] += 1
+
+        return config_id
+
+    def _get_engine(self, config_id: int) -> CompiledEnigma:
+        engine = self._engines.get(config_id)
+        if engine is None:
+            engine = CompiledEnigma(self._configs[config_id])
+            self._engines[config_id] = engine
+            if len(self._engines) > self.max_engines:
+                self._engines.popitem(last=False)
+        else:
+            self._engines.move_to_end(config_id)
+
+        return engine
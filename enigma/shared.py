@@ -0,0 +1,473 @@
+"""
+Encode many messages over a process pool, sharing tables through memory.
+
+Sending machines or configs to ProcessPoolExecutor workers pickles them for
+every task, and workers build the same rotor tables again. SharedEncoder
+rather writes, once per call, a shared memory block holding wiring tables
+of rotors and reflectors, slow rotors tables of the states messages go
+through, packed configs and letters. Tasks only carry the block name and a
+range of pieces, workers write encoded letters back in the block.
+
+Block layout, offsets are from the block start:
+
+    header      manifest offset and length
+    tables      wiring and slow rotors tables, 256 bytes each
+    configs     packed by EnigmaConfig.to_bytes
+    pieces      config id, letters offset, length and start step of each
+                piece, as 64 bits integers
+    letters     indexes of every message letter
+    output      encoded indexes, written by workers
+    manifest    JSON offsets of the above
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from array import array
+from bisect import bisect_right
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Final, Self
+
+from .available import AvailableReflector, AvailableRotor
+from .compiled import (
+    LETTER_COUNT,
+    CompiledEnigma,
+    ScramblerCache,
+    check_step,
+    get_reflector_table,
+    get_rotor_tables,
+    get_scrambler_key,
+    get_state,
+    set_reflector_table,
+    set_rotor_tables,
+)
+from .config import ConfigArray, EnigmaConfig
+from .enigma import Enigma
+from .helper import (
+    format_groups,
+    get_letter_index,
+    get_letters_from_indexes,
+    get_ranges,
+    parse_letters,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from types import TracebackType
+
+    from .compiled import ScramblerKey
+
+DEFAULT_TASK_LETTERS: Final = 1 << 16
+
+# Manifest offset and length.
+_header: Final = struct.Struct("<QQ")
+
+# Config id, letters offset, length and start step.
+_PIECE_FIELDS: Final = 4
+
+_TABLE_SIZE: Final = ScramblerCache.TABLE_SIZE
+
+
+class SharedEncoder:
+    """
+    Process pool encoding (config, start, text) jobs from shared memory.
+
+    Long texts are split in pieces of at most task_letters letters, and
+    consecutive pieces are grouped in tasks of about task_letters letters,
+    so many small messages cost a few tasks.
+
+    Idle workers keep the block of their last task mapped until their next
+    task or close.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        *,
+        task_letters: int = DEFAULT_TASK_LETTERS,
+    ) -> None:
+        if task_letters < 1:
+            msg = f"task_letters must be at least one, {task_letters} given"
+            raise ValueError(msg)
+
+        self.task_letters = task_letters
+        self._executor = ProcessPoolExecutor(workers)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def encode(
+        self,
+        jobs: Iterable[tuple[EnigmaConfig, int, str]],
+    ) -> list[str]:
+        """Encode each job like Enigma.encode_message(text, start=start)."""
+        block = _BlockWriter()
+        lengths = [
+            block.add_job(config, start, text, self.task_letters)
+            for config, start, text in jobs
+        ]
+        if not block.letters:
+            return ["" for _ in lengths]
+
+        memory = block.create()
+        try:
+            futures = [
+                self._executor.submit(_encode_pieces, memory.name, first, stop)
+                for first, stop in block.get_tasks(self.task_letters)
+            ]
+            for future in futures:
+                future.result()
+
+            offset = block.output_offset
+            buffer = _get_buffer(memory)
+            output = bytes(buffer[offset : offset + len(block.letters)])
+        finally:
+            memory.close()
+            memory.unlink()
+
+        encoded = get_letters_from_indexes(output).decode()
+        results = []
+        offset = 0
+        for length in lengths:
+            results.append(
+                format_groups(
+                    encoded[offset : offset + length],
+                    Enigma.GROUP_LENGTH,
+                    Enigma.LINE_LENGTH,
+                ),
+            )
+            offset += length
+
+        return results
+
+
+class _BlockWriter:
+    """Jobs of an encode call, laid out in a shared memory block."""
+
+    def __init__(self) -> None:
+        self.configs = ConfigArray()
+        self.pieces = array("q")
+        self.letters = bytearray()
+        self.output_offset = 0
+
+        self._config_ids: dict[bytes, int] = {}
+        # Slow states each scrambler key goes through, with a config using
+        # it to build tables.
+        self._slow_states: dict[ScramblerKey, set[int]] = {}
+        self._key_configs: dict[ScramblerKey, EnigmaConfig] = {}
+
+    def add_job(
+        self,
+        config: EnigmaConfig,
+        start: int,
+        text: str,
+        piece_letters: int,
+    ) -> int:
+        """Add text pieces, return its letter count."""
+        check_step(start)
+        indexes = parse_letters(text.replace(" ", "").replace("\n", ""))
+        if not indexes:
+            return 0
+
+        packed = config.to_bytes()
+        config_id = self._config_ids.get(packed)
+        if config_id is None:
+            config_id = self._config_ids[packed] = len(self.configs)
+            self.configs.append(config)
+
+        key = get_scrambler_key(config)
+        self._key_configs.setdefault(key, config)
+        self._add_slow_states(
+            self._slow_states.setdefault(key, set()),
+            config,
+            start,
+            len(indexes),
+        )
+
+        # Pieces are signed 64 bits, starts are kept below the period.
+        start %= LETTER_COUNT ** len(config.rotors_config)
+        for offset in range(0, len(indexes), piece_letters):
+            self.pieces.extend(
+                (
+                    config_id,
+                    len(self.letters) + offset,
+                    min(piece_letters, len(indexes) - offset),
+                    start + offset,
+                ),
+            )
+        self.letters += indexes
+
+        return len(indexes)
+
+    def get_tasks(self, task_letters: int) -> list[tuple[int, int]]:
+        """Group consecutive pieces by about task_letters letters."""
+        tasks = []
+        first = letters = 0
+        piece_count = len(self.pieces) // _PIECE_FIELDS
+        for piece in range(piece_count):
+            letters += self.pieces[piece * _PIECE_FIELDS + 2]
+            if letters >= task_letters:
+                tasks.append((first, piece + 1))
+                first = piece + 1
+                letters = 0
+        if first < piece_count:
+            tasks.append((first, piece_count))
+
+        return tasks
+
+    def create(self) -> SharedMemory:
+        """Create the shared memory block of added jobs."""
+        sections: list[tuple[int, bytes]] = []
+        size = _header.size
+
+        def add(data: bytes) -> int:
+            nonlocal size
+            offset = size
+            sections.append((offset, data))
+            size += len(data)
+
+            return offset
+
+        rotors = sorted(
+            {rotor for key in self._key_configs for rotor in key[0]}
+            | {config.rotors_config[-1].encoder for config in self.configs},
+        )
+        reflectors = sorted({(key[1], key[2]) for key in self._key_configs})
+
+        manifest: dict[str, Any] = {
+            "rotors": [
+                [rotor.name, add(b"".join(chain(*get_rotor_tables(rotor))))]
+                for rotor in rotors
+            ],
+            "reflectors": [
+                [
+                    reflector.name,
+                    position,
+                    add(get_reflector_table(reflector, position)),
+                ]
+                for reflector, position in reflectors
+            ],
+            "scramblers": [
+                [
+                    [rotor.name for rotor in key[0]],
+                    key[1].name,
+                    key[2],
+                    self._add_inner_tables(add, key),
+                ]
+                for key in self._key_configs
+            ],
+            "configs": [add(self.configs.tobytes()), self.configs.nbytes],
+            "pieces": [
+                add(self.pieces.tobytes()),
+                len(self.pieces) * self.pieces.itemsize,
+            ],
+            "letters": add(bytes(self.letters)),
+        }
+        self.output_offset = manifest["output"] = size
+        size += len(self.letters)
+
+        data = json.dumps(manifest, separators=(",", ":")).encode()
+        memory = SharedMemory(create=True, size=size + len(data))
+        buffer = _get_buffer(memory)
+        _header.pack_into(buffer, 0, size, len(data))
+        for offset, section in sections:
+            buffer[offset : offset + len(section)] = section
+        buffer[size : size + len(data)] = data
+
+        return memory
+
+    def _add_inner_tables(
+        self,
+        add: Callable[[bytes], int],
+        key: ScramblerKey,
+    ) -> list[int]:
+        """Add tables of key slow states, return [start, stop, offset, ...]."""
+        engine = CompiledEnigma(self._key_configs[key])
+        ranges = []
+        for start, stop in get_ranges(self._slow_states[key]):
+            ranges += [start, stop, add(engine.get_inner_tables(start, stop))]
+
+        return ranges
+
+    @staticmethod
+    def _add_slow_states(
+        slow_states: set[int],
+        config: EnigmaConfig,
+        start: int,
+        length: int,
+    ) -> None:
+        period = LETTER_COUNT ** len(config.rotors_config)
+        slow_period = period // LETTER_COUNT
+        origin = get_state(
+            get_letter_index(c.position) for c in config.rotors_config
+        )
+
+        # The machine steps before encoding each letter.
+        first = (origin + start + 1) % period
+        first_slow = first // LETTER_COUNT
+        last_slow = (first + length - 1) // LETTER_COUNT
+        if last_slow - first_slow + 1 >= slow_period:
+            slow_states.update(range(slow_period))
+        else:
+            slow_states.update(
+                state % slow_period
+                for state in range(first_slow, last_slow + 1)
+            )
+
+
+def _get_buffer(memory: SharedMemory) -> memoryview:
+    if memory.buf is None:
+        msg = f"shared memory {memory.name} is closed"
+        raise ValueError(msg)
+
+    return memory.buf
+
+
+class _SharedScramblers:
+    """
+    Slow rotors tables of a block, missing ones are built.
+
+    Tables are copied out of the block on first use, long messages go
+    through the same states many times.
+    """
+
+    def __init__(self, buffer: memoryview, scramblers: list[Any]) -> None:
+        self._buffer = buffer
+        self._ranges: dict[ScramblerKey, tuple[list[int], list[int], list[int]]]
+        self._ranges = {}
+        for rotors, reflector, position, ranges in scramblers:
+            key = (
+                tuple(AvailableRotor[rotor] for rotor in rotors),
+                AvailableReflector[reflector],
+                position,
+            )
+            self._ranges[key] = (ranges[::3], ranges[1::3], ranges[2::3])
+        self._tables: dict[tuple[ScramblerKey, int], bytes] = {}
+
+    def get(
+        self,
+        key: ScramblerKey,
+        state: int,
+        build: Callable[[], bytes],
+    ) -> bytes:
+        table = self._tables.get((key, state))
+        if table is None:
+            table = self._tables[key, state] = self._read(key, state) or build()
+
+        return table
+
+    def _read(self, key: ScramblerKey, state: int) -> bytes:
+        """Copy the table of key at state from the block, b"" when missing."""
+        ranges = self._ranges.get(key)
+        if ranges is None:
+            return b""
+
+        starts, stops, offsets = ranges
+        index = bisect_right(starts, state) - 1
+        if index < 0 or state >= stops[index]:
+            return b""
+
+        offset = offsets[index] + (state - starts[index]) * _TABLE_SIZE
+
+        return bytes(self._buffer[offset : offset + _TABLE_SIZE])
+
+
+class _AttachedBlock:
+    """A block mapped by a worker, with engines of its configs."""
+
+    def __init__(self, name: str) -> None:
+        self._memory = SharedMemory(name)
+        buffer = _get_buffer(self._memory)
+
+        offset, length = _header.unpack_from(buffer)
+        manifest = json.loads(bytes(buffer[offset : offset + length]))
+
+        # Wiring tables are set once per block, workers then build no rotor.
+        for rotor, offset in manifest["rotors"]:
+            stop = offset + 2 * LETTER_COUNT * _TABLE_SIZE
+            tables = [
+                bytes(buffer[o : o + _TABLE_SIZE])
+                for o in range(offset, stop, _TABLE_SIZE)
+            ]
+            set_rotor_tables(
+                AvailableRotor[rotor],
+                (tuple(tables[:LETTER_COUNT]), tuple(tables[LETTER_COUNT:])),
+            )
+        for reflector, position, offset in manifest["reflectors"]:
+            set_reflector_table(
+                AvailableReflector[reflector],
+                position,
+                bytes(buffer[offset : offset + _TABLE_SIZE]),
+            )
+
+        offset, length = manifest["configs"]
+        self._configs = ConfigArray.frombytes(
+            bytes(buffer[offset : offset + length]),
+        )
+        offset, length = manifest["pieces"]
+        self.pieces = buffer[offset : offset + length].cast("q")
+
+        letters, output = manifest["letters"], manifest["output"]
+        self.letters = buffer[letters:output]
+        self.output = buffer[output : output + output - letters]
+
+        self._scramblers = _SharedScramblers(buffer, manifest["scramblers"])
+        self._engines: dict[int, CompiledEnigma] = {}
+
+    def get_engine(self, config_id: int) -> CompiledEnigma:
+        engine = self._engines.get(config_id)
+        if engine is None:
+            engine = CompiledEnigma(self._configs[config_id], self._scramblers)
+            self._engines[config_id] = engine
+
+        return engine
+
+    def close(self) -> None:
+        # Views of the block must be released before unmapping it.
+        for view in (self.pieces, self.letters, self.output):
+            view.release()
+        self._memory.close()
+
+
+# Block of the last task run by this worker process, by name.
+_attached: Final[dict[str, _AttachedBlock]] = {}
+
+
+def _attach(name: str) -> _AttachedBlock:
+    block = _attached.get(name)
+    if block is None:
+        for previous in _attached.values():
+            previous.close()
+        _attached.clear()
+        block = _attached[name] = _AttachedBlock(name)
+
+    return block
+
+
+def _encode_pieces(name: str, first: int, stop: int) -> None:
+    """Encode pieces first to stop of the name block, in the block output."""
+    block = _attach(name)
+    pieces = block.pieces
+    for piece in range(
+        first * _PIECE_FIELDS,
+        stop * _PIECE_FIELDS,
+        _PIECE_FIELDS,
+    ):
+        config_id, offset, length, start = pieces[piece : piece + _PIECE_FIELDS]
+        block.output[offset : offset + length] = block.get_engine(
+            config_id,
+        ).encode_at(start, bytes(block.letters[offset : offset + length]))
@@ -0,0 +1,302 @@
+"""
+Number every valid configuration, to split exhaustive searches.
+
+A ConfigSpace maps each configuration it contains to an integer rank, and
+back. Workers can be given plain rank ranges, configs are only built when
+accessed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import perm, prod
+from string import ascii_uppercase
+from typing import TYPE_CHECKING, Final, overload
+
+from .available import AvailableReflector, AvailableRotor
+from .compiled import LETTER_COUNT, get_positions, get_state
+from .config import (
+    ConfigurationError,
+    EnigmaConfig,
+    ReflectorConfig,
+    RotorConfig,
+)
+from .helper import (
+    get_letter_index,
+    get_letters_from_indexes,
+    parse_letters,
+    pick_unique,
+    rank_unique,
+)
+from .plug_board import PlugBoard, count_plug_choices, rank_plugs, unrank_plugs
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+NORMAL_ROTOR_COUNT: Final = EnigmaConfig.MIN_ROTOR_COUNT
+
+
+@dataclass(frozen=True)
+class _SubSpace:
+    """Configs of one rotor count."""
+
+    rotor_count: int
+    reflectors: tuple[AvailableReflector, ...]
+    thin_rotors: tuple[AvailableRotor, ...]
+
+    def get_rotor_choices(self, normal_rotors: Sequence[AvailableRotor]) -> int:
+        choices = perm(len(normal_rotors), NORMAL_ROTOR_COUNT)
+        if self.rotor_count > NORMAL_ROTOR_COUNT:
+            choices *= len(self.thin_rotors)
+
+        return choices
+
+
+class ConfigSpace:
+    """
+    Every valid config with the given rotor counts and plug count.
+
+    Three rotors configs use three distinct normal rotors and a normal
+    reflector, four rotors configs add a thin rotor in fourth slot and use a
+    thin reflector, as EnigmaConfig requires. Reflectors take each of
+    reflector_positions, distinct letters.
+
+    Configs are ranked by rotor count, rotor order, reflector, reflector
+    position, plugs and, fastest varying, rotor positions: a rank range is
+    mostly made of runs sharing everything but rotor positions.
+
+    Spaces with plugs are bigger than sys.maxsize, len() raises
+    OverflowError on them, size does not.
+    """
+
+    def __init__(
+        self,
+        rotor_counts: Iterable[int] = (NORMAL_ROTOR_COUNT,),
+        plug_count: int = 0,
+        *,
+        reflector_positions: str = "A",
+    ) -> None:
+        self.rotor_counts = tuple(sorted(set(rotor_counts)))
+        for rotor_count in self.rotor_counts:
+            if not (
+                EnigmaConfig.MIN_ROTOR_COUNT
+                <= rotor_count
+                <= EnigmaConfig.MAX_ROTOR_COUNT
+            ):
+                msg = f"rotor count must be 3 or 4, {rotor_count} given"
+                raise ValueError(msg)
+
+        if not 0 <= plug_count <= PlugBoard.MAX_PLUG_COUNT:
+            msg = (
+                f"plug_count must be between 0 and {PlugBoard.MAX_PLUG_COUNT},"
+                f" {plug_count} given"
+            )
+            raise ValueError(msg)
+
+        positions = parse_letters(reflector_positions)
+        if not positions or len(set(positions)) < len(positions):
+            msg = (
+                "reflector_positions must be distinct letters,"
+                f" {reflector_positions!r} given"
+            )
+            raise ValueError(msg)
+
+        self.plug_count = plug_count
+        self.reflector_positions = get_letters_from_indexes(positions).decode()
+
+        thin_rotors = AvailableRotor.get_thin_rotors()
+        thin_reflectors = set(AvailableReflector.get_thin_reflectors())
+        self._normal_rotors = tuple(
+            r for r in AvailableRotor if r not in thin_rotors
+        )
+        self._sub_spaces = tuple(
+            _SubSpace(
+                rotor_count,
+                tuple(
+                    r
+                    for r in AvailableReflector
+                    if (r in thin_reflectors)
+                    == (rotor_count > NORMAL_ROTOR_COUNT)
+                ),
+                tuple(r for r in AvailableRotor if r in thin_rotors),
+            )
+            for rotor_count in self.rotor_counts
+        )
+        self._plug_choices = count_plug_choices(plug_count)
+
+    @property
+    def size(self) -> int:
+        return sum(self._get_size(sub_space) for sub_space in self._sub_spaces)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[EnigmaConfig]:
+        return iter(self[:])
+
+    @overload
+    def __getitem__(self, index: int) -> EnigmaConfig:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ConfigRange:
+        ...
+
+    def __getitem__(self, index: int | slice) -> EnigmaConfig | ConfigRange:
+        if isinstance(index, slice):
+            return ConfigRange(self, range(self.size)[index])
+
+        return self.unrank(range(self.size)[index])
+
+    def unrank(self, rank: int) -> EnigmaConfig:
+        """Get the config of rank."""
+        if not 0 <= rank < self.size:
+            msg = f"rank must be in range({self.size}), {rank} given"
+            raise IndexError(msg)
+
+        for sub_space in self._sub_spaces:
+            if rank < (size := self._get_size(sub_space)):
+                break
+            rank -= size
+
+        rotor_count = sub_space.rotor_count
+        rank, state = divmod(rank, _get_state_count(rotor_count))
+        rank, plugs_rank = divmod(rank, self._plug_choices)
+        rank, reflector_position = divmod(rank, len(self.reflector_positions))
+        rotors_rank, reflector = divmod(rank, len(sub_space.reflectors))
+
+        thin_rank, normal_rank = divmod(
+            rotors_rank,
+            perm(len(self._normal_rotors), NORMAL_ROTOR_COUNT),
+        )
+        rotors = pick_unique(
+            self._normal_rotors,
+            NORMAL_ROTOR_COUNT,
+            normal_rank,
+        )
+        if rotor_count > NORMAL_ROTOR_COUNT:
+            rotors.append(sub_space.thin_rotors[thin_rank])
+
+        return EnigmaConfig(
+            tuple(
+                RotorConfig(rotor, ascii_uppercase[position])
+                for rotor, position in zip(
+                    rotors,
+                    get_positions(state, rotor_count),
+                    strict=True,
+                )
+            ),
+            ReflectorConfig(
+                sub_space.reflectors[reflector],
+                self.reflector_positions[reflector_position],
+            ),
+            unrank_plugs(plugs_rank, self.plug_count),
+        )
+
+    def rank(self, config: EnigmaConfig) -> int:
+        """Get the rank of config, raise ConfigurationError when not in space."""
+        rotor_count = len(config.rotors_config)
+        reflector_config = config.reflector_config
+        if (
+            rotor_count not in self.rotor_counts
+            or len(config.plugs) != self.plug_count
+            or reflector_config.position not in self.reflector_positions
+        ):
+            msg = f"{config.as_dict()} is not in config space"
+            raise ConfigurationError(msg)
+
+        offset = 0
+        for sub_space in self._sub_spaces:
+            if sub_space.rotor_count == rotor_count:
+                break
+            offset += self._get_size(sub_space)
+
+        # EnigmaConfig checks rotors and reflector kinds, not repeats.
+        rotors = [c.encoder for c in config.rotors_config]
+        if len(set(rotors)) < rotor_count:
+            msg = f"{config.as_dict()} is not in config space, a rotor repeats"
+            raise ConfigurationError(msg)
+        rotors_rank = rank_unique(
+            self._normal_rotors,
+            rotors[:NORMAL_ROTOR_COUNT],
+        )
+        if rotor_count > NORMAL_ROTOR_COUNT:
+            rotors_rank += sub_space.thin_rotors.index(rotors[-1]) * perm(
+                len(self._normal_rotors),
+                NORMAL_ROTOR_COUNT,
+            )
+
+        # Mixed radix digits, most significant first.
+        digits = (
+            (
+                sub_space.reflectors.index(reflector_config.encoder),
+                len(sub_space.reflectors),
+            ),
+            (
+                self.reflector_positions.index(reflector_config.position),
+                len(self.reflector_positions),
+            ),
+            (rank_plugs(config.plugs), self._plug_choices),
+            (
+                get_state(
+                    get_letter_index(c.position) for c in config.rotors_config
+                ),
+                _get_state_count(rotor_count),
+            ),
+        )
+        rank = rotors_rank
+        for digit, base in digits:
+            rank = rank * base + digit
+
+        return offset + rank
+
+    def _get_size(self, sub_space: _SubSpace) -> int:
+        return prod(
+            (
+                sub_space.get_rotor_choices(self._normal_rotors),
+                len(sub_space.reflectors),
+                len(self.reflector_positions),
+                self._plug_choices,
+                _get_state_count(sub_space.rotor_count),
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class ConfigRange:
+    """Lazy slice of a config space."""
+
+    space: ConfigSpace
+    ranks: range
+
+    @property
+    def size(self) -> int:
+        ranks = self.ranks
+
+        return max(0, -((ranks.start - ranks.stop) // ranks.step))
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def __iter__(self) -> Iterator[EnigmaConfig]:
+        return map(self.space.unrank, self.ranks)
+
+    @overload
+    def __getitem__(self, index: int) -> EnigmaConfig:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ConfigRange:
+        ...
+
+    def __getitem__(self, index: int | slice) -> EnigmaConfig | ConfigRange:
+        if isinstance(index, slice):
+            return ConfigRange(self.space, self.ranks[index])
+
+        return self.space.unrank(self.ranks[index])
+
+
+def _get_state_count(rotor_count: int) -> int:
+    count: int = LETTER_COUNT**rotor_count
+
+    return count
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class LetterIn:
+    letter: str
+
+
+@dataclass(frozen=True)
+class Step:
+    positions: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Turnover:
+    rotor: str
+
+
+@dataclass(frozen=True)
+class Stage:
+    encoder: str
+    letter_in: str
+    letter_out: str
+
+
+@dataclass(frozen=True)
+class LetterOut:
+    letter: str
+    encoded: str
+
+
+TraceEvent = LetterIn | Step | Turnover | Stage | LetterOut
+
+
+class TracerInterface(Protocol):
+    def trace(self, event: TraceEvent) -> None:
+        ...
+
+
+class PrintTracer:
+    def trace(self, event: TraceEvent) -> None:
+        match event:
+            case LetterIn(letter):
+                print(f"Encode {letter}:")
+            case Step(positions):
+                print(f"Step: {' '.join(positions)}")
+            case Turnover(rotor):
+                print(f"Turnover: {rotor}")
+            case Stage(encoder, letter_in, letter_out):
+                print(f"Converted by {encoder}: {letter_in} -> {letter_out}")
+            case LetterOut(letter, encoded):
+                print(f"Encoded: {letter} -> {encoded}")
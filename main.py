@@ -1,16 +1,32 @@
+import csv
+import io
+import json
 import sys
-from argparse import ArgumentParser, Namespace
-from collections.abc import Sequence
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import ExitStack
 from enum import Enum
-from secrets import randbelow
-from typing import TypeVar
+from functools import partial
+from pathlib import Path
+from random import Random, SystemRandom
+from time import perf_counter
+from typing import Final, Literal, TextIO, TypeVar
 
 from enigma import AvailableReflector, AvailableRotor, Enigma, EnigmaConfig
+from enigma.config import ConfigurationError
+from enigma.exception import NotASCIILetterError
+from enigma.normalize import NormalizedText, normalize_chunks
+
+if sys.platform != "win32":
+    import resource
 
 T = TypeVar("T")
 
+# Rejected characters offsets printed on stderr, the count is always given.
+MAX_REPORTED_OFFSETS: Final = 20
+
 
-def parse_args(argv: Sequence[str]) -> Namespace:
+def get_parser() -> ArgumentParser:
     parser = ArgumentParser("Emulate Enigma encryption")
     subparsers = parser.add_subparsers(dest="command")
 
@@ -39,6 +55,20 @@ def parse_args(argv: Sequence[str]) -> Namespace:
         default=1,
         help="The number of configuration to generate",
     )
+    random_command.add_argument(
+        "--seed",
+        action="store",
+        type=int,
+        default=None,
+        help="Seed for reproducible configs, only for tests: never for keys",
+    )
+    random_command.add_argument(
+        "--format",
+        "-f",
+        choices=("text", "jsonl", "csv"),
+        default="text",
+        help="Output format, configs are written as they are generated",
+    )
 
     encode_command = subparsers.add_parser("encode", help="Encode message")
 
@@ -69,14 +99,132 @@ def parse_args(argv: Sequence[str]) -> Namespace:
         type=lambda v: v.upper(),
     )
 
-    encode_command.add_argument("message", type=lambda v: v.upper())
-    return parser.parse_args(argv)
+    encode_command.add_argument(
+        "--input",
+        "-i",
+        help="Read message from this file, - for stdin (default)",
+    )
+
+    encode_command.add_argument(
+        "--output",
+        "-o",
+        help="Write encoded message to this file, - for stdout (default)",
+        default="-",
+    )
+
+    encode_command.add_argument(
+        "--jobs",
+        "-j",
+        help="Encode with this many processes, 0 for one per CPU",
+        action="store",
+        type=non_negative_int,
+        default=1,
+    )
+
+    encode_command.add_argument(
+        "--buffer-size",
+        "-b",
+        help="Characters read at once, and sent to a process with --jobs",
+        action="store",
+        type=positive_int,
+        default=Enigma.DEFAULT_CHUNK_SIZE,
+    )
+
+    encode_command.add_argument(
+        "--normalize",
+        "-n",
+        help=(
+            "Uppercase letters, drop whitespace and punctuation, and leave"
+            " out other characters, reporting their offsets on stderr"
+        ),
+        action="store_true",
+    )
+
+    encode_command.add_argument(
+        "--digits",
+        help="Spell digits in german, implies --normalize",
+        action="store_true",
+    )
+
+    encode_command.add_argument(
+        "--umlauts",
+        help="Expand umlauts and eszett, implies --normalize",
+        action="store_true",
+    )
+
+    encode_command.add_argument(
+        "--stats",
+        help="Report throughput and peak memory on stderr",
+        action="store_true",
+    )
+
+    encode_command.add_argument(
+        "message",
+        help="Message to encode, read from --input when omitted",
+        nargs="?",
+    )
+
+    serve_command = subparsers.add_parser(
+        "serve",
+        help="Run the local encryption service",
+    )
+    serve_command.add_argument(
+        "--host",
+        help="Listen on this address, 127.0.0.1 by default",
+    )
+    serve_command.add_argument(
+        "--port",
+        help="Listen on this TCP port, 7654 by default, 0 for any free port",
+        type=int,
+    )
+    serve_command.add_argument(
+        "--unix",
+        help="Listen on this Unix socket path instead of TCP",
+        type=Path,
+    )
+    serve_command.add_argument(
+        "--workers",
+        "-w",
+        help="Process pool size, one per CPU by default, 0 for no pool",
+        type=int,
+    )
+    serve_command.add_argument(
+        "--max-batch-size",
+        help="Most requests encoded in one batch",
+        type=int,
+    )
+    serve_command.add_argument(
+        "--max-delay",
+        help="Seconds waited for more requests before encoding a batch",
+        type=float,
+    )
+
+    return parser
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        msg = f"must be positive, {number} given"
+        raise ArgumentTypeError(msg)
+
+    return number
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        msg = f"must be at least one, {number} given"
+        raise ArgumentTypeError(msg)
+
+    return number
 
 
 def main(argv: Sequence[str] | None = None) -> None:
     argv = argv or sys.argv
 
-    args = parse_args(argv[1:])
+    parser = get_parser()
+    args = parser.parse_args(argv[1:])
 
     match args.command:
         case "list":
@@ -90,31 +238,229 @@ def main(argv: Sequence[str] | None = None) -> None:
             )
 
         case "encode":
-            config = EnigmaConfig.parse(args.rotors, args.reflector, args.plugs)
-            print(Enigma(config).encode_message(args.message))
+            if args.message is not None and args.input is not None:
+                parser.error("argument message: not allowed with --input/-i")
+            encode(args, parser)
 
         case "random":
-            plug_count = (
-                args.plug_count
-                if args.plug_count is not None
-                else randbelow(11)
+            generate_random(args)
+
+        case "serve":
+            serve(args)
+
+
+def encode(args: Namespace, parser: ArgumentParser) -> None:
+    try:
+        config = EnigmaConfig.parse(args.rotors, args.reflector, args.plugs)
+    except (ConfigurationError, KeyError, TypeError, ValueError) as error:
+        parser.error(f"invalid config, {type(error).__name__}: {error}")
+
+    try:
+        counter, rejected, elapsed = encode_files(args, config)
+    except NotASCIILetterError as error:
+        parser.error(f"{error} Give --normalize to leave such characters out.")
+
+    if rejected:
+        print_rejected(rejected)
+    if args.stats:
+        print_stats(counter.count, elapsed)
+
+
+def encode_files(
+    args: Namespace,
+    config: EnigmaConfig,
+) -> tuple["CharacterCounter", list[int], float]:
+    """Encode input into output, return counter, rejected and seconds."""
+    # Files are opened once config is valid, a bad one keeps output intact.
+    with ExitStack() as stack:
+        if args.message is not None:
+            reader: TextIO = io.StringIO(args.message)
+        else:
+            reader = open_text(stack, args.input or "-", "r")
+        writer = open_text(stack, args.output, "w")
+
+        counter = CharacterCounter(reader)
+        chunks: Iterator[str] = iter(
+            partial(counter.read, args.buffer_size),
+            "",
+        )
+        rejected: list[int] = []
+        if args.normalize or args.digits or args.umlauts:
+            chunks = collect_rejected(
+                normalize_chunks(
+                    chunks,
+                    digits=args.digits,
+                    umlauts=args.umlauts,
+                ),
+                rejected,
+            )
+
+        started = perf_counter()
+        encoded: Iterator[str]
+        if args.jobs == 1:
+            encoded = Enigma(config).encode_chunks(chunks)
+        else:
+            # Process pools take tens of milliseconds to import.
+            from enigma.parallel import (  # noqa: PLC0415 (slow import)
+                encode_chunks_parallel,
             )
-            configs = (
-                EnigmaConfig.generate_random_config(plug_count).as_dict()
-                for _ in range(args.count)
+
+            encoded = encode_chunks_parallel(
+                config,
+                chunks,
+                workers=args.jobs or None,
             )
-            display = "\n\n".join(
-                "\n".join(
-                    (
-                        f"rotors: '{c['rotors']}'",
-                        f"reflector: '{c['reflector']}'",
-                        f"plugs: '{c['plugin_board']}'",
-                    ),
+
+        writer.writelines(encoded)
+        writer.write("\n")
+        elapsed = perf_counter() - started
+
+    return counter, rejected, elapsed
+
+
+def open_text(
+    stack: ExitStack,
+    path: str,
+    mode: Literal["r", "w"],
+) -> TextIO:
+    """Open path closed with stack, - is stdin or stdout."""
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+
+    return stack.enter_context(Path(path).open(mode))
+
+
+def collect_rejected(
+    texts: Iterable[NormalizedText],
+    rejected: list[int],
+) -> Iterator[str]:
+    """Get letters of texts, extending rejected with their offsets."""
+    for text in texts:
+        rejected.extend(text.rejected)
+        yield text.letters
+
+
+def print_rejected(rejected: Sequence[int]) -> None:
+    offsets = ", ".join(map(str, rejected[:MAX_REPORTED_OFFSETS]))
+    if len(rejected) > MAX_REPORTED_OFFSETS:
+        offsets += ", ..."
+    print(
+        f"{len(rejected)} characters left out, at offsets {offsets}",
+        file=sys.stderr,
+    )
+
+
+class CharacterCounter:
+    """Count characters read from reader."""
+
+    def __init__(self, reader: TextIO) -> None:
+        self._reader = reader
+        self.count = 0
+
+    def read(self, size: int) -> str:
+        data = self._reader.read(size)
+        self.count += len(data)
+
+        return data
+
+
+def print_stats(count: int, elapsed: float) -> None:
+    throughput = count / elapsed if elapsed else 0.0
+    print(
+        f"{count} characters in {elapsed:.3f} s,"
+        f" {throughput / 1e6:.2f} M characters/s",
+        file=sys.stderr,
+    )
+
+    if (peak := get_peak_memory()) is not None:
+        print(f"peak memory: {peak / (1 << 20):.1f} MiB", file=sys.stderr)
+
+
+def get_peak_memory() -> int | None:
+    """Get the peak resident memory in bytes, of this process or a child."""
+    if sys.platform == "win32":
+        return None
+
+    # Linux gives kilobytes, macOS bytes.
+    unit = 1 if sys.platform == "darwin" else 1024
+
+    return unit * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def generate_random(args: Namespace) -> None:
+    rng: Random = SystemRandom()
+    if args.seed is not None:
+        # Only for tests and simulations, documented in --seed help.
+        rng = Random(args.seed)  # noqa: S311
+    plug_count = (
+        args.plug_count if args.plug_count is not None else rng.randrange(11)
+    )
+    configs = (
+        c.as_dict()
+        for c in EnigmaConfig.generate_random_configs(
+            args.count,
+            plug_count,
+            rng=rng,
+        )
+    )
+    writer = sys.stdout
+
+    match args.format:
+        case "text":
+            separator = ""
+            for c in configs:
+                writer.write(
+                    f"{separator}rotors: '{c['rotors']}'"
+                    f"\nreflector: '{c['reflector']}'"
+                    f"\nplugs: '{c['plugin_board']}'",
                 )
-                for c in configs
+                separator = "\n\n"
+            writer.write("\n")
+
+        case "jsonl":
+            for c in configs:
+                writer.write(json.dumps(c) + "\n")
+
+        case "csv":
+            csv_writer = csv.DictWriter(
+                writer,
+                ("rotors", "reflector", "plugin_board"),
+                lineterminator="\n",
             )
+            csv_writer.writeheader()
+            csv_writer.writerows(configs)
+
+
+def serve(args: Namespace) -> None:
+    # asyncio import doubles other commands start time, only pay it here.
+    import asyncio  # noqa: PLC0415 (slow import)
+
+    from enigma.server import EnigmaServer  # noqa: PLC0415 (slow import)
+
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "path": args.unix,
+        "max_batch_size": args.max_batch_size,
+        "max_delay": args.max_delay,
+    }
+    server = EnigmaServer(
+        workers=args.workers,
+        **{k: v for k, v in options.items() if v is not None},
+    )
+
+    async def run() -> None:
+        await server.start()
+        print(f"Listening on {server.address}", file=sys.stderr)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
 
-            print(display)
+    asyncio.run(run())
 
 
 def enum_to_string(enum: type[Enum], line_prefix: str) -> str:
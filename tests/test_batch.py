@@ -0,0 +1,95 @@
+import pytest
+
+from enigma.available import AvailableReflector, AvailableRotor
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+
+np = pytest.importorskip("numpy")
+
+from enigma.batch import encode_batch  # noqa: E402
+
+
+def get_configs() -> list[EnigmaConfig]:
+    return [
+        EnigmaConfig.parse("I:A II:A III:A", "UKW:A", ""),
+        EnigmaConfig.parse("I:Z II:Y III:X", "REFB:C", "AB CD EF"),
+        EnigmaConfig.parse(
+            "II1930:U IIIC:X I1930:L BETA:A",
+            "REFBTHIN:A",
+            "MN AH JR CQ",
+        ),
+        EnigmaConfig.parse("IIC:Q IIIK:Z VI1939:Z", "REFC:Z", "QW ER TY UI"),
+    ]
+
+
+class EncodeBatchTest:
+    def test_should_return_one_row_per_config(self) -> None:
+        encoded = encode_batch(get_configs(), "HELLO WORLD")
+
+        assert encoded.shape == (4, 10)
+        assert encoded.dtype == np.uint8
+
+    def test_rows_should_be_identical_to_encode_message(self) -> None:
+        message = "HELLOWORLD" * 70
+        configs = get_configs()
+
+        encoded = encode_batch(configs, message)
+
+        for row, config in zip(encoded, configs, strict=True):
+            expected = Enigma(config).encode_message(message)
+            assert (row + ord("A")).tobytes().decode() == expected.replace(
+                " ",
+                "",
+            ).replace("\n", "")
+
+    def test_should_start_at_given_step(self) -> None:
+        encoded = encode_batch(get_configs()[:1], "BAR", start=3)
+
+        assert (encoded[0] + ord("A")).tobytes() == b"RQF"
+
+    def test_should_encode_in_several_batches(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        configs = get_configs()
+        expected = encode_batch(configs, "FOOBAR")
+        monkeypatch.setattr("enigma.batch.MAX_CELLS", 1)
+
+        assert (encode_batch(configs, "FOOBAR") == expected).all()
+
+
+class GenerateRandomBatchTest:
+    def test_generator_should_draw_valid_configs(self) -> None:
+        batch = EnigmaConfig.generate_random_batch(
+            500,
+            10,
+            rng=np.random.default_rng(0),
+        )
+
+        assert len(batch) == 500
+        assert len(batch.plugs) == 500 * 20
+        for config in batch:
+            rotors = [c.encoder for c in config.rotors_config]
+            letters = config.as_dict()["plugin_board"].replace(" ", "")
+            assert len(set(rotors)) == len(rotors) == 3
+            assert set(rotors) <= AvailableRotor.get_normal_rotors()
+            assert (
+                config.reflector_config.encoder
+                in AvailableReflector.get_normal_reflectors()
+            )
+            assert len(set(letters)) == len(letters) == 20
+        assert len({c.reflector_config.position for c in batch}) > 1
+
+    def test_generator_should_be_reproducible_with_seed(self) -> None:
+        first = EnigmaConfig.generate_random_batch(
+            20,
+            3,
+            rng=np.random.default_rng(42),
+        )
+        second = EnigmaConfig.generate_random_batch(
+            20,
+            3,
+            rng=np.random.default_rng(42),
+        )
+
+        assert first == second
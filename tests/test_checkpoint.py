@@ -0,0 +1,250 @@
+import json
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from enigma.analysis import (
+    Candidate,
+    WorkUnit,
+    search_work_units,
+    solve_plug_board,
+)
+from enigma.analysis.checkpoint import Checkpoint, get_scorer_name
+from enigma.analysis.scoring import index_of_coincidence
+from enigma.available import AvailableReflector, AvailableRotor
+from enigma.compiled import get_state
+from enigma.config import EnigmaConfig, ReflectorConfig
+from enigma.enigma import Enigma
+from enigma.helper import get_letter_index, parse_letters
+
+from .test_search import PLAINTEXT
+
+ROTORS = (AvailableRotor.I, AvailableRotor.II, AvailableRotor.III)
+REFLECTOR = ReflectorConfig(AvailableReflector.REFB, "A")
+
+
+def get_ciphertext() -> bytes:
+    config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "")
+    ciphertext = Enigma(config).encode_message(PLAINTEXT)
+
+    return parse_letters(ciphertext.replace(" ", "").replace("\n", ""))
+
+
+def get_units() -> list[WorkUnit]:
+    state = get_state(get_letter_index(p) for p in "QCX")
+    order = (AvailableRotor.II, AvailableRotor.I, AvailableRotor.III)
+
+    return [
+        WorkUnit(ROTORS, 0, 200),
+        WorkUnit(order, state - 100, state + 100),
+        WorkUnit(order, 0, 200),
+    ]
+
+
+def scale_index_of_coincidence(indexes: bytes, factor: float = 1.0) -> float:
+    return factor * index_of_coincidence(indexes)
+
+
+class LengthScorer:
+    def __call__(self, indexes: bytes) -> float:
+        return float(len(indexes))
+
+
+class GetScorerNameTest:
+    def test_should_name_function(self) -> None:
+        assert (
+            get_scorer_name(index_of_coincidence)
+            == "enigma.analysis.scoring.index_of_coincidence"
+        )
+
+    def test_should_name_partial_with_arguments(self) -> None:
+        scorer = partial(scale_index_of_coincidence, factor=2.0)
+
+        assert get_scorer_name(scorer) == (
+            f"{__name__}.scale_index_of_coincidence(factor=2.0)"
+        )
+
+    def test_should_name_callable_instance_by_type(self) -> None:
+        assert get_scorer_name(LengthScorer()) == f"{__name__}.LengthScorer"
+
+    def test_search_should_checkpoint_partial_scorer(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        indexes = get_ciphertext()
+        units = get_units()[:1]
+        scorer = partial(scale_index_of_coincidence, factor=2.0)
+
+        result = search_work_units(
+            indexes,
+            REFLECTOR,
+            units,
+            scorer=scorer,
+            workers=1,
+            checkpoint=tmp_path / "job.json",
+        )
+        resumed = search_work_units(
+            indexes,
+            REFLECTOR,
+            units,
+            scorer=scorer,
+            workers=1,
+            checkpoint=tmp_path / "job.json",
+        )
+
+        assert result.candidates
+        assert resumed.decrypts == 0
+
+
+class CheckpointTest:
+    def test_open_should_load_saved_checkpoint(self, tmp_path: Path) -> None:
+        path = tmp_path / "job.json"
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AB")
+        checkpoint = Checkpoint(path, "key", top=2)
+        for task, score in [(0, 0.1), (1, 0.3), (2, 0.2), (5, 0.0)]:
+            checkpoint.add(task, [Candidate(score, config)])
+        checkpoint.state["seeds"] = [1, 2]
+        checkpoint.save()
+
+        loaded = Checkpoint.open(path, "key", top=2)
+
+        assert json.loads(path.read_text())["done"] == [[0, 3], [5, 6]]
+        assert loaded.done == {0, 1, 2, 5}
+        assert [c.score for c in loaded.candidates] == [0.3, 0.2]
+        assert loaded.candidates[0].config.as_dict() == config.as_dict()
+        assert loaded.state == {"seeds": [1, 2]}
+
+    def test_add_should_save_after_interval(self, tmp_path: Path) -> None:
+        path = tmp_path / "job.json"
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+
+        checkpoint = Checkpoint(path, "key", top=1, interval=0)
+        checkpoint.add(0, [Candidate(0.0, config)])
+        checkpoint.add(1, [])
+
+        assert checkpoint.writes == 2
+        assert checkpoint.write_seconds > 0
+        assert Checkpoint.open(path, "key", top=1).done == {0, 1}
+
+    def test_add_should_not_save_before_interval(self, tmp_path: Path) -> None:
+        checkpoint = Checkpoint(tmp_path / "job.json", "key", top=1)
+        checkpoint.add(0, [])
+
+        assert checkpoint.writes == 0
+        assert not (tmp_path / "job.json").exists()
+
+    def test_open_should_raise_on_other_job(self, tmp_path: Path) -> None:
+        Checkpoint(tmp_path / "job.json", "key", top=1).save()
+
+        with pytest.raises(ValueError, match="another search job"):
+            Checkpoint.open(tmp_path / "job.json", "other", top=1)
+
+
+class ResumeSearchTest:
+    def test_resumed_search_should_skip_done_units(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        path = tmp_path / "search.json"
+        indexes = get_ciphertext()
+        units = get_units()
+        expected = search_work_units(indexes, REFLECTOR, units, workers=1)
+
+        # A run interrupted after its first unit.
+        search_work_units(
+            indexes,
+            REFLECTOR,
+            units[:1],
+            workers=1,
+            checkpoint=tmp_path / "first.json",
+        )
+        (tmp_path / "first.json").rename(path)
+        data = json.loads(path.read_text())
+        with pytest.raises(ValueError, match="another search job"):
+            search_work_units(
+                indexes,
+                REFLECTOR,
+                units,
+                workers=1,
+                checkpoint=path,
+            )
+
+        result = search_work_units(
+            indexes,
+            REFLECTOR,
+            units,
+            workers=1,
+            checkpoint=tmp_path / "full.json",
+        )
+        resumed = search_work_units(
+            indexes,
+            REFLECTOR,
+            units,
+            workers=1,
+            checkpoint=tmp_path / "full.json",
+        )
+
+        assert data["done"] == [[0, 1]]
+        assert [c.score for c in result.candidates] == [
+            c.score for c in expected.candidates
+        ]
+        assert result.checkpoint_seconds > 0
+        assert resumed.decrypts == 0
+        assert [c.config.as_dict() for c in resumed.candidates] == [
+            c.config.as_dict() for c in expected.candidates
+        ]
+
+    def test_partially_done_search_should_run_remaining_units(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        path = tmp_path / "search.json"
+        indexes = get_ciphertext()
+        units = get_units()
+        search_work_units(indexes, REFLECTOR, units, workers=1, checkpoint=path)
+        data = json.loads(path.read_text())
+        data["done"] = [[0, 1], [2, 3]]
+        data["candidates"] = []
+        path.write_text(json.dumps(data))
+
+        resumed = search_work_units(
+            indexes,
+            REFLECTOR,
+            units,
+            workers=1,
+            checkpoint=path,
+        )
+
+        assert resumed.decrypts == len(units[1])
+        assert resumed.candidates[0].config.as_dict()["rotors"] == (
+            "II:Q I:C III:X"
+        )
+
+    def test_resumed_plug_board_search_should_reuse_seeds(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        path = tmp_path / "plugs.json"
+        config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AQ EW RT")
+        ciphertext = Enigma(config).encode_message(PLAINTEXT)
+        without_plugs = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "")
+
+        first = solve_plug_board(
+            ciphertext,
+            without_plugs,
+            restarts=2,
+            workers=1,
+            checkpoint=path,
+        )
+        seeds = json.loads(path.read_text())["state"]["seeds"]
+        resumed = solve_plug_board(
+            ciphertext,
+            without_plugs,
+            restarts=2,
+            workers=1,
+            checkpoint=path,
+        )
+
+        assert json.loads(path.read_text())["state"]["seeds"] == seeds
+        assert [c.score for c in resumed] == [c.score for c in first]
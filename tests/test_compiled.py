@@ -0,0 +1,242 @@
+import pickle
+from string import ascii_uppercase
+
+import pytest
+
+from enigma.available import AvailableReflector, AvailableRotor
+from enigma.compiled import CompiledEnigma, ScramblerCache, scrambler_cache
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.helper import get_letter_index
+from enigma.tracing import TraceEvent
+
+
+class NullTracer:
+    def trace(self, event: TraceEvent) -> None:
+        pass
+
+
+def get_configs() -> list[EnigmaConfig]:
+    return [
+        EnigmaConfig.parse("I:A II:A III:A", "UKW:A", ""),
+        EnigmaConfig.parse("I:Z II:Y III:X", "REFB:C", "AB CD EF"),
+        EnigmaConfig.parse("IIC:Q IIIK:Z VI1939:Z", "REFC:Z", "QW ER TY UI"),
+        EnigmaConfig.parse(
+            "II1930:U IIIC:X I1930:L BETA:A",
+            "REFBTHIN:A",
+            "MN AH JR CQ",
+        ),
+    ]
+
+
+def encode_with_object_chain(config: EnigmaConfig, message: str) -> str:
+    return Enigma(config, NullTracer()).encode_message(message)
+
+
+class CompiledEnigmaTest:
+    @pytest.mark.parametrize("config", get_configs())
+    def test_encode_message_should_be_identical_to_object_chain(
+        self,
+        config: EnigmaConfig,
+    ) -> None:
+        # long enough to turn over every three rotors configuration.
+        message = ascii_uppercase * 700
+
+        assert Enigma(config).encode_message(
+            message,
+        ) == encode_with_object_chain(config, message)
+
+    @pytest.mark.parametrize("config", get_configs())
+    def test_encode_should_be_identical_to_encode_indexes(
+        self,
+        config: EnigmaConfig,
+    ) -> None:
+        indexes = bytes(range(26)) * 30
+        compiled = CompiledEnigma(config)
+        encoded = []
+        for letter in indexes:
+            compiled.make_step()
+            encoded.append(compiled.encode(letter))
+
+        assert bytes(encoded) == CompiledEnigma(config).encode_indexes(indexes)
+
+    def test_encode_indexes_should_continue_from_previous_call(self) -> None:
+        config = get_configs()[1]
+        indexes = bytes(range(26)) * 10
+        compiled = CompiledEnigma(config)
+
+        encoded = b"".join(
+            compiled.encode_indexes(indexes[start : start + 7])
+            for start in range(0, len(indexes), 7)
+        )
+
+        assert encoded == CompiledEnigma(config).encode_indexes(indexes)
+
+    def test_encode_indexes_should_return_empty_bytes(self) -> None:
+        assert CompiledEnigma(get_configs()[0]).encode_indexes(b"") == b""
+
+    def test_encode_should_step_fast_rotor_first(self) -> None:
+        compiled = CompiledEnigma(get_configs()[0])
+        compiled.make_step()
+
+        assert compiled.encode(get_letter_index("A")) == get_letter_index("I")
+
+    @pytest.mark.parametrize("step", [0, 1, 26, 677, 17576, 50000])
+    def test_seek_should_be_identical_to_encoding_step_letters(
+        self,
+        step: int,
+    ) -> None:
+        config = get_configs()[1]
+        indexes = bytes(range(26)) * 3
+        expected = CompiledEnigma(config).encode_indexes(bytes(step) + indexes)
+
+        compiled = CompiledEnigma(config)
+        compiled.seek(step)
+
+        assert compiled.encode_indexes(indexes) == expected[step:]
+
+    def test_position_at_should_not_step_rotors(self) -> None:
+        compiled = CompiledEnigma(get_configs()[1])
+
+        assert compiled.position_at(1) == ("Z", "Y", "Y")
+        assert compiled.position_at(0) == ("Z", "Y", "X")
+
+    @pytest.mark.parametrize("config", get_configs())
+    def test_get_permutations_should_encode_like_encode_indexes(
+        self,
+        config: EnigmaConfig,
+    ) -> None:
+        indexes = bytes(range(26)) * 30
+        compiled = CompiledEnigma(config)
+        compiled.seek(5)
+
+        permutations = compiled.get_permutations(len(indexes))
+
+        compiled.seek(5)
+        assert bytes(
+            p[x] for p, x in zip(permutations, indexes, strict=True)
+        ) == compiled.encode_indexes(indexes)
+
+    @pytest.mark.parametrize("config", get_configs())
+    @pytest.mark.parametrize("length", [0, 5, 25, 26, 700])
+    def test_encode_at_should_not_change_engine_state(
+        self,
+        config: EnigmaConfig,
+        length: int,
+    ) -> None:
+        indexes = (bytes(range(26)) * 30)[:length]
+        compiled = CompiledEnigma(config)
+        compiled.seek(10)
+        expected = compiled.encode_indexes(indexes)
+        compiled.seek(3)
+        state = compiled.state
+
+        assert compiled.encode_at(10, indexes) == expected
+        assert compiled.state == state
+
+    @pytest.mark.parametrize("config", get_configs())
+    def test_frozen_should_encode_without_scramblers(
+        self,
+        config: EnigmaConfig,
+    ) -> None:
+        indexes = bytes(range(26)) * 30
+        cache = ScramblerCache()
+        frozen = CompiledEnigma(config, cache).frozen()
+        cache.clear()
+
+        assert frozen.encode_at(7, indexes) == CompiledEnigma(
+            config,
+        ).encode_at(7, indexes)
+        assert frozen.frozen() is frozen
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_state_should_raise_when_out_of_range(self) -> None:
+        compiled = CompiledEnigma(get_configs()[0])
+
+        with pytest.raises(ValueError, match="state must be in range"):
+            compiled.state = -1
+
+    def test_copy_should_step_independently(self) -> None:
+        compiled = CompiledEnigma(get_configs()[1])
+        indexes = bytes(range(26)) * 2
+        copy = compiled.copy()
+
+        encoded = copy.encode_indexes(indexes)
+
+        assert compiled.state != copy.state
+        assert compiled.encode_indexes(indexes) == encoded
+
+
+class ScramblerCacheTest:
+    def test_machines_differing_by_plugs_should_share_tables(self) -> None:
+        cache = ScramblerCache()
+        message = bytes(range(26)) * 40
+        CompiledEnigma(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AB CD"),
+            cache,
+        ).encode_indexes(message)
+        misses = cache.misses
+
+        engine = CompiledEnigma(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "QW ER TY"),
+            cache,
+        )
+
+        assert engine.encode_indexes(message) == CompiledEnigma(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "QW ER TY"),
+            ScramblerCache(0),
+        ).encode_indexes(message)
+        assert cache.misses == misses
+        assert cache.hits > 0
+
+    def test_cache_should_not_exceed_max_bytes(self) -> None:
+        cache = ScramblerCache(10 * ScramblerCache.TABLE_SIZE)
+        CompiledEnigma(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", ""),
+            cache,
+        ).encode_indexes(bytes(26 * 100))
+
+        assert len(cache) == 10
+        assert cache.nbytes == cache.max_bytes
+
+    def test_smaller_max_bytes_should_evict_least_recently_used(self) -> None:
+        cache = ScramblerCache()
+        key = (
+            (AvailableRotor.I, AvailableRotor.II),
+            AvailableReflector.REFB,
+            "A",
+        )
+        for state in range(3):
+            cache.get(key, state, bytes)
+        cache.get(key, 0, bytes)
+
+        cache.max_bytes = ScramblerCache.TABLE_SIZE * 2
+
+        assert cache.get(key, 0, lambda: b"new") == b""
+        assert cache.get(key, 1, lambda: b"new") == b"new"
+
+    def test_negative_max_bytes_should_raise_value_error(self) -> None:
+        with pytest.raises(ValueError, match="max_bytes must be positive"):
+            ScramblerCache(-1)
+
+    def test_pickled_cache_should_be_empty(self) -> None:
+        cache = ScramblerCache(ScramblerCache.TABLE_SIZE * 4)
+        cache.get(((AvailableRotor.I,), AvailableReflector.UKW, "A"), 0, bytes)
+
+        copy = pickle.loads(pickle.dumps(cache))  # noqa: S301 (own data)
+
+        assert len(copy) == 0
+        assert copy.max_bytes == cache.max_bytes
+
+    def test_pickled_shared_cache_should_be_shared_cache(self) -> None:
+        data = pickle.dumps(scrambler_cache)
+
+        assert pickle.loads(data) is scrambler_cache  # noqa: S301 (own data)
+
+    def test_pickled_engine_should_encode_like_engine(self) -> None:
+        compiled = CompiledEnigma(get_configs()[1])
+        compiled.encode_indexes(bytes(range(26)))
+
+        copy = pickle.loads(pickle.dumps(compiled))  # noqa: S301 (own data)
+
+        assert copy.encode_indexes(b"FOO") == compiled.encode_indexes(b"FOO")
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
+from random import Random
 
 import pytest
 
 from enigma.available import AvailableReflector, AvailableRotor
 from enigma.config import (
     AbstractRotorConfig,
+    ConfigArray,
     ConfigurationError,
     EnigmaConfig,
     InvalidReflectorError,
@@ -28,6 +30,18 @@ class AbstractPositionalConfigTest:
             self.FakeConfig(rotor_position)
 
 
+def get_machine(config: EnigmaConfig) -> dict[str, str]:
+    """Config as_dict with sorted plugs, as packing keeps them."""
+    as_dict = config.as_dict()
+    plugs = ("".join(sorted(plug)) for plug in as_dict["plugin_board"].split())
+
+    return {
+        "rotors": as_dict["rotors"],
+        "reflector": as_dict["reflector"],
+        "plugin_board": " ".join(sorted(plugs)),
+    }
+
+
 class EnigmaConfigTest:
     def test_init_should_not_raise(self) -> None:
         EnigmaConfig(
@@ -160,3 +174,158 @@ class EnigmaConfigTest:
                 ReflectorConfig(AvailableReflector.REFBTHIN, "A"),
                 [],
             )
+
+    @pytest.mark.parametrize("plug_count", [0, 1, 10])
+    def test_generate_random_configs_should_generate_count_configs(
+        self,
+        plug_count: int,
+    ) -> None:
+        configs = list(EnigmaConfig.generate_random_configs(50, plug_count))
+
+        assert len(configs) == 50
+        for config in configs:
+            rotors = [c.encoder for c in config.rotors_config]
+            letters = [
+                letter for p in config.plugs for letter in (p.left, p.right)
+            ]
+            assert len(set(rotors)) == len(rotors) == 3
+            assert set(rotors) <= AvailableRotor.get_normal_rotors()
+            assert len(set(letters)) == len(letters) == plug_count * 2
+
+    def test_generate_random_configs_should_raise_on_too_many_plugs(
+        self,
+    ) -> None:
+        with pytest.raises(ValueError, match="plug_count must be at most 10"):
+            next(EnigmaConfig.generate_random_configs(1, 11))
+
+    def test_generate_random_batch_should_be_reproducible_with_seed(
+        self,
+    ) -> None:
+        rng = Random(42)  # noqa: S311 (reproducible configs, not keys)
+        first = EnigmaConfig.generate_random_batch(20, 10, rng=rng)
+        rng.seed(42)
+        second = EnigmaConfig.generate_random_batch(20, 10, rng=rng)
+
+        assert first == second
+        assert [c.as_dict() for c in first] == [c.as_dict() for c in second]
+
+    def test_generate_random_batch_should_be_compact(self) -> None:
+        batch = EnigmaConfig.generate_random_batch(20, 4)
+
+        assert len(batch) == 20
+        assert len(batch.rotors) == len(batch.positions) == 60
+        assert len(batch.reflectors) == len(batch.reflector_positions) == 20
+        assert len(batch.plugs) == 20 * 8
+        assert batch[-1] == batch[19]
+        assert batch[18:] == [batch[18], batch[19]]
+
+    def test_generate_random_configs_should_span_batches(self) -> None:
+        rng = Random(1)  # noqa: S311 (reproducible configs, not keys)
+        configs = EnigmaConfig.generate_random_configs(1500, rng=rng)
+
+        assert len(list(configs)) == 1500
+
+    @pytest.mark.parametrize(
+        ("rotors", "reflector", "plugs"),
+        [
+            ("I:A II:B III:C", "REFB:A", ""),
+            (
+                "VIII1939:Z IIK:Q IC:M",
+                "UKWK:Y",
+                "AB CD EF GH IJ KL MN OP QR ST",
+            ),
+            ("II1930:U IIIC:X I1930:L GAMMA:F", "REFCTHIN:Q", "MN AH"),
+        ],
+    )
+    def test_from_bytes_should_unpack_to_bytes(
+        self,
+        rotors: str,
+        reflector: str,
+        plugs: str,
+    ) -> None:
+        config = EnigmaConfig.parse(rotors, reflector, plugs)
+
+        packed = config.to_bytes()
+        unpacked = EnigmaConfig.from_bytes(packed)
+
+        assert len(packed) == EnigmaConfig.PACKED_SIZE
+        assert get_machine(unpacked) == get_machine(config)
+
+    def test_to_bytes_should_ignore_plugs_order(self) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "MN HA")
+
+        unpacked = EnigmaConfig.from_bytes(config.to_bytes())
+
+        assert unpacked.as_dict()["plugin_board"] == "AH MN"
+        assert (
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AH NM").to_bytes()
+            == config.to_bytes()
+        )
+
+    def test_from_bytes_should_raise_on_used_unused_slot(self) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C BETA:D", "REFBTHIN:A", "")
+        # Rotor count is the last digit, clearing it drops the fourth rotor.
+        rank = int.from_bytes(config.to_bytes(), "little") - 1
+
+        with pytest.raises(ValueError, match="out of range"):
+            EnigmaConfig.from_bytes(rank.to_bytes(16, "little"))
+
+    @pytest.mark.parametrize(
+        ("data", "match"),
+        [
+            (b"", "must be 16 bytes"),
+            (b"\xff" * 16, "out of range"),
+        ],
+    )
+    def test_from_bytes_should_raise_on_invalid_data(
+        self,
+        data: bytes,
+        match: str,
+    ) -> None:
+        with pytest.raises(ValueError, match=match):
+            EnigmaConfig.from_bytes(data)
+
+
+class ConfigArrayTest:
+    def test_should_store_configs_packed(self) -> None:
+        configs = list(EnigmaConfig.generate_random_configs(10, 10))
+
+        array = ConfigArray(configs)
+
+        assert len(array) == 10
+        assert array.nbytes == 10 * EnigmaConfig.PACKED_SIZE
+        assert list(map(get_machine, array)) == list(map(get_machine, configs))
+
+    def test_slice_should_be_config_array(self) -> None:
+        configs = list(EnigmaConfig.generate_random_configs(10))
+        array = ConfigArray(configs)
+
+        sliced = array[2:8:3]
+
+        assert isinstance(sliced, ConfigArray)
+        assert list(map(get_machine, sliced)) == [
+            get_machine(configs[2]),
+            get_machine(configs[5]),
+        ]
+
+    def test_frombytes_should_load_tobytes(self) -> None:
+        array = ConfigArray(EnigmaConfig.generate_random_configs(5, 3))
+        array.append(EnigmaConfig.parse("I:A II:B III:C", "REFB:A", ""))
+
+        loaded = ConfigArray.frombytes(array.tobytes())
+
+        assert [c.as_dict() for c in loaded] == [c.as_dict() for c in array]
+        assert loaded[-1].as_dict()["rotors"] == "I:A II:B III:C"
+
+    def test_frombytes_should_raise_on_partial_config(self) -> None:
+        with pytest.raises(ValueError, match="multiple of 16"):
+            ConfigArray.frombytes(bytes(33))
+
+    def test_setitem_should_replace_config(self) -> None:
+        array = ConfigArray(EnigmaConfig.generate_random_configs(3))
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AB")
+
+        array[-2] = config
+
+        assert get_machine(array[1]) == get_machine(config)
+        assert len(array) == 3
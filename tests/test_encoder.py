@@ -1,7 +1,7 @@
 import pytest
 
 from enigma.available import AvailableRotor
-from enigma.encoder import Encoder
+from enigma.encoder import Encoder, get_encoder_tables
 
 
 class ConfigTest:
@@ -112,3 +112,15 @@ class EncoderTest:
         rotor = Encoder(config)
 
         assert rotor.encode_reverse(reverse) == normal
+
+
+class EncoderTablesTest:
+    def test_tables_should_be_shared_by_encoders(self) -> None:
+        first = get_encoder_tables(AvailableRotor.I)
+
+        Encoder(AvailableRotor.I)
+
+        assert get_encoder_tables(AvailableRotor.I) is first
+
+    def test_encoder_should_not_have_instance_dict(self) -> None:
+        assert not hasattr(Encoder(AvailableRotor.I), "__dict__")
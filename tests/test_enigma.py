@@ -1,13 +1,22 @@
+import io
+import mmap
 from string import ascii_uppercase
 
 import pytest
 
 from enigma.available import AvailableReflector, AvailableRotor
-from enigma.enigma import Enigma
+from enigma.enigma import Enigma, EnigmaState
 from enigma.config import EnigmaConfig, ReflectorConfig, RotorConfig
 from enigma.exception import NotASCIILetterError
 from enigma.plug_board import Plug
 
+from .test_compiled import NullTracer
+
+
+def get_letters(config: EnigmaConfig, message: str) -> str:
+    """Encode message letters, without grouping them."""
+    return "".join(map(Enigma(config).encode_letter, message))
+
 
 class EnigmaTest:
     def test_encode_letter_should_step_first_rotor(self) -> None:
@@ -230,3 +239,242 @@ class EnigmaTest:
         decoded = Enigma(config).encode_message(encoded)
 
         assert decoded == "FOOB AR"
+
+    @pytest.mark.parametrize(
+        ("step", "expected"),
+        [
+            (0, ("A", "A", "Y")),
+            (1, ("A", "A", "Z")),
+            (2, ("A", "B", "A")),
+            (26 * 26 + 2, ("B", "B", "A")),
+            (26**3, ("A", "A", "Y")),
+        ],
+    )
+    def test_position_at_should_return_rotors_positions(
+        self,
+        step: int,
+        expected: tuple[str, ...],
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:Y", "UKW:A", "")
+
+        assert Enigma(config).position_at(step) == expected
+
+    def test_position_at_should_raise_when_step_is_negative(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(ValueError, match="step must be positive"):
+            Enigma(config).position_at(-1)
+
+    @pytest.mark.parametrize("debug", [False, True])
+    @pytest.mark.parametrize("step", [0, 1, 25, 26, 700, 20000])
+    def test_seek_should_skip_encoded_letters(
+        self,
+        step: int,
+        *,
+        debug: bool,
+    ) -> None:
+        config = EnigmaConfig.parse(
+            "I:A II:Z III:Y",
+            "UKW:A",
+            "AB",
+            debug=debug,
+        )
+        message = "FOOBAR" * 10
+
+        expected = Enigma(config).encode_message("A" * step + message)
+        enigma = Enigma(config)
+        enigma.seek(step)
+
+        assert (
+            enigma.encode_message(message)
+            .replace(" ", "")
+            .replace(
+                "\n",
+                "",
+            )
+            == expected.replace(" ", "").replace("\n", "")[step:]
+        )
+
+    def test_encode_message_should_start_at_given_step(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+        enigma = Enigma(config)
+        enigma.encode_message("FOOBAR")
+
+        encoded = enigma.encode_message("BAR", start=3)
+
+        assert encoded == "RQF"
+
+    def test_encode_message_should_leave_out_rejected_characters(
+        self,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        encoded = Enigma(config).encode_message("Foo, bär!", normalize=True)
+
+        assert encoded == Enigma(config).encode_message("FOOBR")
+
+    def test_encode_message_should_raise_on_punctuation(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(NotASCIILetterError):
+            Enigma(config).encode_message("FOO, BAR")
+
+    def test_encode_stream_should_normalize_chunks(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "Hello, world!\nFoo-bar 42. " * 10
+        writer = io.StringIO()
+
+        Enigma(config).encode_stream(
+            io.StringIO(message),
+            writer,
+            7,
+            normalize=True,
+        )
+
+        assert writer.getvalue() == Enigma(config).encode_message(
+            "HELLOWORLDFOOBAR" * 10,
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 4, 5, 16, 17, 1000])
+    def test_encode_stream_should_write_encoded_message(
+        self,
+        chunk_size: int,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "HELLO WORLD\nFOO BAR " * 10
+        writer = io.StringIO()
+
+        Enigma(config).encode_stream(io.StringIO(message), writer, chunk_size)
+
+        assert writer.getvalue() == Enigma(config).encode_message(message)
+
+    def test_encode_chunks_should_skip_chunks_without_letter(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        encoded = Enigma(config).encode_chunks(["FOO", " \n", "BAR"])
+
+        assert list(encoded) == ["VSL", "R QF"]
+
+    @pytest.mark.parametrize(
+        "buffer_type",
+        [bytes, bytearray, lambda data: memoryview(bytearray(data))],
+    )
+    def test_encode_bytes_should_write_encoded_letters(
+        self,
+        buffer_type: type[bytes],
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "HELLOworld" * 10000
+        out = bytearray(len(message))
+
+        Enigma(config).encode_bytes(buffer_type(message.encode()), out)
+
+        assert out.decode() == get_letters(config, message)
+
+    def test_encode_bytes_should_encode_mmap_in_place(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        with mmap.mmap(-1, 26) as buffer:
+            buffer.write(ascii_uppercase.encode())
+
+            Enigma(config).encode_bytes(buffer)
+
+            assert buffer[:].decode() == get_letters(config, ascii_uppercase)
+
+    def test_encode_bytes_should_continue_from_previous_letters(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        enigma = Enigma(config)
+        first = enigma.encode_letter("F")
+        out = bytearray(3)
+
+        enigma.encode_bytes(b"OOB", out)
+
+        assert first + out.decode() == get_letters(config, "FOOB")
+
+    def test_encode_bytes_with_tracer_should_be_same_as_compiled(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        traced = bytearray(b"HELLOWORLD")
+        compiled = bytearray(b"HELLOWORLD")
+
+        Enigma(config, tracer=NullTracer()).encode_bytes(traced)
+        Enigma(config).encode_bytes(compiled)
+
+        assert traced == compiled
+
+    def test_encode_bytes_should_raise_on_non_letter(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(NotASCIILetterError, match='"!"'):
+            Enigma(config).encode_bytes(b"FOO!", bytearray(4))
+
+    def test_encode_bytes_should_raise_on_size_mismatch(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(ValueError, match="output buffer size must be 3"):
+            Enigma(config).encode_bytes(b"FOO", bytearray(4))
+
+    def test_encode_bytes_in_read_only_buffer_should_raise(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(TypeError, match="read only"):
+            Enigma(config).encode_bytes(b"FOO")
+
+
+class EnigmaStateTest:
+    @pytest.mark.parametrize("tracer", [None, NullTracer()])
+    def test_restore_should_return_to_snapshot(
+        self,
+        tracer: NullTracer | None,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB")
+        enigma = Enigma(config, tracer)
+        enigma.encode_message("FOO")
+
+        state = enigma.snapshot()
+        encoded = enigma.encode_message("BAR" * 20)
+        enigma.restore(state)
+
+        assert state == EnigmaState(3, 25 * 26 + 24 + 3)
+        assert state.positions == enigma.position_at(3)
+        assert enigma.encode_message("BAR" * 20) == encoded
+
+    @pytest.mark.parametrize("tracer", [None, NullTracer()])
+    def test_reset_should_return_to_initial_positions(
+        self,
+        tracer: NullTracer | None,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB")
+        enigma = Enigma(config, tracer)
+        encoded = enigma.encode_message("FOOBAR")
+
+        enigma.reset()
+
+        assert enigma.snapshot().positions == ("A", "Z", "Y")
+        assert enigma.encode_message("FOOBAR") == encoded
+
+    def test_restore_should_raise_on_other_rotor_count(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "")
+
+        with pytest.raises(ValueError, match="4 rotors machine"):
+            Enigma(config).restore(EnigmaState(4, 0))
+
+    def test_restore_should_raise_on_out_of_range_state(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "")
+
+        with pytest.raises(ValueError, match="state must be in range"):
+            Enigma(config).restore(EnigmaState(3, 26**3))
+
+    @pytest.mark.parametrize("tracer", [None, NullTracer()])
+    def test_clone_should_encode_independently(
+        self,
+        tracer: NullTracer | None,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB")
+        enigma = Enigma(config, tracer)
+        enigma.encode_message("FOO")
+
+        clone = enigma.clone()
+        encoded = clone.encode_message("BAR")
+
+        assert enigma.snapshot() != clone.snapshot()
+        assert enigma.encode_message("BAR") == encoded
+        assert enigma.snapshot() == clone.snapshot()
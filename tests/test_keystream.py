@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+
+from enigma.compiled import CompiledEnigma
+from enigma.config import EnigmaConfig
+from enigma.exception import KeystreamFormatError
+from enigma.keystream import (
+    FORMAT_VERSION,
+    KeystreamTable,
+    get_cache_dir,
+    get_table_key,
+    get_table_path,
+    open_table,
+)
+
+
+class KeystreamTest:
+    def test_table_should_encode_like_compiled_engine(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        config = EnigmaConfig.parse("I:Z II:Y III:X", "REFB:C", "AB CD EF")
+        message = bytes(range(26)) * 30
+
+        with open_table(config, tmp_path) as table:
+            encoded = table.encode_indexes(config, message, start=700)
+
+        engine = CompiledEnigma(config)
+        engine.seek(700)
+        assert encoded == engine.encode_indexes(message)
+
+    def test_table_should_match_every_state(self, tmp_path: Path) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+        engine = CompiledEnigma(config)
+        engine.seek(26**3 - 1)
+        permutations = engine.get_permutations(26**3)
+
+        with open_table(config, tmp_path) as table:
+            assert len(table) == 26**3
+            assert [table[state] for state in range(26**3)] == permutations
+
+    def test_key_should_ignore_plugs_and_rotors_positions(self) -> None:
+        assert get_table_key(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "AB"),
+        ) == get_table_key(EnigmaConfig.parse("I:Q II:W III:E", "REFB:A", ""))
+
+    @pytest.mark.parametrize(
+        ("rotors", "reflector"),
+        [("II:A I:B III:C", "REFB:A"), ("I:A II:B III:C", "REFB:B")],
+    )
+    def test_key_should_depend_on_rotors_and_reflector(
+        self,
+        rotors: str,
+        reflector: str,
+    ) -> None:
+        assert get_table_key(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", ""),
+        ) != get_table_key(EnigmaConfig.parse(rotors, reflector, ""))
+
+    def test_table_should_be_built_once(self, tmp_path: Path) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+        open_table(config, tmp_path).close()
+        path = get_table_path(config, tmp_path)
+        modified = path.stat().st_mtime_ns
+
+        open_table(
+            EnigmaConfig.parse("I:F II:G III:H", "REFB:A", "QW"),
+            tmp_path,
+        ).close()
+
+        assert path.stat().st_mtime_ns == modified
+        assert path.name.endswith(f".v{FORMAT_VERSION}.keystream")
+
+    def test_other_format_version_should_raise(self, tmp_path: Path) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+        open_table(config, tmp_path).close()
+        path = get_table_path(config, tmp_path)
+        data = bytearray(path.read_bytes())
+        data[6] += 1
+        path.write_bytes(data)
+
+        with pytest.raises(KeystreamFormatError, match="format version"):
+            KeystreamTable(path)
+
+    def test_table_should_raise_on_config_of_other_rotors(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+        other = EnigmaConfig.parse("IV1938:A V1938:B III:C", "REFC:A", "")
+
+        with (
+            open_table(config, tmp_path) as table,
+            pytest.raises(ValueError, match="differ from the table"),
+        ):
+            table.encode_indexes(other, b"FOO")
+
+    def test_table_of_other_rotors_should_raise(self, tmp_path: Path) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+        other = EnigmaConfig.parse("IV1938:A V1938:B III:C", "REFC:A", "")
+        open_table(config, tmp_path).close()
+        get_table_path(config, tmp_path).rename(get_table_path(other, tmp_path))
+
+        with pytest.raises(KeystreamFormatError, match="other rotors"):
+            open_table(other, tmp_path)
+
+    def test_truncated_table_should_raise(self, tmp_path: Path) -> None:
+        config = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+        open_table(config, tmp_path).close()
+        path = get_table_path(config, tmp_path)
+        path.write_bytes(path.read_bytes()[:-1])
+
+        with pytest.raises(KeystreamFormatError, match="size mismatch"):
+            KeystreamTable(path)
+
+    def test_cache_dir_should_be_taken_from_environment(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        monkeypatch.setenv("ENIGMA_CACHE_DIR", str(tmp_path))
+
+        assert get_cache_dir() == tmp_path
@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+from pathlib import Path
+from random import Random
+
+import pytest
+
+from enigma import Enigma, EnigmaConfig
+from main import main
+
+CONFIG_ARGS = ["-r", "I:A II:Z III:Y", "-s", "REFB:A", "-p", "AB CD"]
+MESSAGE = "HELLO WORLD\nFOO BAR " * 100
+
+
+def encode_message(message: str) -> str:
+    config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+
+    return Enigma(config).encode_message(message) + "\n"
+
+
+class EncodeCommandTest:
+    def test_should_encode_message_argument(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "encode", *CONFIG_ARGS, "hello"])
+
+        assert capsys.readouterr().out == encode_message("HELLO")
+
+    def test_should_encode_stdin(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(MESSAGE))
+
+        main(["main.py", "encode", *CONFIG_ARGS, "-b", "7"])
+
+        assert capsys.readouterr().out == encode_message(MESSAGE)
+
+    def test_empty_message_should_not_read_stdin(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(MESSAGE))
+
+        main(["main.py", "encode", *CONFIG_ARGS, ""])
+
+        assert capsys.readouterr().out == "\n"
+
+    def test_message_and_input_should_be_rejected(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        tmp_path: Path,
+    ) -> None:
+        (tmp_path / "in.txt").write_text(MESSAGE)
+
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    "main.py",
+                    "encode",
+                    *CONFIG_ARGS,
+                    "--input",
+                    str(tmp_path / "in.txt"),
+                    "hello",
+                ],
+            )
+
+        assert "not allowed with --input" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_should_encode_input_file_into_output_file(
+        self,
+        tmp_path: Path,
+        jobs: str,
+    ) -> None:
+        (tmp_path / "in.txt").write_text(MESSAGE)
+
+        main(
+            [
+                "main.py",
+                "encode",
+                *CONFIG_ARGS,
+                "--input",
+                str(tmp_path / "in.txt"),
+                "--output",
+                str(tmp_path / "out.txt"),
+                "--jobs",
+                jobs,
+                "--buffer-size",
+                "100",
+            ],
+        )
+
+        assert (tmp_path / "out.txt").read_text() == encode_message(MESSAGE)
+
+    def test_invalid_config_should_keep_output_file(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        tmp_path: Path,
+    ) -> None:
+        (tmp_path / "out.txt").write_text("KEEP")
+
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    "main.py",
+                    "encode",
+                    "-r",
+                    "I:A II:A",
+                    "-s",
+                    "REFB:A",
+                    "--output",
+                    str(tmp_path / "out.txt"),
+                    "hello",
+                ],
+            )
+
+        assert (tmp_path / "out.txt").read_text() == "KEEP"
+        assert "invalid config, ConfigurationError" in capsys.readouterr().err
+
+    def test_non_letters_should_suggest_normalize(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        with pytest.raises(SystemExit):
+            main(["main.py", "encode", *CONFIG_ARGS, "héllo, 2!"])
+
+        err = capsys.readouterr().err
+        assert '"É" is not an ASCII letter' in err
+        assert "--normalize" in err
+
+    @pytest.mark.parametrize(
+        ("option", "value"),
+        [("--buffer-size", "0"), ("--jobs", "-1"), ("--jobs", "x")],
+    )
+    def test_invalid_sizes_should_be_rejected_by_parser(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        option: str,
+        value: str,
+    ) -> None:
+        with pytest.raises(SystemExit):
+            main(["main.py", "encode", *CONFIG_ARGS, option, value, "hello"])
+
+        assert option in capsys.readouterr().err
+
+    def test_stats_should_be_reported_on_stderr(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "encode", *CONFIG_ARGS, "--stats", "hello"])
+
+        captured = capsys.readouterr()
+        assert captured.out == encode_message("HELLO")
+        assert "5 characters in" in captured.err
+
+    def test_normalize_should_report_rejected_offsets(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "encode", *CONFIG_ARGS, "--normalize", "Hé, 2 ho!"])
+
+        captured = capsys.readouterr()
+        assert captured.out == encode_message("HHO")
+        assert captured.err == "2 characters left out, at offsets 1, 4\n"
+
+    def test_digits_and_umlauts_should_be_spelled(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(
+            ["main.py", "encode", *CONFIG_ARGS, "--digits", "--umlauts", "Ü 1"],
+        )
+
+        captured = capsys.readouterr()
+        assert captured.out == encode_message("UEEINS")
+        assert captured.err == ""
+
+
+class RandomCommandTest:
+    def test_text_format_should_separate_configs_by_blank_line(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "random", "-c", "3", "-p", "2"])
+
+        blocks = capsys.readouterr().out.split("\n\n")
+        assert len(blocks) == 3
+        assert all(len(block.strip().split("\n")) == 3 for block in blocks)
+
+    def test_jsonl_format_should_write_one_config_per_line(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "random", "-c", "5", "-p", "3", "-f", "jsonl"])
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 5
+        for line in lines:
+            config = json.loads(line)
+            assert len(EnigmaConfig.parse(**config).plugs) == 3
+
+    def test_csv_format_should_write_header_and_configs(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        options = ["-c", "4", "-p", "2", "--seed", "3", "-f", "csv"]
+        main(["main.py", "random", *options])
+        rng = Random(3)  # noqa: S311 (reproducible configs, not keys)
+        expected = EnigmaConfig.generate_random_batch(4, 2, rng=rng)
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        configs = [
+            EnigmaConfig.parse(
+                row["rotors"],
+                row["reflector"],
+                row["plugin_board"],
+            )
+            for row in rows
+        ]
+        assert [c.as_dict() for c in configs] == [c.as_dict() for c in expected]
+
+    def test_seed_should_give_same_configs(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        main(["main.py", "random", "-c", "3", "--seed", "7"])
+        first = capsys.readouterr().out
+        main(["main.py", "random", "-c", "3", "--seed", "7"])
+
+        assert capsys.readouterr().out == first
@@ -0,0 +1,61 @@
+from string import ascii_uppercase
+
+import pytest
+
+from enigma.normalize import normalize, normalize_chunks
+
+
+class NormalizeTest:
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("", ""),
+            ("Hello, World!\n", "HELLOWORLD"),
+            ("a\tb\rc d-e", "ABCDE"),
+            (ascii_uppercase.lower(), ascii_uppercase),
+        ],
+    )
+    def test_should_uppercase_and_drop_separators(
+        self,
+        text: str,
+        expected: str,
+    ) -> None:
+        assert normalize(text).letters == expected
+        assert normalize(text).rejected == ()
+
+    def test_should_report_rejected_offsets(self) -> None:
+        normalized = normalize("1 bäd\N{SNOWMAN}x")
+
+        assert normalized.letters == "BDX"
+        assert normalized.rejected == (0, 3, 5)
+
+    def test_should_spell_digits(self) -> None:
+        assert normalize("U 571", digits=True).letters == "UFUNFSIEBENEINS"
+
+    def test_should_expand_umlauts(self) -> None:
+        normalized = normalize("Straße Übung öl", umlauts=True)
+
+        assert normalized.letters == "STRASSEUEBUNGOEL"
+        assert normalized.rejected == ()
+
+    def test_should_be_same_on_ascii_and_non_ascii_path(self) -> None:
+        text = "The quick (brown) fox; 42 jumps?"
+
+        ascii_only = normalize(text)
+        non_ascii = normalize(text + "é")
+
+        assert non_ascii.letters == ascii_only.letters
+        assert non_ascii.rejected == (*ascii_only.rejected, len(text))
+
+    def test_chunks_should_report_offsets_from_text_start(self) -> None:
+        chunks = ["ça va", " bien", "", " ça"]
+
+        normalized = list(normalize_chunks(chunks))
+
+        assert (
+            "".join(n.letters for n in normalized)
+            == normalize(
+                "".join(chunks),
+            ).letters
+        )
+        assert [n.rejected for n in normalized] == [(0,), (), (), (11,)]
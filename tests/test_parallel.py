@@ -0,0 +1,107 @@
+import pytest
+
+import enigma
+from enigma.compiled import CompiledEnigma, ScramblerCache, scrambler_cache
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.exception import NotASCIILetterError
+from enigma.parallel import (
+    encode_at,
+    encode_at_threaded,
+    encode_chunks_parallel,
+    encode_parallel,
+)
+
+
+class EncodeParallelTest:
+    @pytest.mark.parametrize("workers", [1, 2])
+    @pytest.mark.parametrize("chunk_length", [1, 7, 26, 1000])
+    def test_should_be_identical_to_encode_message(
+        self,
+        workers: int,
+        chunk_length: int,
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "HELLO WORLD\nFOO BAR" * 20
+
+        assert encode_parallel(
+            config,
+            message,
+            workers=workers,
+            chunk_length=chunk_length,
+        ) == Enigma(config).encode_message(message)
+
+    def test_should_start_at_given_step(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        assert encode_parallel(config, "BAR", start=3, chunk_length=1) == "RQF"
+
+    def test_should_raise_when_message_contain_non_ascii_letter(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(NotASCIILetterError, match="É"):
+            encode_parallel(config, "FOOéBAR")
+
+    def test_should_raise_when_chunk_length_is_not_positive(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(ValueError, match="chunk_length"):
+            encode_parallel(config, "FOO", chunk_length=0)
+
+
+class EncodeChunksParallelTest:
+    def test_should_be_identical_to_encode_chunks(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        chunks = ["HELLO WOR", "LD\n", " ", "FOO BAR" * 20, "X"] * 3
+
+        assert "".join(
+            encode_chunks_parallel(config, chunks, workers=2),
+        ) == "".join(Enigma(config).encode_chunks(chunks))
+
+
+class EncodeAtTest:
+    @pytest.mark.parametrize("start", [0, 3, 700])
+    def test_should_be_identical_to_encode_message(self, start: int) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "HELLO WORLD\nFOO BAR" * 5
+
+        expected = Enigma(config).encode_message(message, start=start)
+
+        assert encode_at(config, start, message) == expected
+        assert encode_at(CompiledEnigma(config), start, message) == expected
+
+    def test_should_not_go_through_scrambler_cache(self) -> None:
+        config = EnigmaConfig.parse("I:B II:C III:D", "REFB:A", "AB CD")
+        scrambler_cache.clear()
+
+        encode_at(config, 5, "HELLOWORLD" * 10)
+
+        assert (scrambler_cache.hits, scrambler_cache.misses) == (0, 0)
+
+    def test_should_raise_when_start_step_is_negative(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+
+        with pytest.raises(ValueError, match="step must be positive"):
+            encode_at(config, -1, "FOO")
+
+    def test_threads_should_share_engines(self) -> None:
+        configs = list(EnigmaConfig.generate_random_configs(4, 10))
+        cache = ScramblerCache(ScramblerCache.TABLE_SIZE)
+        engines = [CompiledEnigma(config, cache) for config in configs]
+        jobs = [
+            (engines[i % 4], i * 31, "HELLOWORLD" * (i % 7 + 1))
+            for i in range(200)
+        ]
+
+        encoded = encode_at_threaded(jobs, workers=8)
+
+        assert encoded == [
+            Enigma(configs[i % 4]).encode_message(text, start=step)
+            for i, (_, step, text) in enumerate(jobs)
+        ]
+        # Engines given are frozen, threads never go through their cache.
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_should_be_exported_by_package(self) -> None:
+        assert enigma.encode_at is encode_at
+        assert enigma.encode_at_threaded is encode_at_threaded
@@ -0,0 +1,64 @@
+import pytest
+
+from enigma.analysis import get_scramblers, solve_plug_board
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.helper import get_letter_index
+
+from .test_search import PLAINTEXT
+
+
+class GetScramblersTest:
+    def test_scramblers_should_encode_with_plug_board(self) -> None:
+        config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AB CD")
+        plugs = {"A": "B", "B": "A", "C": "D", "D": "C"}
+
+        scramblers = get_scramblers(config, len(PLAINTEXT))
+
+        encoded = "".join(
+            plugs.get(letter, letter)
+            for letter in (
+                chr(scrambler[get_letter_index(plugs.get(letter, letter))] + 65)
+                for scrambler, letter in zip(scramblers, PLAINTEXT, strict=True)
+            )
+        )
+        assert encoded == Enigma(config).encode_message(PLAINTEXT).replace(
+            " ",
+            "",
+        ).replace("\n", "")
+
+
+class SolvePlugBoardTest:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_should_recover_plugs(self, workers: int) -> None:
+        config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AQ EW RT")
+        ciphertext = Enigma(config).encode_message(PLAINTEXT)
+        without_plugs = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "")
+
+        candidates = solve_plug_board(
+            ciphertext,
+            without_plugs,
+            plug_count=3,
+            restarts=2,
+            workers=workers,
+            seed=0,
+        )
+
+        assert len(candidates) == 2
+        assert candidates[0].config.as_dict() == config.as_dict()
+        assert candidates[0].score >= candidates[1].score
+
+    def test_should_not_use_more_plugs_than_plug_count(self) -> None:
+        config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AQ EW RT")
+        ciphertext = Enigma(config).encode_message(PLAINTEXT)
+
+        candidates = solve_plug_board(
+            ciphertext,
+            config,
+            plug_count=1,
+            restarts=1,
+            workers=1,
+            seed=0,
+        )
+
+        assert len(candidates[0].config.plugs) <= 1
@@ -102,3 +102,12 @@ class ReflectorTest:
         reflector = Reflector(AvailableReflector.UKW, "C")
 
         assert reflector.encode(index("A")) == index("H")
+
+
+class SlotsTest:
+    def test_rotors_should_not_have_instance_dict(self) -> None:
+        assert not hasattr(
+            Rotor(AvailableRotor.I, "A", MagicMock()),
+            "__dict__",
+        )
+        assert not hasattr(Reflector(AvailableReflector.UKW, "A"), "__dict__")
@@ -0,0 +1,96 @@
+import pytest
+
+from enigma.analysis import (
+    WorkUnit,
+    get_work_units,
+    index_of_coincidence,
+    search_rotors,
+    search_work_units,
+)
+from enigma.analysis.search import POSITION_COUNT
+from enigma.available import AvailableReflector, AvailableRotor
+from enigma.compiled import get_state
+from enigma.config import EnigmaConfig, ReflectorConfig
+from enigma.enigma import Enigma
+from enigma.helper import get_letter_index, parse_letters
+
+PLAINTEXT = (
+    "ITWASTHEBESTOFTIMESITWASTHEWORSTOFTIMESITWASTHEAGEOFWISDOMITWASTHEAGE"
+    "OFFOOLISHNESSITWASTHEEPOCHOFBELIEFITWASTHEEPOCHOFINCREDULITYITWASTHE"
+    "SEASONOFLIGHTITWASTHESEASONOFDARKNESS"
+)
+
+
+class GetWorkUnitsTest:
+    def test_should_return_one_unit_per_rotor_order(self) -> None:
+        normal_rotors = len(AvailableRotor.get_normal_rotors())
+
+        units = get_work_units()
+
+        assert len(units) == normal_rotors * (normal_rotors - 1) * (
+            normal_rotors - 2
+        )
+        assert all(len(unit) == POSITION_COUNT for unit in units)
+
+    def test_should_partition_start_states(self) -> None:
+        rotors = [AvailableRotor.I, AvailableRotor.II, AvailableRotor.III]
+
+        units = get_work_units(rotors, unit_size=10_000)
+
+        assert len(units) == 6 * 2
+        assert units[0] == WorkUnit(tuple(rotors), 0, 10_000)
+        assert units[1] == WorkUnit(tuple(rotors), 10_000, POSITION_COUNT)
+
+    def test_should_raise_when_unit_size_is_not_positive(self) -> None:
+        with pytest.raises(ValueError, match="unit_size"):
+            get_work_units(unit_size=0)
+
+
+class SearchWorkUnitsTest:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_should_find_rotors_start_positions(self, workers: int) -> None:
+        config = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "")
+        ciphertext = Enigma(config).encode_message(PLAINTEXT)
+        state = get_state(get_letter_index(p) for p in "QCX")
+        units = [
+            WorkUnit(
+                (AvailableRotor.I, AvailableRotor.II, AvailableRotor.III),
+                state - 300,
+                state + 300,
+            ),
+            WorkUnit(
+                (AvailableRotor.II, AvailableRotor.I, AvailableRotor.III),
+                state - 300,
+                state + 300,
+            ),
+        ]
+
+        result = search_work_units(
+            parse_letters(ciphertext.replace(" ", "").replace("\n", "")),
+            ReflectorConfig(AvailableReflector.REFB, "A"),
+            units,
+            top=3,
+            workers=workers,
+        )
+
+        assert result.decrypts == 1200
+        assert result.decrypts_per_second > 0
+        assert len(result.candidates) == 3
+        assert result.candidates[0].config.as_dict() == config.as_dict()
+        assert result.candidates[0].score == index_of_coincidence(
+            parse_letters(PLAINTEXT),
+        )
+
+    def test_should_raise_when_top_is_not_positive(self) -> None:
+        reflector = ReflectorConfig(AvailableReflector.REFB, "A")
+
+        with pytest.raises(ValueError, match="top must be at least one"):
+            search_rotors("HELLO", reflector, top=0, workers=1)
+        with pytest.raises(ValueError, match="top must be at least one"):
+            search_work_units(
+                parse_letters("HELLO"),
+                reflector,
+                get_work_units(unit_size=100)[:1],
+                top=0,
+                workers=1,
+            )
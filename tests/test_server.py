@@ -0,0 +1,200 @@
+import asyncio
+import json
+import sys
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.server import (
+    EnigmaClient,
+    EnigmaServer,
+    LatencyHistogram,
+    encode_requests,
+)
+
+CONFIG = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AB CD")
+
+
+def get_expected(message: str, start: int = 0) -> str:
+    encoded = Enigma(CONFIG).encode_message(message, start=start)
+
+    return encoded.replace(" ", "").replace("\n", "")
+
+
+class BrokenExecutor(Executor):
+    def submit(self, *_args: Any, **_kwargs: Any) -> Future[Any]:
+        msg = "a worker died"
+        raise BrokenProcessPool(msg)
+
+
+def run_with_client(
+    test: Callable[[EnigmaServer, EnigmaClient], Awaitable[Any]],
+    **options: Any,
+) -> Any:
+    async def run() -> Any:
+        options.setdefault("port", 0)
+        options.setdefault("workers", 0)
+        async with EnigmaServer(**options) as server:
+            if isinstance(address := server.address, str):
+                client = await EnigmaClient.connect(path=Path(address))
+            else:
+                client = await EnigmaClient.connect(*address)
+            try:
+                return await test(server, client)
+            finally:
+                await client.close()
+
+    return asyncio.run(run())
+
+
+class LatencyHistogramTest:
+    def test_percentile_should_be_within_a_bucket(self) -> None:
+        histogram = LatencyHistogram()
+        for microseconds in range(1, 10_001):
+            histogram.record(microseconds / 1e6)
+
+        for percent in (50, 90, 99):
+            exact = percent / 100 * 10_000 / 1e6
+            assert exact <= histogram.percentile(percent) <= exact * 1.19
+
+    def test_merge_should_add_counts(self) -> None:
+        histogram = LatencyHistogram()
+        histogram.record(0.001)
+        other = LatencyHistogram()
+        other.record(0.1)
+
+        histogram.merge(other)
+
+        assert histogram.count == 2
+        assert histogram.max == 0.1
+
+    def test_empty_histogram_should_report_zeros(self) -> None:
+        assert LatencyHistogram().as_dict()["p99"] == 0.0
+
+
+class EncodeRequestsTest:
+    def test_should_encode_each_request(self) -> None:
+        responses = encode_requests(
+            [
+                ("II:Q I:C III:X", "REFB:A", "AB CD", "HELLO WORLD", 0),
+                ("ii:q i:c iii:x", "refb:a", "ab cd", "hello", 3),
+            ],
+        )
+
+        assert responses == [
+            {"message": get_expected("HELLO WORLD")},
+            {"message": get_expected("HELLO", start=3)},
+        ]
+
+    def test_failing_request_should_not_fail_batch(self) -> None:
+        responses = encode_requests(
+            [
+                ("X:A II:B III:C", "REFB:A", "", "HELLO", 0),
+                ("II:Q I:C III:X", "REFB:A", "AB CD", "HELLÖ", 0),
+                ("II:Q I:C III:X", "REFB:A", "AB CD", "HELLO", 0),
+            ],
+        )
+
+        assert responses[0] == {"error": "KeyError: 'X'"}
+        assert "NotASCIILetterError" in responses[1]["error"]
+        assert responses[2] == {"message": get_expected("HELLO")}
+
+
+class EnigmaServerTest:
+    def test_should_encode_concurrent_requests_in_batches(self) -> None:
+        messages = [f"MESSAGE NUMBER {'X' * i}" for i in range(50)]
+
+        async def test(_server: EnigmaServer, client: EnigmaClient) -> Any:
+            encoded = await asyncio.gather(
+                *(
+                    client.encode(CONFIG, m, start=i)
+                    for i, m in enumerate(messages)
+                ),
+            )
+            return encoded, await client.get_stats()
+
+        encoded, stats = run_with_client(test)
+
+        assert encoded == [get_expected(m, i) for i, m in enumerate(messages)]
+        assert stats["latency"]["count"] == len(messages)
+        assert stats["batches"] < len(messages)
+        assert stats["mean_batch_size"] > 1
+
+    def test_should_offload_big_batches_to_process_pool(self) -> None:
+        async def test(server: EnigmaServer, client: EnigmaClient) -> Any:
+            encoded = await client.encode(CONFIG, "HELLO" * 100)
+            return encoded, server.get_stats()["offloaded_batches"]
+
+        encoded, offloaded = run_with_client(test, workers=1, inline_letters=0)
+
+        assert encoded == get_expected("HELLO" * 100)
+        assert offloaded == 1
+
+    def test_should_report_batch_failures_to_each_request(self) -> None:
+        async def test(server: EnigmaServer, client: EnigmaClient) -> Any:
+            server.batcher.executor = BrokenExecutor()
+            requests = (
+                client.request(
+                    {
+                        "rotors": "I:A II:B III:C",
+                        "reflector": "REFB:A",
+                        "message": message,
+                    },
+                )
+                for message in ("HELLO", "WORLD")
+            )
+            return await asyncio.wait_for(asyncio.gather(*requests), 5)
+
+        responses = run_with_client(test, workers=1, inline_letters=0)
+
+        error = {"error": "BrokenProcessPool: a worker died"}
+        assert responses == [error, error]
+
+    def test_should_report_invalid_requests(self) -> None:
+        async def test(_server: EnigmaServer, client: EnigmaClient) -> Any:
+            with pytest.raises(ValueError, match="step must be positive"):
+                await client.encode(
+                    EnigmaConfig.parse("I:A II:B III:C", "REFB:A", ""),
+                    "HELLO",
+                    start=-1,
+                )
+            return await asyncio.gather(
+                client.request({"rotors": "I:A II:B III:C"}),
+                client.request({"message": 1, "rotors": "", "reflector": ""}),
+            )
+
+        missing, wrong_type = run_with_client(test)
+
+        assert missing == {"error": "KeyError: 'reflector'"}
+        assert wrong_type["error"].startswith("TypeError")
+
+    def test_should_answer_malformed_lines(self) -> None:
+        async def run() -> list[Any]:
+            async with EnigmaServer(port=0, workers=0) as server:
+                reader, writer = await asyncio.open_connection(*server.address)
+                writer.write(b"not json\n[1]\n")
+                responses = [
+                    json.loads(await reader.readline()) for _ in range(2)
+                ]
+                writer.close()
+                return responses
+
+        responses = asyncio.run(run())
+
+        assert responses[0]["error"].startswith("JSONDecodeError")
+        assert responses[1]["error"].startswith("AttributeError")
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="no Unix sockets")
+    def test_should_serve_on_unix_socket(self, tmp_path: Path) -> None:
+        async def test(_server: EnigmaServer, client: EnigmaClient) -> Any:
+            return await client.encode(CONFIG, "HELLO")
+
+        encoded = run_with_client(test, path=tmp_path / "enigma.sock")
+
+        assert encoded == get_expected("HELLO")
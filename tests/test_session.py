@@ -0,0 +1,148 @@
+import pytest
+
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.exception import SessionNotFoundError
+from enigma.session import SessionStore
+
+CONFIG = EnigmaConfig.parse("II:Q I:C III:X", "REFB:A", "AB CD")
+OTHER_CONFIG = EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SessionStoreTest:
+    def test_session_should_advance_across_messages(self) -> None:
+        store = SessionStore()
+        session = store.open(CONFIG)
+        enigma = Enigma(CONFIG)
+
+        for message in ["HELLO", "WORLD FOO", "BAR"]:
+            assert store.encode(session, message) == enigma.encode_message(
+                message,
+            )
+
+        assert store.get_step(session) == len("HELLOWORLDFOOBAR")
+
+    def test_sessions_should_be_independent(self) -> None:
+        store = SessionStore(max_engines=1)
+        first = store.open(CONFIG, "first")
+        second = store.open(OTHER_CONFIG, "second", step=10)
+
+        store.encode(first, "HELLO")
+        encoded = store.encode(second, "HELLO")
+
+        assert encoded == Enigma(OTHER_CONFIG).encode_message("HELLO", start=10)
+        assert store.encode(first, "WORLD") == Enigma(CONFIG).encode_message(
+            "WORLD",
+            start=5,
+        )
+
+    def test_sessions_should_share_configs(self) -> None:
+        store = SessionStore()
+        sessions = [store.open(CONFIG) for _ in range(3)]
+        store.open(OTHER_CONFIG)
+
+        assert store.config_count == 2
+        assert store.get_config(sessions[1]).as_dict() == CONFIG.as_dict()
+
+        for session in sessions:
+            store.close(session)
+
+        assert store.config_count == 1
+        assert len(store) == 1
+
+    def test_closed_config_id_should_be_reused(self) -> None:
+        store = SessionStore()
+        store.close(store.open(CONFIG))
+
+        session = store.open(OTHER_CONFIG)
+
+        assert store.get_config(session).as_dict() == OTHER_CONFIG.as_dict()
+        assert store.config_count == 1
+
+    def test_should_evict_least_recently_used(self) -> None:
+        store = SessionStore(max_sessions=2)
+        first = store.open(CONFIG)
+        second = store.open(CONFIG)
+        store.encode(first, "A")
+
+        third = store.open(CONFIG)
+
+        assert first in store
+        assert second not in store
+        assert third in store
+        assert store.evictions == 1
+
+    def test_should_evict_idle_sessions(self) -> None:
+        clock = Clock()
+        store = SessionStore(ttl=10, clock=clock)
+        first = store.open(CONFIG)
+        clock.now = 5
+        second = store.open(CONFIG)
+        clock.now = 12
+
+        with pytest.raises(SessionNotFoundError):
+            store.encode(first, "HELLO")
+
+        assert second in store
+        clock.now = 15
+        assert store.evict_expired() == 1
+        assert len(store) == 0
+        assert store.config_count == 0
+
+    def test_reopening_id_should_replace_session(self) -> None:
+        store = SessionStore()
+        store.open(CONFIG, "id")
+        store.encode("id", "HELLO")
+
+        store.open(OTHER_CONFIG, "id")
+
+        assert store.get_step("id") == 0
+        assert store.config_count == 1
+
+    def test_new_id_should_skip_open_ids(self) -> None:
+        store = SessionStore()
+        store.open(CONFIG, 0)
+
+        session_id = store.open(OTHER_CONFIG)
+
+        assert session_id != 0
+        assert len(store) == 2
+        assert store.get_config(0).as_dict() == CONFIG.as_dict()
+
+    @pytest.mark.parametrize(
+        ("step", "match"),
+        [(-1, "step must be positive"), (1 << 64, "at most")],
+    )
+    def test_invalid_step_should_leave_store_untouched(
+        self,
+        step: int,
+        match: str,
+    ) -> None:
+        store = SessionStore()
+
+        with pytest.raises(ValueError, match=match):
+            store.open(CONFIG, "id", step=step)
+        store.open(OTHER_CONFIG, "other", step=3)
+
+        assert "id" not in store
+        assert store.config_count == 1
+        assert store.get_config("other").as_dict() == OTHER_CONFIG.as_dict()
+        assert store.get_step("other") == 3
+
+    def test_should_raise_on_unknown_session(self) -> None:
+        store = SessionStore()
+
+        with pytest.raises(SessionNotFoundError, match="not an open session"):
+            store.close("unknown")
+
+    def test_should_raise_when_max_sessions_is_not_positive(self) -> None:
+        with pytest.raises(ValueError, match="at least one"):
+            SessionStore(max_sessions=0)
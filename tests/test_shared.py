@@ -0,0 +1,103 @@
+from collections.abc import Iterator
+
+import pytest
+
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.exception import NotASCIILetterError
+from enigma.shared import SharedEncoder
+
+
+def get_jobs() -> list[tuple[EnigmaConfig, int, str]]:
+    three_rotors = EnigmaConfig.parse("I:Z II:Y III:X", "REFB:C", "AB CD EF")
+    four_rotors = EnigmaConfig.parse(
+        "II1930:U IIIC:X I1930:L BETA:A",
+        "REFBTHIN:A",
+        "MN AH JR CQ",
+    )
+
+    return [
+        (three_rotors, 0, "HELLO WORLD"),
+        (four_rotors, 3, "FOO BAR\nBAZ" * 50),
+        (three_rotors, 17570, "WRAPPING AROUND THE PERIOD" * 3),
+        (EnigmaConfig.parse("I:A II:A III:A", "UKW:A", ""), 3, "BAR"),
+        (four_rotors, 10**9, "A" * 2000),
+        (three_rotors, 5, ""),
+    ]
+
+
+@pytest.fixture(params=[1, 2])
+def encoder(request: pytest.FixtureRequest) -> Iterator[SharedEncoder]:
+    with SharedEncoder(request.param, task_letters=100) as encoder:
+        yield encoder
+
+
+class SharedEncoderTest:
+    def test_should_be_identical_to_encode_message(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        jobs = get_jobs()
+
+        assert encoder.encode(jobs) == [
+            Enigma(config).encode_message(text, start=start)
+            for config, start, text in jobs
+        ]
+
+    def test_should_split_long_texts_in_pieces(self) -> None:
+        config, start, text = get_jobs()[1]
+
+        with SharedEncoder(2, task_letters=7) as encoder:
+            assert encoder.encode([(config, start, text)]) == [
+                Enigma(config).encode_message(text, start=start),
+            ]
+
+    def test_should_encode_successive_calls(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        jobs = get_jobs()
+        encoded = encoder.encode(jobs)
+
+        assert encoder.encode(jobs[::-1]) == encoded[::-1]
+
+    def test_should_return_empty_texts_without_letters(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        config = get_jobs()[0][0]
+
+        assert encoder.encode([(config, 0, ""), (config, 1, " \n")]) == ["", ""]
+
+    def test_should_encode_start_above_64_bits(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        config, _, text = get_jobs()[1]
+        start = (1 << 64) + 12345
+
+        assert encoder.encode([(config, start, text)]) == [
+            Enigma(config).encode_message(text, start=start),
+        ]
+
+    def test_should_raise_when_start_is_negative(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        config = get_jobs()[0][0]
+
+        with pytest.raises(ValueError, match="step must be positive"):
+            encoder.encode([(config, -1, "FOO")])
+
+    def test_should_raise_when_text_contain_non_ascii_letter(
+        self,
+        encoder: SharedEncoder,
+    ) -> None:
+        config = get_jobs()[0][0]
+
+        with pytest.raises(NotASCIILetterError, match="É"):
+            encoder.encode([(config, 0, "FOOéBAR")])
+
+    def test_should_raise_when_task_letters_is_not_positive(self) -> None:
+        with pytest.raises(ValueError, match="task_letters"):
+            SharedEncoder(1, task_letters=0)
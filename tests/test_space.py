@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from enigma.config import ConfigurationError, EnigmaConfig
+from enigma.space import ConfigRange, ConfigSpace
+
+
+class ConfigSpaceTest:
+    def test_three_rotors_space_size(self) -> None:
+        # 17 normal rotors, 5 normal reflectors.
+        assert len(ConfigSpace()) == 17 * 16 * 15 * 5 * 26**3
+
+    def test_four_rotors_space_size(self) -> None:
+        # 2 thin rotors, 2 thin reflectors, 26 reflector positions.
+        space = ConfigSpace(
+            [4],
+            reflector_positions="ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+        )
+
+        assert space.size == 17 * 16 * 15 * 2 * 2 * 26 * 26**4
+
+    def test_plugs_space_size(self) -> None:
+        # 150 738 274 937 250 ways to plug 10 cables.
+        space = ConfigSpace(plug_count=10)
+
+        assert space.size == 17 * 16 * 15 * 5 * 26**3 * 150_738_274_937_250
+        with pytest.raises(OverflowError):
+            len(space)
+
+    @pytest.mark.parametrize("plug_count", [0, 1, 3, 10])
+    def test_rank_should_invert_unrank(self, plug_count: int) -> None:
+        space = ConfigSpace([3, 4], plug_count, reflector_positions="AQZ")
+        rng = random.Random(plug_count)  # noqa: S311 (reproducible ranks)
+
+        for rank in [
+            0,
+            space.size - 1,
+            *(rng.randrange(space.size) for _ in range(200)),
+        ]:
+            config = space.unrank(rank)
+
+            assert len(config.plugs) == plug_count
+            assert space.rank(config) == rank
+
+    def test_rank_should_not_depend_on_plugs_order(self) -> None:
+        space = ConfigSpace(plug_count=2)
+
+        assert space.rank(
+            EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "ZA CB"),
+        ) == space.rank(EnigmaConfig.parse("I:A II:B III:C", "REFB:A", "BC AZ"))
+
+    def test_consecutive_ranks_should_step_rotor_positions(self) -> None:
+        space = ConfigSpace()
+
+        configs = space[:27]
+
+        assert [c.as_dict()["rotors"] for c in configs[24:27]] == [
+            "IC:A IIC:A IIIC:Y",
+            "IC:A IIC:A IIIC:Z",
+            "IC:A IIC:B IIIC:A",
+        ]
+
+    def test_rank_should_raise_on_config_out_of_space(self) -> None:
+        space = ConfigSpace(plug_count=1)
+
+        with pytest.raises(ConfigurationError, match="not in config space"):
+            space.rank(EnigmaConfig.parse("I:A II:B III:C", "REFB:A", ""))
+
+    @pytest.mark.parametrize(
+        ("rotors", "reflector"),
+        [("I:A I:B III:C", "REFB:A"), ("I:A II:B II:C BETA:D", "REFBTHIN:A")],
+    )
+    def test_rank_should_raise_on_repeated_rotor(
+        self,
+        rotors: str,
+        reflector: str,
+    ) -> None:
+        space = ConfigSpace([3, 4])
+
+        with pytest.raises(ConfigurationError, match="a rotor repeats"):
+            space.rank(EnigmaConfig.parse(rotors, reflector, ""))
+
+    @pytest.mark.parametrize("positions", ["", "AA", "A1"])
+    def test_invalid_reflector_positions_should_raise(
+        self,
+        positions: str,
+    ) -> None:
+        with pytest.raises(ValueError, match=r"reflector_positions|ASCII"):
+            ConfigSpace(reflector_positions=positions)
+
+    def test_reflector_positions_should_be_uppercased(self) -> None:
+        space = ConfigSpace(reflector_positions="az")
+
+        assert space.reflector_positions == "AZ"
+        assert space.unrank(space.size - 1).reflector_config.position == "Z"
+
+    def test_unrank_should_raise_on_rank_out_of_space(self) -> None:
+        space = ConfigSpace()
+
+        with pytest.raises(IndexError):
+            space.unrank(space.size)
+
+    @pytest.mark.parametrize("rotor_count", [2, 5])
+    def test_invalid_rotor_count_should_raise(self, rotor_count: int) -> None:
+        with pytest.raises(ValueError, match="rotor count must be 3 or 4"):
+            ConfigSpace([rotor_count])
+
+
+class ConfigRangeTest:
+    def test_slice_should_be_lazy(self) -> None:
+        space = ConfigSpace(plug_count=10)
+
+        configs = space[10**20 : 10**21 : 7]
+
+        assert isinstance(configs, ConfigRange)
+        assert configs.size == -(-(10**21 - 10**20) // 7)
+        assert space.rank(configs[3]) == 10**20 + 21
+
+    def test_partitions_should_cover_space(self) -> None:
+        space = ConfigSpace([4])
+        step = space.size // 3 + 1
+
+        parts = [
+            space[start : start + step] for start in range(0, space.size, step)
+        ]
+
+        assert sum(part.size for part in parts) == space.size
+        assert parts[1][0] == space[step]
+
+    def test_nested_slice_should_slice_ranks(self) -> None:
+        configs = ConfigSpace()[100:200][10:20:5]
+
+        assert configs.ranks == range(110, 120, 5)
+        assert len(list(configs)) == 2
@@ -0,0 +1,167 @@
+from collections.abc import Callable
+from itertools import pairwise
+from typing import Any
+
+import pytest
+
+from enigma import tracing
+from enigma.config import EnigmaConfig
+from enigma.enigma import Enigma
+from enigma.tracing import (
+    LetterIn,
+    LetterOut,
+    PrintTracer,
+    Stage,
+    Step,
+    TraceEvent,
+    Turnover,
+)
+
+
+class RecordTracer:
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+
+    def trace(self, event: TraceEvent) -> None:
+        self.events.append(event)
+
+
+class TracingTest:
+    def test_encode_letter_should_trace_every_stage(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "")
+        tracer = RecordTracer()
+
+        Enigma(config, tracer).encode_letter("A")
+
+        assert tracer.events[:2] == [Step(("A", "A", "B")), LetterIn("A")]
+        assert tracer.events[-1] == LetterOut("A", "I")
+        assert [e.encoder for e in tracer.events if isinstance(e, Stage)] == [
+            "PlugBoard",
+            "Rotor III",
+            "Rotor II",
+            "Rotor I",
+            "Reflector UKW",
+            "Reflector UKW reverse",
+            "Rotor I reverse",
+            "Rotor II reverse",
+            "Rotor III reverse",
+            "PlugBoard reverse",
+        ]
+
+    def test_stages_should_be_chained(self) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "AB")
+        tracer = RecordTracer()
+
+        Enigma(config, tracer).encode_letter("A")
+
+        stages = [e for e in tracer.events if isinstance(e, Stage)]
+        assert stages[0].letter_in == "A"
+        assert stages[-1].letter_out == "H"
+        for previous, stage in pairwise(stages):
+            assert previous.letter_out == stage.letter_in
+
+    def test_step_should_trace_turnover(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Z", "UKW:A", "")
+        tracer = RecordTracer()
+
+        Enigma(config, tracer).encode_letter("A")
+
+        assert tracer.events[:3] == [
+            Turnover("Rotor III"),
+            Turnover("Rotor II"),
+            Step(("B", "A", "A")),
+        ]
+
+    def test_traced_message_should_be_identical_to_untraced_one(self) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        message = "HELLOWORLD" * 100
+
+        assert Enigma(config, RecordTracer()).encode_message(
+            message,
+        ) == Enigma(config).encode_message(message)
+
+    def test_encode_without_tracer_should_count_no_event(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        built: list[str] = []
+
+        def count(name: str) -> Callable[..., TraceEvent]:
+            event: Callable[..., TraceEvent] = getattr(tracing, name)
+
+            def build(*args: Any) -> TraceEvent:
+                built.append(name)
+                return event(*args)
+
+            return build
+
+        for name in ("LetterIn", "LetterOut", "Stage", "Step", "Turnover"):
+            monkeypatch.setattr(f"enigma.enigma.{name}", count(name))
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        enigma = Enigma(config)
+
+        enigma.encode_letter("A")
+        enigma.encode_message("HELLOWORLD" * 10)
+        "".join(enigma.encode_chunks(["HELLO", "WORLD"]))
+        enigma.clone().encode_bytes(bytearray(b"HELLO"))
+        untraced = len(built)
+        Enigma(config, RecordTracer()).encode_message("HELLOWORLD")
+
+        assert untraced == 0
+        assert {"LetterIn", "LetterOut", "Stage", "Step"} <= set(built)
+
+    def test_encode_without_tracer_should_not_build_event(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        def fail(*_: Any) -> None:
+            pytest.fail("trace event built without tracer")
+
+        for event in ("LetterIn", "LetterOut", "Stage", "Step", "Turnover"):
+            monkeypatch.setattr(f"enigma.enigma.{event}", fail)
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        enigma = Enigma(config)
+
+        enigma.encode_letter("A")
+        enigma.encode_message("HELLOWORLD")
+
+    def test_debug_config_should_print_trace(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:A III:A", "UKW:A", "", debug=True)
+
+        Enigma(config).encode_letter("A")
+
+        output = capsys.readouterr().out
+        assert "Encode A:" in output
+        assert "Converted by Rotor I: " in output
+        assert output.endswith("Encoded: A -> I\n")
+
+    def test_deprecated_debug_should_attach_print_tracer(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        config = EnigmaConfig.parse("I:A II:Z III:Y", "REFB:A", "AB CD")
+        enigma = Enigma(config)
+        untraced = Enigma(config)
+        enigma.encode_message("HELLO")
+        untraced.encode_message("HELLO")
+
+        with pytest.deprecated_call():
+            enigma.debug("Start")
+        encoded = enigma.encode_letter("W")
+
+        output = capsys.readouterr().out
+        assert output.startswith("Start\nStep: ")
+        assert "Encode W:\n" in output
+        assert output.endswith(f"Encoded: W -> {encoded}\n")
+        assert encoded == untraced.encode_letter("W")
+
+    def test_print_tracer_should_print_turnover(
+        self,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        PrintTracer().trace(Turnover("Rotor I"))
+
+        assert capsys.readouterr().out == "Turnover: Rotor I\n"